@@ -0,0 +1,61 @@
+import statistics
+from collections import deque
+
+
+class AdaptiveConcurrency:
+    """
+    Control AIMD del número de pestañas/tareas en paralelo.
+    - Cada `increase_after` éxitos seguidos con latencia normal: limit + 1 (hasta max_limit).
+    - Error, o latencia > slow_factor x mediana reciente: limit // 2 (mínimo min_limit).
+    Así el escaneo escala con las pestañas mientras LinkedIn responde bien y se
+    repliega en cuanto aparecen lentitudes o fallos.
+    """
+
+    def __init__(self, max_limit=4, min_limit=1, initial=None, slow_factor=2.0, increase_after=3, window=20):
+        self.max_limit = max(1, int(max_limit))
+        self.min_limit = max(1, min(int(min_limit), self.max_limit))
+        self.limit = min(self.max_limit, max(self.min_limit, int(initial or self.min_limit + 1)))
+        self.slow_factor = slow_factor
+        self.increase_after = increase_after
+        self.latencies = deque(maxlen=window)
+        self.streak = 0
+        self.decreases = 0
+        self.increases = 0
+
+    def baseline(self):
+        """Mediana de latencias recientes (None hasta tener 3 muestras)."""
+        return statistics.median(self.latencies) if len(self.latencies) >= 3 else None
+
+    def on_result(self, latency, ok=True):
+        """Registra un resultado y devuelve el nuevo límite."""
+        baseline = self.baseline()
+        slow = ok and baseline is not None and latency > self.slow_factor * baseline
+        if ok:
+            self.latencies.append(latency)
+
+        if not ok or slow:
+            self.streak = 0
+            new_limit = max(self.min_limit, self.limit // 2)
+            if new_limit < self.limit:
+                self.decreases += 1
+                print(f"   🐢 [Tabs] {'Error' if not ok else f'Lentitud ({latency:.1f}s)'}: concurrencia {self.limit} -> {new_limit}")
+            self.limit = new_limit
+            return self.limit
+
+        self.streak += 1
+        if self.streak >= self.increase_after and self.limit < self.max_limit:
+            self.streak = 0
+            self.limit += 1
+            self.increases += 1
+            print(f"   🚀 [Tabs] Respuestas estables: concurrencia -> {self.limit}")
+        return self.limit
+
+    def stats(self):
+        baseline = self.baseline()
+        return {
+            "limit": self.limit,
+            "max_limit": self.max_limit,
+            "baseline_latency": round(baseline, 2) if baseline is not None else None,
+            "increases": self.increases,
+            "decreases": self.decreases,
+        }
@@ -0,0 +1,222 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+
+
+def extract_job_id(url):
+    """Extrae el ID numérico de LinkedIn de una URL (/jobs/view/<id> o currentJobId=<id>)."""
+    if not url:
+        return None
+    match = re.search(r"/jobs/view/(?:[^/?]*?-)?(\d+)", str(url))
+    if not match:
+        match = re.search(r"currentJobId=(\d+)", str(url))
+    return match.group(1) if match else None
+
+
+def fingerprint(*parts):
+    """SHA-256 estable de varios textos (descripción, prompt, perfil...)."""
+    h = hashlib.sha256()
+    for part in parts:
+        h.update((part or "").encode("utf-8"))
+        h.update(b"\x00")
+    return h.hexdigest()
+
+
+class AnalysisCache:
+    """
+    Cache persistente (SQLite) de resultados de JobAnalyzer.analyze.
+    Clave: ID de LinkedIn + hash(descripción, prompt, profile_config).
+    - Expira entradas por TTL y recorta por tamaño (LRU por last_access) solo al pasarse de max_entries.
+    - Un acierto no escribe en disco: los last_access se acumulan y se guardan en lote.
+    - La base de datos se abre en el primer uso (construir el objeto no crea ficheros).
+    - Single-flight: si dos llamadas piden la misma clave a la vez, solo una va al LLM.
+    """
+
+    TOUCH_BATCH = 50  # Pending last_access updates before they are written in one commit
+
+    def __init__(self, db_path="user_data/analysis_cache.sqlite", ttl_seconds=7 * 24 * 3600, max_entries=5000):
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._inflight = {}  # key -> {"event": Event, "result": ..., "error": ...}
+        self._conn = None
+        self._touched = {}  # key -> last_access not yet written
+        self._size = 0  # Upper bound of the rows on disk (replaced keys count twice until the next evict)
+
+    def _db(self):
+        """Conexión SQLite, abierta (y tabla creada) en el primer uso. El llamador tiene el lock."""
+        if self._conn is None:
+            if os.path.dirname(self.db_path):
+                os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS analysis_cache (
+                    cache_key TEXT PRIMARY KEY,
+                    job_id TEXT,
+                    result TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_analysis_last_access ON analysis_cache(last_access)")
+            self._conn.commit()
+            self._evict_locked()
+        return self._conn
+
+    def make_key(self, job_id, description, context_hash=""):
+        """Clave de contenido: cambia si cambia la oferta, el prompt o el perfil."""
+        return f"{job_id or 'nojob'}:{fingerprint(description, context_hash)}"
+
+    def get(self, key):
+        """Devuelve el análisis cacheado (dict) o None si no existe / expiró."""
+        with self._lock:
+            return self._read(key)
+
+    def _read(self, key):
+        """get() sin tomar el lock (el llamador ya lo tiene)."""
+        now = time.time()
+        db = self._db()
+        row = db.execute("SELECT result, created_at FROM analysis_cache WHERE cache_key = ?", (key,)).fetchone()
+        if not row:
+            return None
+        if self.ttl_seconds and now - row[1] > self.ttl_seconds:
+            db.execute("DELETE FROM analysis_cache WHERE cache_key = ?", (key,))
+            db.commit()
+            self._touched.pop(key, None)
+            return None
+        self._touched[key] = now
+        if len(self._touched) >= self.TOUCH_BATCH:
+            self._flush_touches()
+        try:
+            return json.loads(row[0])
+        except Exception:
+            return None
+
+    def _flush_touches(self):
+        """Escribe los last_access pendientes en una sola transacción. El llamador tiene el lock."""
+        if self._touched and self._conn is not None:
+            self._conn.executemany("UPDATE analysis_cache SET last_access = ? WHERE cache_key = ?",
+                                   [(ts, key) for key, ts in self._touched.items()])
+            self._conn.commit()
+        self._touched.clear()
+
+    def put(self, key, result, job_id=None):
+        """Guarda un análisis. Los resultados vacíos (errores) no se cachean."""
+        if not result:
+            return
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            db.execute(
+                "INSERT OR REPLACE INTO analysis_cache (cache_key, job_id, result, created_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, job_id, json.dumps(result, ensure_ascii=False), now, now)
+            )
+            db.commit()
+            self._touched.pop(key, None)
+            self._size += 1
+            if self.max_entries and self._size > self.max_entries:
+                self._evict_locked()
+
+    def count(self, hit):
+        """Cuenta un acierto/fallo de cache hecho fuera de get_or_compute (p.ej. un lote)."""
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+    def lookup(self, key):
+        """get() que además cuenta el acierto/fallo en las estadísticas."""
+        cached = self.get(key)
+        self.count(cached is not None)
+        return cached
+
+    def get_or_compute(self, key, compute_fn, job_id=None, count=True):
+        """
+        Devuelve el valor cacheado o ejecuta compute_fn() una sola vez por clave,
+        aunque varios hilos lo pidan simultáneamente (single-flight).
+        Si compute_fn() falla, los hilos que esperaban reciben la misma excepción.
+        count=False: la consulta ya se contó (p.ej. el reintento individual de un lote).
+        """
+        cached = self.get(key)
+        if cached is not None:
+            if count: self.count(True)
+            return cached
+
+        with self._lock:
+            flight = self._inflight.get(key)
+            # The previous leader may have stored the result between get() and here
+            cached = self._read(key) if flight is None else None
+            leader = flight is None and cached is None
+            if leader:
+                flight = {"event": threading.Event(), "result": None, "error": None}
+                self._inflight[key] = flight
+
+        if cached is not None:
+            if count: self.count(True)
+            return cached
+        if not leader:
+            # Otro hilo ya está consultando el LLM para esta misma oferta
+            flight["event"].wait()
+            if flight["error"] is not None:
+                raise flight["error"]
+            if count: self.count(True)
+            return flight["result"]
+
+        if count: self.count(False)
+        try:
+            result = compute_fn()
+            flight["result"] = result
+            self.put(key, result, job_id=job_id)
+            return result
+        except Exception as e:
+            flight["error"] = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight["event"].set()
+
+    def evict(self):
+        """Elimina entradas expiradas y recorta al tamaño máximo (menos usadas primero)."""
+        with self._lock:
+            self._db()
+            self._evict_locked()
+
+    def _evict_locked(self):
+        self._flush_touches()
+        if self.ttl_seconds:
+            self._conn.execute("DELETE FROM analysis_cache WHERE created_at < ?", (time.time() - self.ttl_seconds,))
+        if self.max_entries:
+            self._conn.execute("""
+                DELETE FROM analysis_cache WHERE cache_key IN (
+                    SELECT cache_key FROM analysis_cache ORDER BY last_access DESC LIMIT -1 OFFSET ?
+                )
+            """, (self.max_entries,))
+        self._conn.commit()
+        self._size = self._conn.execute("SELECT COUNT(*) FROM analysis_cache").fetchone()[0]
+
+    def stats(self):
+        with self._lock:
+            size = self._db().execute("SELECT COUNT(*) FROM analysis_cache").fetchone()[0]
+        total = self.hits + self.misses
+        return {
+            "entries": size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0
+        }
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._flush_touches()
+                self._conn.close()
+                self._conn = None
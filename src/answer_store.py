@@ -0,0 +1,177 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import threading
+import unicodedata
+
+# Palabras sin carga semántica (EN/ES). Se ignoran al comparar preguntas para que
+# "years with Python" y "years with Java" NO se consideren la misma pregunta.
+STOPWORDS = {
+    "a", "an", "the", "of", "to", "in", "on", "at", "for", "with", "and", "or", "is", "are", "do", "does",
+    "you", "your", "have", "has", "how", "many", "much", "what", "which", "be", "been", "this", "that", "as",
+    "currently", "please", "any", "we", "our", "can", "will", "would", "if", "it",
+    "el", "la", "los", "las", "un", "una", "de", "del", "en", "con", "para", "por", "y", "o", "es", "son",
+    "tu", "su", "usted", "tienes", "tiene", "cuantos", "cuantas", "que", "cual", "al", "se", "te", "le",
+}
+
+CONFIDENCE_SCORES = {"high": 1.0, "medium": 0.6, "low": 0.2}
+
+
+def normalize_question(text):
+    """Minúsculas, sin tildes, sin puntuación ni asteriscos de campos obligatorios."""
+    text = unicodedata.normalize("NFKD", str(text or ""))
+    text = "".join(c for c in text if not unicodedata.combining(c)).lower()
+    text = re.sub(r"[^a-z0-9#+.\s]", " ", text)
+    text = re.sub(r"\.(?=\s|$)", " ", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def question_tokens(text):
+    return frozenset(t for t in normalize_question(text).split() if t not in STOPWORDS)
+
+
+def options_key(options):
+    """Clave canónica del conjunto de opciones (orden irrelevante). '' para texto libre."""
+    if not options:
+        return ""
+    return "|".join(sorted(normalize_question(o) for o in options))
+
+
+class AnswerStore:
+    """
+    Memoria persistente (SQLite) de respuestas a preguntas de formularios.
+    - Clave: pregunta normalizada + conjunto de opciones.
+    - Búsqueda difusa: índice invertido de tokens + similitud Jaccard, para que
+      redacciones casi idénticas reutilicen la respuesta sin llamar al LLM.
+    - Cada respuesta guarda la confianza del LLM; solo se sirven las confiables.
+    - Se invalida todo si cambia el perfil (profile_hash).
+    """
+
+    def __init__(self, db_path="user_data/answer_store.sqlite", profile_hash="", similarity_threshold=0.85, min_confidence=0.6):
+        self.db_path = db_path
+        self.profile_hash = profile_hash
+        self.similarity_threshold = similarity_threshold
+        self.min_confidence = min_confidence
+        self.hits = 0
+        self.misses = 0
+
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS answers (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                question TEXT NOT NULL,
+                options_key TEXT NOT NULL,
+                answer TEXT NOT NULL,
+                confidence REAL NOT NULL,
+                profile_hash TEXT NOT NULL,
+                uses INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                last_used REAL,
+                UNIQUE(question, options_key)
+            )
+        """)
+        # Invalidación: las respuestas de otro perfil ya no son válidas
+        removed = self._conn.execute("DELETE FROM answers WHERE profile_hash != ?", (profile_hash,)).rowcount
+        self._conn.commit()
+        if removed:
+            print(f"   [AnswerStore] Perfil cambiado: {removed} respuestas invalidadas.")
+
+        self._entries = {}  # id -> (tokens, options_key, answer, confidence)
+        self._index = {}    # token -> set(ids)
+        for row in self._conn.execute("SELECT id, question, options_key, answer, confidence FROM answers"):
+            self._add_to_index(row[0], row[1], row[2], row[3], row[4])
+
+    def _add_to_index(self, entry_id, question, opts_key, answer, confidence):
+        tokens = question_tokens(question)
+        self._entries[entry_id] = (tokens, opts_key, answer, confidence)
+        for tok in tokens:
+            self._index.setdefault(tok, set()).add(entry_id)
+
+    def lookup(self, question, options=None):
+        """
+        Devuelve {"answer", "confidence", "similarity"} o None.
+        Exige el mismo conjunto de opciones y similitud >= similarity_threshold.
+        """
+        tokens = question_tokens(question)
+        if not tokens:
+            return None
+        opts_key = options_key(options)
+
+        with self._lock:
+            candidates = set()
+            for tok in tokens:
+                candidates |= self._index.get(tok, set())
+
+            best_id, best_sim = None, 0.0
+            for entry_id in candidates:
+                entry_tokens, entry_opts, _, confidence = self._entries[entry_id]
+                if entry_opts != opts_key or confidence < self.min_confidence:
+                    continue
+                sim = len(tokens & entry_tokens) / len(tokens | entry_tokens)
+                if sim > best_sim:
+                    best_id, best_sim = entry_id, sim
+
+            if best_id is None or best_sim < self.similarity_threshold:
+                self.misses += 1
+                return None
+
+            _, _, answer, confidence = self._entries[best_id]
+            self._conn.execute("UPDATE answers SET uses = uses + 1, last_used = ? WHERE id = ?", (time.time(), best_id))
+            self._conn.commit()
+            self.hits += 1
+            return {"answer": answer, "confidence": confidence, "similarity": round(best_sim, 3)}
+
+    def put(self, question, options, answer, confidence="Medium"):
+        """Guarda (o actualiza) la respuesta del LLM. confidence: High/Medium/Low o número 0-1."""
+        if answer is None or not normalize_question(question):
+            return
+        if isinstance(confidence, str):
+            confidence = CONFIDENCE_SCORES.get(confidence.strip().lower(), 0.2)
+        question_norm = normalize_question(question)
+        opts_key = options_key(options)
+        answer = str(answer)
+
+        with self._lock:
+            self._conn.execute("""
+                INSERT INTO answers (question, options_key, answer, confidence, profile_hash, created_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(question, options_key) DO UPDATE SET
+                    answer = excluded.answer, confidence = excluded.confidence,
+                    profile_hash = excluded.profile_hash, created_at = excluded.created_at
+            """, (question_norm, opts_key, answer, float(confidence), self.profile_hash, time.time()))
+            self._conn.commit()
+            entry_id = self._conn.execute(
+                "SELECT id FROM answers WHERE question = ? AND options_key = ?", (question_norm, opts_key)
+            ).fetchone()[0]
+            self._add_to_index(entry_id, question_norm, opts_key, answer, float(confidence))
+
+    def invalidate(self, question, options=None):
+        """Olvida una respuesta (p.ej. si LinkedIn la marcó como inválida)."""
+        question_norm = normalize_question(question)
+        opts_key = options_key(options)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id FROM answers WHERE question = ? AND options_key = ?", (question_norm, opts_key)
+            ).fetchone()
+            if not row:
+                return
+            self._conn.execute("DELETE FROM answers WHERE id = ?", (row[0],))
+            self._conn.commit()
+            tokens = self._entries.pop(row[0], (frozenset(),))[0]
+            for tok in tokens:
+                self._index.get(tok, set()).discard(row[0])
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0
+        }
@@ -11,6 +11,10 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from src.browser import JobSearchBrowser
 from src.brain import JobAnalyzer
+from src.skill_extractor import AhoCorasick, SkillExtractor, fold_text
+
+# Job page is ready once the apply button (or at least the top card) is rendered
+APPLY_READY_SELECTOR = ".jobs-apply-button, .jobs-s-apply button, button[aria-label*='Apply'], .job-details-jobs-unified-top-card"
 
 # --- CONFIG LOADER ---
 def load_config():
@@ -41,32 +45,71 @@ def get_salary_expectation(config, role_title, description_text):
             
     return default["value"]
 
+# Language markers, matched as substrings in one pass (same weights as the old `in text` checks)
+_LANGUAGE_MARKERS = AhoCorasick(whole_words=False)
+for _marker in ["software engineer", "required", "requirements", "years", "remote",
+                "ingeniero", "desarrollador", "requisitos", "experiencia", "remoto"]:
+    _LANGUAGE_MARKERS.add(_marker)
+# "años" folds to "anos", which is inside "humanos": whole word, with the tilde
+_YEARS_ES = re.compile(r"\baños\b", re.IGNORECASE)
+
 def detect_language(text):
     """
     Simple heuristic to detect if text is English or Spanish.
     """
-    text = text.lower()
+    found = _LANGUAGE_MARKERS.find_all(text)
     # Weighted keywords
     score_en = 0
     score_es = 0
     
     # English markers
-    if "software engineer" in text: score_en += 2
-    if "required" in text: score_en += 1
-    if "requirements" in text: score_en += 1
-    if "years" in text: score_en += 1
-    if "remote" in text and "remoto" not in text: score_en += 0.5
+    if "software engineer" in found: score_en += 2
+    if "required" in found: score_en += 1
+    if "requirements" in found: score_en += 1
+    if "years" in found: score_en += 1
+    if "remote" in found and "remoto" not in found: score_en += 0.5
     
     # Spanish markers
-    if "ingeniero" in text: score_es += 2
-    if "desarrollador" in text: score_es += 2
-    if "requisitos" in text: score_es += 1
-    if "años" in text or "experiencia" in text: score_es += 1
-    if "remoto" in text: score_es += 1
+    if "ingeniero" in found: score_es += 2
+    if "desarrollador" in found: score_es += 2
+    if "requisitos" in found: score_es += 1
+    if _YEARS_ES.search(text) or "experiencia" in found: score_es += 1
+    if "remoto" in found: score_es += 1
     
     if score_es > score_en: return "es"
     return "en" # Default to English if unsure or mixed (standard for tech)
 
+# Inflected forms a seniority keyword also covers (prefix matching already gives leadership/architecture)
+SENIORITY_FORMS = {
+    "manager": ["management", "managing"],
+    "arquitecto": ["arquitectura", "arquitecta"],
+    "lider": ["liderazgo", "liderar", "lidera"],
+    "líder": ["liderazgo", "liderar", "lidera"],
+}
+
+# Compiled once per profile: resume_rules keyword automatons + profile skill extractor
+_RESUME_MATCHERS = {}
+
+def _resume_matchers(config):
+    """
+    Stack keywords ('keywords' and the first match_all group) match whole words, so "java" is
+    not found in "javascript". The other match_all groups (seniority) match word prefixes plus
+    SENIORITY_FORMS, so "lead"/"manager" still count in "leadership"/"management".
+    """
+    key = json.dumps([config.get("resume_rules", []), config.get("stack_priority", []), config.get("skills", {})], sort_keys=True)
+    if key not in _RESUME_MATCHERS:
+        stack = AhoCorasick(whole_words=True)
+        seniority = AhoCorasick(whole_words=True, word_prefix=True)
+        for rule in config.get("resume_rules", []):
+            groups = rule.get("match_all") or []
+            for kw in rule.get("keywords", []) + [kw for group in groups[:1] for kw in group]:
+                stack.add(kw)
+            for kw in [kw for group in groups[1:] for kw in group]:
+                for form in [kw] + SENIORITY_FORMS.get(kw.lower(), []):
+                    seniority.add(form, payload=fold_text(kw).strip())
+        _RESUME_MATCHERS[key] = (stack.build(), seniority.build(), SkillExtractor(config))
+    return _RESUME_MATCHERS[key]
+
 def get_resume_filename(config, role_title, description_text, language="en"):
     """
     Determines the best resume filename based on keywords and language.
@@ -74,8 +117,12 @@ def get_resume_filename(config, role_title, description_text, language="en"):
     """
     resume_rules = config.get("resume_rules", [])
     
-    # Text to search in
-    text = (role_title + " " + description_text).lower()
+    # Text to search in: one pass per automaton for every rule keyword (see _resume_matchers)
+    text = role_title + " " + description_text
+    stack, seniority, extractor = _resume_matchers(config)
+    present = stack.find_all(text) | seniority.find_all(text)
+    # Profile skills and their inferred languages count too (Spring Boot -> java)
+    present |= {fold_text(skill) for skill in extractor.extract(text)["skills"]}
     
     potential_matches = []
     
@@ -97,7 +144,7 @@ def get_resume_filename(config, role_title, description_text, language="en"):
                 # Check if ANY keyword in this group is present
                 group_match = False
                 for kw in group:
-                    if kw.lower() in text:
+                    if fold_text(kw) in present:
                         group_match = True
                         break
                 if not group_match:
@@ -111,7 +158,7 @@ def get_resume_filename(config, role_title, description_text, language="en"):
         # 3. Check simple 'keywords' (Legacy/Fallback)
         keywords = rule.get("keywords", [])
         for kw in keywords:
-            if kw.lower() in text:
+            if fold_text(kw) in present:
                 potential_matches.append(filename)
                 break
         
@@ -177,14 +224,14 @@ def main():
 
     config = load_config()
     # Explicitly visible
-    browser = JobSearchBrowser(headless=False)
-    brain = JobAnalyzer() # Initialize Brain for intelligent answers
+    brain = JobAnalyzer() # Initialize Brain for intelligent answers (connects in background)
+    browser = JobSearchBrowser(headless=False, route_profile="apply") # Looser network blocking for the Easy Apply modal
     
     # Try to use cookies first
     print("🍪 Checking session...")
     try:
         browser.page.goto("https://www.linkedin.com/feed/")
-        browser.human_delay(2)
+        browser.settle("navigate", stable=True, timeout=5000)
         
         if "login" in browser.page.url:
              print("⚠️  Session invalid. Using fallback login (Manual).")
@@ -221,13 +268,13 @@ def main():
             
             try:
                 browser.page.goto(str(url))
-                browser.human_delay(3)
+                browser.settle("navigate", selector=APPLY_READY_SELECTOR, timeout=10000)
                 
                 # Use Robust Smart Click Strategy
                 clicked = browser.click_like_an_ai()
 
                 if clicked:
-                    browser.human_delay(2)
+                    browser.settle("click", selector=".jobs-easy-apply-modal", timeout=5000)
                     
                     # Detect language once here
                     full_text = role + " " + reqs
@@ -266,12 +313,15 @@ def main():
             except Exception as save_error:
                 print(f"   ⚠️ Could not save report: {save_error}")
                 
+        print(f"⏱️ [Pacing] {browser.pacing_stats()}")
         print("✅ Batch Completed. Waiting 30s before closing...")
         time.sleep(30) # Keep browser open so user sees it finished
 
     except Exception as e:
         print(f"❌ Fatal Error: {e}")
         time.sleep(30) # Keep browser open on error too
+    finally:
+        brain.close()
 
 def handle_application_flow(browser, job_context=None, brain=None):
     """
@@ -286,7 +336,7 @@ def handle_application_flow(browser, job_context=None, brain=None):
     
     while step < max_steps:
         step += 1
-        browser.human_delay(1, 2)
+        browser.settle("step", stable=".jobs-easy-apply-modal", timeout=3000)
         
         # ---------------------------------------------------------
         # 1. CHECK FOR SUCCESS (SUBMIT)
@@ -302,7 +352,7 @@ def handle_application_flow(browser, job_context=None, brain=None):
             if browser.page.is_visible(sel):
                 print("   👉 Found SUBMIT button. Clicking...")
                 browser.page.click(sel)
-                browser.human_delay(3)
+                browser.settle("click", stable=True, timeout=5000)
                 return "Submitted"
 
         # ---------------------------------------------------------
@@ -320,7 +370,7 @@ def handle_application_flow(browser, job_context=None, brain=None):
                  print("   👉 Found REVIEW button. Clicking...")
                  browser.page.click(sel)
                  clicked_review = True
-                 browser.human_delay(1)
+                 browser.settle("step", stable=".jobs-easy-apply-modal", timeout=3000)
                  break
         if clicked_review: continue 
 
@@ -464,7 +514,7 @@ def handle_application_flow(browser, job_context=None, brain=None):
                     clicked_next = True
                     
                     # POST-CLICK VALIDATION CHECK
-                    browser.human_delay(1)
+                    browser.settle("step", stable=".jobs-easy-apply-modal", timeout=3000)
                     if browser.page.is_visible(".artdeco-inline-feedback__message") or \
                        browser.page.is_visible("div[aria-invalid='true']"):
                          print("      ⚠️ Validation Error. Attempting specific fixes...")
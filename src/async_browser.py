@@ -0,0 +1,884 @@
+import random
+import time
+import re
+import asyncio
+import inspect
+from collections import deque
+from urllib.parse import quote
+from playwright.async_api import async_playwright
+
+try:
+    from .adaptive_concurrency import AdaptiveConcurrency
+    from .job_details import DETAIL_SELECTORS, EXTRACT_DETAILS_JS, parse_job_details
+    from .route_policy import RoutePolicy
+    from .pacing import Pacer
+    from .job_api import JobApiCapture
+    from .analysis_cache import extract_job_id
+    from .search_crawler import PageTracker, ScanResult, PAGE_SIZE, MAX_PAGES
+except ImportError:
+    from src.adaptive_concurrency import AdaptiveConcurrency
+    from src.job_details import DETAIL_SELECTORS, EXTRACT_DETAILS_JS, parse_job_details
+    from src.route_policy import RoutePolicy
+    from src.pacing import Pacer
+    from src.job_api import JobApiCapture
+    from src.analysis_cache import extract_job_id
+    from src.search_crawler import PageTracker, ScanResult, PAGE_SIZE, MAX_PAGES
+
+class AsyncJobSearchBrowser:
+    """
+    Implementación asyncio de JobSearchBrowser (playwright.async_api).
+    Misma superficie pública que la clase sync, pero cada espera de red/DOM es un
+    await: el escaneo, la extracción en varias pestañas y las llamadas LLM del
+    callback pueden solaparse dentro del mismo event loop.
+
+    Uso:
+        async with AsyncJobSearchBrowser(headless=True) as browser:
+            await browser.search_jobs("linkedin", "Python", "Colombia")
+            await browser.scan_search_results("linkedin", 10, callback_fn, parallel_tabs=3)
+
+    callback_fn puede ser una función normal o una corrutina; devolver False detiene el escaneo.
+    route_profile elige qué recursos se bloquean (ver route_policy.ROUTE_PROFILES)
+    y pacing_scale escala los suelos humanos del Pacer (0 = solo señales de la página).
+    """
+
+    DESCRIPTION_SELECTOR = ".jobs-description__content, #job-details, .show-more-less-html__markup"
+
+    def __init__(self, headless=False, user_data_dir="user_data", route_profile="scan", pacing_scale=1.0,
+                 seen_index=None):
+        self.headless = headless
+        self.user_data_dir = user_data_dir
+        self.route_policy = RoutePolicy(route_profile)
+        self.pacer = Pacer(scale=pacing_scale)
+        self.job_api = JobApiCapture()
+        self.seen_index = seen_index  # seen_jobs.SeenJobIndex: skip jobs already opened (this run or before)
+        self.playwright = None
+        self.context = None
+        self.page = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def start(self):
+        """Launches the browser (must be awaited inside the event loop)."""
+        self.playwright = await async_playwright().start()
+        # Use persistent context to save session (cookies, login)
+        # verify_downloads=False helps with some automation detection
+        self.context = await self.playwright.chromium.launch_persistent_context(
+            user_data_dir=self.user_data_dir,
+            headless=self.headless,
+            executable_path="/usr/bin/google-chrome", # Use real Chrome for better stealth
+            viewport={"width": 1280, "height": 800},
+            # Stealth Args: REMOVED --no-sandbox as it triggers Google security warnings
+            args=[
+                "--disable-blink-features=AutomationControlled", 
+            ],
+            ignore_default_args=["--enable-automation"],
+            java_script_enabled=True
+        )
+        
+        # Block images/fonts/trackers the current profile doesn't need (counted per page)
+        await self.context.route("**/*", self.route_policy.handle)
+        for page in self.context.pages:
+            page.on("close", self.route_policy.forget_page)
+        self.context.on("page", lambda page: page.on("close", self.route_policy.forget_page))
+        # Structured job data from LinkedIn's own JSON API (DOM scraping is the fallback)
+        self.context.on("response", self._on_response)
+
+        if len(self.context.pages) > 0:
+            self.page = self.context.pages[0]
+        else:
+            self.page = await self.context.new_page()
+
+        # 3. MAGIC: Inject Session from Real Chrome (The "Clone Token" strategy)
+        try:
+            import browser_cookie3
+            import os
+            print("   [Browser] Intentando clonar sesión de Google Chrome...")
+            
+            potential_paths = [
+                os.path.expanduser("~/.config/google-chrome/Default/Cookies"),
+                os.path.expanduser("~/.config/google-chrome/Profile 1/Cookies"),
+                os.path.expanduser("~/.config/google-chrome/Profile 2/Cookies")
+            ]
+            
+            cookies_to_add = []
+            
+            for path in potential_paths:
+                if not os.path.exists(path): continue
+                try:
+                    # Extract ALL google.com cookies
+                    cj_temp = browser_cookie3.chrome(cookie_file=path, domain_name=".google.com")
+                    for c in cj_temp:
+                         # Convert http.cookiejar.Cookie to Playwright dict
+                         cookie_dict = {
+                             "name": c.name,
+                             "value": c.value,
+                             "domain": c.domain,
+                             "path": c.path,
+                             "secure": c.secure,
+                             # Expiration handling
+                             "expires": c.expires if c.expires else -1
+                         }
+                         # Clean up optional fields that might break Playwright
+                         # Playwright hates keys with None values sometimes or extra keys
+                         
+                         cookies_to_add.append(cookie_dict)
+                    
+                    if cookies_to_add:
+                        print(f"   ✨ [Magic] Clonando {len(cookies_to_add)} cookies desde {path}")
+                        await self.context.add_cookies(cookies_to_add)
+                        break
+                except Exception as e:
+                    # print(f" debug error cloning: {e}") 
+                    continue
+
+        except Exception as e:
+            print(f"   [Browser] Warning: Could not clone session: {e}")
+
+    def set_route_profile(self, profile):
+        """Switches the network blocking profile ("scan", "apply", "off" or a custom dict)."""
+        self.route_policy.set_profile(profile)
+
+    def route_stats(self):
+        """Requests allowed/blocked (total and for the most recent pages)."""
+        return self.route_policy.stats()
+
+    async def _on_response(self, response):
+        """Feeds LinkedIn's job JSON responses to the API capture."""
+        if not self.job_api.is_job_api(response.url):
+            return
+        try:
+            if "json" in (response.headers.get("content-type") or ""):
+                self.job_api.feed(await response.json())
+        except Exception:
+            pass # Redirects, empty bodies, closed tabs...
+
+    def api_stats(self):
+        """Jobs captured from the JSON API vs. DOM fallbacks."""
+        return self.job_api.stats()
+
+    def _claim(self, job_url):
+        """False if the seen-job index says this job was already handled."""
+        if self.seen_index is None:
+            return True
+        if self.seen_index.claim(extract_job_id(job_url)):
+            return True
+        print(f"   ⏭️ [Seen] Ya vista: {job_url}")
+        return False
+
+    def _release(self, job_url):
+        """Undo _claim for a job that was not processed (load error or stop), so later searches retry it."""
+        if self.seen_index is not None:
+            self.seen_index.release(extract_job_id(job_url))
+
+    async def _details_for(self, job_url, page=None):
+        """Details from the captured API payloads, or scraped from the page if they are missing."""
+        details = self.job_api.details_for(extract_job_id(job_url))
+        if details:
+            self.job_api.hits += 1
+            return details
+        self.job_api.fallbacks += 1
+        return await self._extract_details_from_page(page)
+
+    def pacing_stats(self):
+        """Seconds spent waiting for readiness signals vs. human floors, per action kind."""
+        return self.pacer.stats()
+
+    async def settle(self, kind, page=None, **signals):
+        """Waits for page readiness signals plus the human floor (see Pacer.settle)."""
+        return await self.pacer.settle(page or self.page, kind, **signals)
+
+    async def human_delay(self, min_seconds=1, max_seconds=2):
+        """Fixed random delay (prefer settle/pacer.pause; still accounted in pacing stats)."""
+        seconds = random.uniform(min_seconds, max_seconds)
+        await asyncio.sleep(seconds)
+        self.pacer._record("fixed", floor_seconds=seconds)
+
+    async def simulate_human_reading(self):
+        """Simulates scrolling and mouse movements like a human reading."""
+        try:
+            # Random mouse moves (reduced)
+            for _ in range(random.randint(1, 2)):
+                x = random.randint(100, 1000)
+                y = random.randint(100, 700)
+                await self.page.mouse.move(x, y)
+                await self.pacer.pause("read")
+            
+            # Scroll down slowly (faster)
+            total_height = await self.page.evaluate("document.body.scrollHeight")
+            current_position = 0
+            while current_position < total_height:
+                scroll_step = random.randint(600, 1000) # Bigger steps
+                current_position += scroll_step
+                await self.page.mouse.wheel(0, scroll_step)
+                await self.pacer.pause("scroll")
+                # Stop if we scrolled too much (e.g., footer)
+                if current_position > 2000: break
+                
+        except Exception as e:
+            print(f"Warning in human simulation: {e}")
+
+    async def close(self):
+        """Closes the browser."""
+        await self.context.close()
+        await self.playwright.stop()
+
+    async def get_page_content(self):
+        """Returns the full HTML of the current page."""
+        return await self.page.content()
+
+    async def login(self, site, email, password):
+        """Logs into the specified site."""
+        print(f"Logging into {site}...")
+        try:
+            if site == "linkedin":
+                await self.page.goto("https://www.linkedin.com/login")
+                await self.settle("navigate", selector="#username")
+                await self.page.fill("#username", email)
+                await self.pacer.pause("type")
+                await self.page.fill("#password", password)
+                await self.pacer.pause("type")
+                await self.page.click("button[type='submit']")
+                await self.page.wait_for_load_state("networkidle")
+                print("Login submitted.")
+                
+                # Manual 2FA Handling
+                # Smart Wait: Detect Feed instead of asking user to press Enter
+                print("   [Login] Verificando acceso al Feed (Esperando 2FA si es necesario)...")
+                try:
+                    # Wait up to 60s for user to solve 2FA or for page to load
+                    await self.page.wait_for_url("**/feed/**", timeout=60000)
+                    print("   ✅ [Login] Feed detectado. Continuando...")
+                except:
+                    print("   ⚠️ [Login] No se detectó el Feed en 60s. Continuando bajo riesgo...")
+                
+                # Check if we are logged in (optional, but good for stability)
+                # await self.human_delay(3, 5) 
+            elif site == "computrabajo":
+                # Placeholder for Computrabajo
+                pass
+        except Exception as e:
+            print(f"Error logging in: {e}")
+
+    @staticmethod
+    def search_url(query, location, time_filter="r259200", start=0, sort_by=None):
+        """LinkedIn search URL; start is the result offset (pages of 25), sort_by="DD" sorts by date."""
+        # Encoded: planned queries carry quotes and OR ("Tech Lead" OR "Líder Técnico")
+        url = f"https://www.linkedin.com/jobs/search/?keywords={quote(query)}&location={quote(location)}&f_TPR={time_filter}"
+        if sort_by: url += f"&sortBy={sort_by}"
+        if start: url += f"&start={start}"
+        return url
+
+    async def search_jobs(self, site, query, location, time_filter="r259200", sort_by=None):
+        """Performs a job search. time_filter: r86400(24h), r259200(3d), r604800(1w)."""
+        print(f"Searching {site} for '{query}' in '{location}' (Filter: {time_filter})...")
+        if site == "linkedin":
+            await self.page.goto(self.search_url(query, location, time_filter, sort_by=sort_by))
+            # Wait for results to load
+            if not await self.settle("search", selector=".jobs-search-results-list", timeout=10000):
+                print("Warning: Job list selector not found (might need manual interaction or layout changed)")
+
+    async def extract_job_links(self, site, limit=3):
+        """Extracts job links from the search results."""
+        links = []
+        if site == "linkedin":
+            # Select job cards. Note: Selectors vary greatly on LinkedIn (Logged in vs Public)
+            # This targets the logged-in search results view
+            try:
+                # Use a broad strategy to find job links
+                # .job-card-container__link is common in the list view
+                link_elements = await self.page.query_selector_all("a.job-card-container__link")
+                
+                for link_el in link_elements:
+                    if limit and len(links) >= limit:
+                        break
+                    
+                    href = await link_el.get_attribute('href')
+                    if href and "/jobs/view/" in href:
+                         url = f"https://www.linkedin.com{href}" if href.startswith("/") else href
+                         # Clean URL (remove tracking)
+                         url = url.split("?")[0]
+                         if url not in links:
+                             links.append(url)
+                
+                if not links:
+                    print("No links found with primary selector. Trying backup...")
+                    # Backup for public view or different layout
+                    link_elements = await self.page.query_selector_all("a.base-card__full-link")
+                    for link_el in link_elements:
+                         if limit and len(links) >= limit: break
+                         href = await link_el.get_attribute('href')
+                         if href:
+                             links.append(href.split("?")[0])
+
+            except Exception as e:
+                print(f"Error extracting links: {e}")
+        return links
+    
+    # Oops, extract_job_links is defined in this file, I shouldn't mess it up. 
+    # Let's target get_job_details directly.
+
+    
+    async def _extract_details_from_page(self, page=None):
+        """Helper to extract details from the CURRENTLY visible page/pane (self.page or another tab).
+        One page.evaluate round trip collects every raw text; parsing happens in Python."""
+        page = page or self.page
+        try:
+            raw = await page.evaluate(EXTRACT_DETAILS_JS, DETAIL_SELECTORS)
+            return parse_job_details(raw)
+        except Exception as e:
+            print(f"Error extracting details helper: {e}")
+            return {"description": "", "date": "Unknown", "company": "Unknown", "location": "Unknown", "work_mode": "Unknown"}
+
+    async def get_job_details(self, site, url):
+        """Extracts job description text and date."""
+        print(f"Getting details for: {url}")
+        details = {"description": "", "date": "Unknown"}
+        
+        if site == "linkedin":
+            try:
+                await self.page.goto(url)
+                await self.settle("navigate", selector=self.DESCRIPTION_SELECTOR)
+                await self.simulate_human_reading()
+                details = await self._details_for(url)
+
+            except Exception as e:
+                print(f"Error getting details: {e}")
+                
+        return details
+
+    async def _find_job_card_selector(self, page=None):
+        """Locates the search results list and returns the selector for its cards."""
+        page = page or self.page
+        list_selector = ".jobs-search-results-list"
+        found_list = False
+        try:
+            await page.wait_for_selector(list_selector, timeout=5000)
+            found_list = True
+        except:
+            # Fallbacks
+            if await page.is_visible("ul.scaffold-layout__list-container"):
+                list_selector = "ul.scaffold-layout__list-container"
+                found_list = True
+            elif await page.is_visible(".jobs-search__results-list"):
+                list_selector = ".jobs-search__results-list"
+                found_list = True
+
+        print(f"   [Scan] List container strategy: {list_selector if found_list else 'Global Search'}")
+        # Define card selector based on whether we found the list or not
+        return f"{list_selector} li" if found_list else ".job-card-container"
+
+    @staticmethod
+    def _list_selector(job_card_selector):
+        """Results container behind a _find_job_card_selector result (None in global search)."""
+        return job_card_selector[:-len(" li")] if job_card_selector.endswith(" li") else None
+
+    async def _scroll_results(self, job_card_selector, page=None, timeout=3000):
+        """Scrolls the detected results list (the window in global search) and waits for it to settle."""
+        page = page or self.page
+        list_selector = self._list_selector(job_card_selector)
+        if list_selector:
+            await page.evaluate("(sel) => document.querySelector(sel).scrollBy(0, 500)", list_selector)
+        else:
+            await page.evaluate("window.scrollBy(0, 500)")
+        await self.settle("scroll", page=page, stable=list_selector or True, timeout=timeout)
+
+    @staticmethod
+    async def _card_job_url(card):
+        """Canonical job URL from a result card ("Unknown" if the card has no link)."""
+        link_el = await card.query_selector("a.job-card-container__link")
+        if link_el:
+            href = await link_el.get_attribute("href")
+            if href:
+                job_url = href.split("?")[0]
+                if job_url.startswith("/"):
+                    job_url = f"https://www.linkedin.com{job_url}"
+                return job_url
+        return "Unknown"
+
+    async def collect_job_urls(self, limit, job_card_selector=None, page=None, skip=None):
+        """
+        Collects up to `limit` unique job URLs from the results list, scrolling it to load more.
+        skip(url) -> True drops a URL without counting it towards the limit (e.g. already seen).
+        """
+        page = page or self.page
+        job_card_selector = job_card_selector or await self._find_job_card_selector(page)
+        urls = []
+        checked = set()
+        index = 0
+        while limit is None or len(urls) < limit:
+            cards = await page.query_selector_all(job_card_selector)
+            if index >= len(cards):
+                try:
+                    await self._scroll_results(job_card_selector, page=page)
+                    cards = await page.query_selector_all(job_card_selector)
+                except:
+                    break
+                if index >= len(cards): break # No new items loaded
+            try:
+                job_url = await self._card_job_url(cards[index])
+                if job_url == "Unknown":
+                    # Cards outside the viewport are rendered lazily: bring it into view and retry once
+                    await cards[index].scroll_into_view_if_needed()
+                    await self.settle("scroll", page=page, stable=self._list_selector(job_card_selector) or True,
+                                      timeout=1500)
+                    job_url = await self._card_job_url(cards[index])
+                if job_url != "Unknown" and job_url not in checked:
+                    checked.add(job_url)
+                    if not (skip and skip(job_url)):
+                        urls.append(job_url)
+            except Exception as e:
+                print(f"   [Scan] Error reading card {index}: {e}")
+            index += 1
+        print(f"   [Scan] {len(urls)} job URLs collected.")
+        return urls
+
+    async def _load_job_details(self, tab, url, page_timeout):
+        """Opens `url` in `tab` and extracts its details (raises on load errors/authwall)."""
+        await tab.goto(url, wait_until="domcontentloaded", timeout=page_timeout)
+        await tab.wait_for_selector(self.DESCRIPTION_SELECTOR, timeout=page_timeout)
+        if "authwall" in tab.url or "/login" in tab.url:
+            raise RuntimeError("LinkedIn redirected to login/authwall")
+        return await self._details_for(url, tab)
+
+    @staticmethod
+    async def _run_callback(callback_fn, details, url):
+        result = callback_fn(details, url)
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+
+    async def scan_job_urls_parallel(self, urls, callback_fn, max_tabs=3, page_timeout=20000):
+        """
+        Extracts the details of each URL using up to `max_tabs` tabs of the same context.
+        Each tab loads and extracts as its own task; results are consumed in list order so
+        callbacks still see the jobs in order. The number of tabs in flight adapts (AIMD)
+        to errors and slow pages. Jobs already captured from the JSON API skip the tab.
+        """
+        controller = AdaptiveConcurrency(max_limit=max_tabs)
+        pending = deque(urls)
+        free_tabs = []
+        in_flight = deque()  # (tab or None, url, started_at, task)
+        opened = []
+        count_processed = 0
+
+        try:
+            while pending or in_flight:
+                # 1. Start loads up to the current limit
+                while pending and sum(1 for entry in in_flight if entry[0]) < controller.limit:
+                    captured = self.job_api.details_for(extract_job_id(pending[0]))
+                    if captured:
+                        self.job_api.hits += 1
+                        done = asyncio.get_running_loop().create_future()
+                        done.set_result(captured)
+                        in_flight.append((None, pending.popleft(), time.time(), done))
+                        continue
+                    if not free_tabs:
+                        tab = await self.context.new_page()
+                        opened.append(tab)
+                        free_tabs.append(tab)
+                    tab, url = free_tabs.pop(), pending.popleft()
+                    task = asyncio.ensure_future(self._load_job_details(tab, url, page_timeout))
+                    in_flight.append((tab, url, time.time(), task))
+                    await self.pacer.pause("stagger") # Stagger requests a bit
+
+                # 2. Wait for the oldest tab
+                tab, url, started, task = in_flight.popleft()
+                details = None
+                try:
+                    details = await task
+                except Exception as e:
+                    print(f"   [Tabs] Error loading {url}: {e}")
+                if tab:
+                    controller.on_result(time.time() - started, ok=details is not None)
+                    free_tabs.append(tab)
+
+                if details is None:
+                    self._release(url)
+                    continue
+                print(f"   [Scan] Job {count_processed+1}/{len(urls)} ({len(in_flight)} more loading): {url}")
+                if await self._run_callback(callback_fn, details, url) is False:
+                    print("   [Scan] Callback requested stop.")
+                    for pending_url in [url, *pending, *(entry[1] for entry in in_flight)]:
+                        self._release(pending_url)
+                    break
+                count_processed += 1
+        finally:
+            for _, _, _, task in in_flight:
+                task.cancel()
+            for tab in opened:
+                try: await tab.close()
+                except: pass
+            print(f"   [Tabs] Stats: {controller.stats()}")
+
+        return count_processed
+
+    async def _load_result_page(self, tab, url):
+        """Loads a search results page in `tab` and returns its job URLs."""
+        await tab.goto(url)
+        await self.settle("search", page=tab, selector=".jobs-search-results-list", timeout=10000)
+        return await self.collect_job_urls(None, page=tab)
+
+    async def crawl_search(self, site, query, location, callback_fn, limit=None, time_filter="r259200",
+                           parallel_tabs=1, max_pages=MAX_PAGES, watermarks=None):
+        """
+        Walks the search page by page (&start=0, 25, 50...) instead of a single scrolled list.
+        The next page is prefetched in its own tab while the current page's jobs are processed.
+        Stops at `limit` (None = unlimited), on an empty or repeated page, at max_pages, or when
+        reaching the newest job of the last complete crawl (watermarks: search_crawler.WatermarkStore,
+        which also switches the search to date order).
+        Returns a ScanResult: jobs passed to callback_fn, jobs listed and jobs skipped as already seen.
+        """
+        if site != "linkedin":
+            print("Crawl only supported for LinkedIn currently.")
+            return ScanResult()
+
+        key = watermarks.key(query, location, time_filter) if watermarks else None
+        sort_by = "DD" if watermarks else None
+        tracker = PageTracker(limit=limit, watermark=watermarks.get(key) if watermarks else None,
+                              skip=lambda url: not self._claim(url))
+        stopped = False
+
+        async def tracked_callback(details, url):
+            nonlocal stopped
+            result = await self._run_callback(callback_fn, details, url)
+            if result is False:
+                stopped = True
+            return result
+
+        count_processed = 0
+        prefetch_tab = None
+        next_page = None
+        try:
+            await self.search_jobs(site, query, location, time_filter, sort_by=sort_by)
+            urls = await self.collect_job_urls(None)
+            start = 0
+            while True:
+                batch = tracker.accept(urls)
+                # Prefetch the next page while this one is processed
+                if not tracker.stop_reason and tracker.pages < max_pages:
+                    prefetch_tab = prefetch_tab or await self.context.new_page()
+                    next_url = self.search_url(query, location, time_filter, start=start + PAGE_SIZE, sort_by=sort_by)
+                    next_page = asyncio.ensure_future(self._load_result_page(prefetch_tab, next_url))
+                print(f"   📄 [Crawl] Página {tracker.pages}: {len(urls)} ofertas, {len(batch)} nuevas")
+
+                if batch:
+                    count_processed += await self.scan_job_urls_parallel(batch, tracked_callback, max_tabs=parallel_tabs)
+                if stopped:
+                    tracker.stop_reason = "callback"
+                if tracker.stop_reason or next_page is None:
+                    break
+                urls = await next_page
+                next_page = None
+                start += PAGE_SIZE
+        except Exception as e:
+            print(f"Error during crawl: {e}")
+            tracker.stop_reason = tracker.stop_reason or "error"
+        finally:
+            if next_page and not next_page.done():
+                next_page.cancel()
+            if prefetch_tab:
+                try: await prefetch_tab.close()
+                except: pass
+
+        reason = tracker.stop_reason or "max_pages"
+        if watermarks and tracker.complete and tracker.newest:
+            watermarks.set(key, tracker.newest)
+        print(f"   🏁 [Crawl] Fin ({reason}): {count_processed} ofertas en {tracker.pages} páginas "
+              f"({tracker.skipped} ya vistas)")
+        return ScanResult(count_processed, len(tracker.listed), tracker.skipped)
+
+    async def scan_search_results(self, site, limit, callback_fn, parallel_tabs=1):
+        """
+        Iterates through the search results list, clicking each job, 
+        and extracting details from the right pane without leaving the page.
+        With parallel_tabs > 1 the job URLs are collected first and their details
+        are extracted in up to `parallel_tabs` tabs at once (see scan_job_urls_parallel).
+        Returns a ScanResult: jobs passed to callback_fn, cards listed and jobs skipped as already seen.
+        """
+        print(f"Scanning search results (Limit: {limit})...")
+        if site != "linkedin":
+            print("Scan only supported for LinkedIn currently.")
+            return ScanResult()
+
+        if parallel_tabs and parallel_tabs > 1:
+            # Claim while collecting, so jobs already seen don't use up the limit
+            claimed, seen, handled = [], [], set()
+
+            def skip(url):
+                if self._claim(url):
+                    claimed.append(url)
+                    return False
+                seen.append(url)
+                return True
+
+            async def tracked_callback(details, url):
+                handled.add(url)
+                return await self._run_callback(callback_fn, details, url)
+
+            try:
+                urls = await self.collect_job_urls(limit, skip=skip)
+                processed = await self.scan_job_urls_parallel(urls, tracked_callback, max_tabs=parallel_tabs)
+                return ScanResult(processed, len(claimed) + len(seen), len(seen))
+            except Exception as e:
+                print(f"Error during parallel scan: {e}")
+                for url in claimed:
+                    if url not in handled:
+                        self._release(url)
+                return ScanResult(len(handled), len(claimed) + len(seen), len(seen))
+
+        count_processed = 0
+        skipped = 0
+        index = 0
+        try:
+             job_card_selector = await self._find_job_card_selector()
+             
+             # Loop
+             # We use a while loop with re-querying
+             while count_processed < limit:
+                 # Re-query list items every time because DOM might update
+                 cards = await self.page.query_selector_all(job_card_selector)
+                 
+                 if index >= len(cards):
+                     print("   [Scan] Reached end of visible list.")
+                     # Scroll the list container to load more cards
+                     try:
+                         await self._scroll_results(job_card_selector)
+                         cards = await self.page.query_selector_all(job_card_selector)
+                         if index >= len(cards): break # No new items loaded
+                     except:
+                         break
+
+                 card = cards[index]
+                 
+                 # Scroll card into view
+                 try:
+                     await card.scroll_into_view_if_needed()
+                 except: pass
+
+                 # Click it
+                 job_url = "Unknown"
+                 try:
+                     # Find the clickable target inside the card (usually the title or the card itself)
+                     # Clicking the card itself usually works
+                     # We get the Job ID or URL from the card anchor for reference
+                     job_url = await self._card_job_url(card)
+                     
+                     if job_url != "Unknown" and not self._claim(job_url):
+                         skipped += 1
+                         index += 1
+                         continue
+                     print(f"   [Scan] Clicking job {index+1}/{limit}: {job_url}")
+                     
+                     job_id = extract_job_id(job_url)
+                     details = self.job_api.details_for(job_id)
+                     if details:
+                         # Already in the list's JSON payloads: no need to open the right pane
+                         self.job_api.hits += 1
+                     else:
+                         # Click wrapper or link? Try clicking the container div inside the LI
+                         clickable = await card.query_selector("div.job-card-container") or card
+                         # Wait for the right pane to switch to this job (currentJobId in the URL) and settle
+                         await self.pacer.act(
+                             self.page, "click", clickable.click,
+                             predicate="id => !id || location.href.includes('currentJobId=' + id)",
+                             arg=job_id,
+                             stable=".jobs-search__job-details--container",
+                         )
+                         # API payload fetched by the click, else scrape the right pane
+                         details = await self._details_for(job_url)
+                     
+                     # Callback (cards without a link keep "Unknown"; the analysis cache keys them by content)
+                     should_continue = await self._run_callback(callback_fn, details, job_url)
+                     if should_continue is False:
+                         print("   [Scan] Callback requested stop.")
+                         self._release(job_url)
+                         break
+                     
+                     count_processed += 1
+                     index += 1
+
+                 except Exception as e:
+                     print(f"   [Scan] Error processing card {index}: {e}")
+                     if job_url != "Unknown": self._release(job_url)
+                     index += 1
+                     continue
+
+        except Exception as e:
+            print(f"Error during scan: {e}")
+            
+        return ScanResult(count_processed, index, skipped)
+
+    async def click_like_an_ai(self):
+        """
+        Simula la lógica de un Agente AI (como Perplexity):
+        1. Busca por Semántica (Accesibilidad) -> Lo que usan los ciegos (LinkedIn no puede cambiar esto).
+        2. Busca por Texto Visual.
+        3. Busca por Selectores CSS clásicos.
+        4. Inyección de JavaScript (Fuerza bruta).
+        Returns True if clicked, False otherwise.
+        """
+        print("\n   🤖 [Browser] Iniciando protocolo de clic inteligente...")
+
+        # PALABRAS CLAVE (Multilenguaje)
+        # Regex para capturar: "Solicitar", "Solicitud sencilla", "Apply", "Easy Apply"
+        pattern = re.compile(r"(solicitar|apply|sencilla|now)", re.IGNORECASE)
+
+        # ---------------------------------------------------------
+        # ESTRATEGIA 1: Semántica (Accessibility Tree) - LA MEJOR
+        # ---------------------------------------------------------
+        print("      1️⃣  Intentando búsqueda Semántica (Accessibility Role)...")
+        try:
+            # Busca un elemento que SEA un botón y que SE LLAME como el patrón
+            btn = self.page.get_by_role("button", name=pattern).first
+            
+            if await btn.is_visible():
+                print(f"         ✨ ¡Encontrado! Texto: '{(await btn.text_content()).strip()}'")
+                print("         🖱️  Haciendo clic semántico...")
+                await btn.click(timeout=3000)
+                return True
+        except Exception as e:
+            print(f"         ⚠️  Semántica falló: {e}")
+
+        # ---------------------------------------------------------
+        # ESTRATEGIA 2: Texto Visual (Lo que ve el humano)
+        # ---------------------------------------------------------
+        print("      2️⃣  Intentando búsqueda por Texto Visual...")
+        try:
+            text_btn = self.page.get_by_text(pattern).first
+            if await text_btn.is_visible():
+                print("         🖱️  Haciendo clic en texto...")
+                await text_btn.click(force=True)
+                return True
+        except:
+            pass
+
+        # ---------------------------------------------------------
+        # ESTRATEGIA 3: Selectores CSS (Legacy / Backup)
+        # ---------------------------------------------------------
+        print("      3️⃣  Intentando Selectores CSS clásicos...")
+        selectors = [
+            ".jobs-apply-button",
+            ".jobs-s-apply button",
+            "button[aria-label*='Apply']",
+            ".jobs-apply-button--top-card button"
+        ]
+        for sel in selectors:
+            if await self.page.is_visible(sel):
+                print(f"         🎯 Selector encontrado: {sel}")
+                await self.page.locator(sel).first.click()
+                return True
+
+        # ---------------------------------------------------------
+        # ESTRATEGIA 4: Inyección JS (Opción Nuclear)
+        # ---------------------------------------------------------
+        print("      ☢️  Intentando Inyección Directa de JS (Bypass UI)...")
+        result = await self.page.evaluate("""
+            () => {
+                const xpath = "//button[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'apply') or contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'solicitar')]";
+                const btn = document.evaluate(xpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+                if (btn) {
+                    await btn.click();
+                    return true;
+                }
+                return false;
+            }
+        """)
+        
+        if result:
+            print("         ✅ JS Click ejecutado con éxito.")
+            return True
+
+        print("      ❌ [Browser] No se pudo hacer clic con ninguna estrategia.")
+        return False
+
+    async def create_google_sheet(self, report_data, output_filename=None):
+        """Creates the local Excel report (the Sheets upload was disabled and has been removed)."""
+        if not report_data: return
+        
+        # --- LOCAL EXCEL DECISION ---
+        try:
+             import openpyxl
+             import os
+             from openpyxl.styles import Font, PatternFill, Alignment
+             from datetime import datetime
+             
+             # Format: report_1_13_01_2026_10_31.xlsx (Template)
+             template_path = os.path.abspath("report_1_13_01_2026_10_31.xlsx")
+             
+             # Output filename
+             if not output_filename:
+                 timestamp = datetime.now().strftime('%d_%m_%Y_%H_%M')
+                 output_filename = f"reports/report_FILLED_{timestamp}.xlsx"
+             
+             output_path = os.path.abspath(output_filename)
+             
+             # Ensure reports dir exists
+             os.makedirs(os.path.dirname(output_path), exist_ok=True)
+             
+             if os.path.exists(template_path):
+                 print(f"   [Excel] Loading template: {template_path}")
+                 wb = openpyxl.load_workbook(template_path)
+                 ws = wb.active
+             else:
+                 print("   [Excel] Template not found. Creating new workbook.")
+                 wb = openpyxl.Workbook()
+                 ws = wb.active
+                 ws.title = "Job Analysis"
+                 # Headers (Updated)
+                 # Headers (Updated)
+                 headers = ["Priority", "Match %", "Company", "Role", "Location", "Work Mode", "Date", "Source", "URL", "Requirements"]
+                 ws.append(headers)
+                 
+                 # Style Headers
+                 header_fill = PatternFill(start_color="E67E22", end_color="E67E22", fill_type="solid")
+                 header_font = Font(bold=True, color="FFFFFF", size=11)
+                 for col_num, header in enumerate(headers, 1):
+                     cell = ws.cell(row=1, column=col_num)
+                     cell.fill = header_fill
+                     cell.font = header_font
+                     cell.alignment = Alignment(horizontal="center")
+             
+             # Rows
+             for item in report_data:
+                analysis = item['analysis']
+                # MAPPING TO NEW HEADERS: 
+                # [Priority, Match %, Company, Role, Location, Work Mode, Date, Source, URL, Requirements]
+                ws.append([
+                    int(analysis.get('priority_score', 4)), 
+                    f"{analysis.get('match_percentage', 0)}%", 
+                    item.get('company', 'Unknown'),
+                    item.get('role', 'Unknown'), # Extracted Role or Search Term fallback
+                    item.get('location', 'Unknown'),
+                    item.get('work_mode', 'Unknown'),
+                    item.get('date', 'Unknown'),
+                    item['source'],
+                    item['url'],
+                    item.get('raw_requirements', analysis.get('analysis', '')).replace("\n", " ")[:3000] # Limit cell size
+                ])
+             
+             # Auto-adjust columns (Basic)
+             for col in ws.columns:
+                 max_length = 0
+                 column = col[0].column_letter # Get the column name
+                 for cell in col:
+                     try:
+                         if len(str(cell.value)) > max_length:
+                             max_length = len(str(cell.value))
+                     except: pass
+                 adjusted_width = (max_length + 2)
+                 if adjusted_width > 50: adjusted_width = 50 # Cap width
+                 ws.column_dimensions[column].width = adjusted_width
+
+             wb.save(output_path)
+             print(f"\n✅ REPORTE EXCEL CREADO: {output_path}")
+             print("   (Formato: report_1_DD_MM_YYYY_HH_MM.xlsx)")
+             
+        except ImportError:
+             print("   [Error] openpyxl not installed. Skipping Excel creation.")
+        except Exception as e:
+             print(f"   [Error] Excel creation failed: {e}")
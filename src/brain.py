@@ -1,18 +1,165 @@
 import os
+import re
 import json
 import time
+import threading
+import contextlib
+import statistics
+from collections import deque
 # Note: running as module (python -m src.main), so relative import works or absolute
 try:
-    from .gemini_web_client import AntigravityGemini
+    from .gemini_web_client import AntigravityGemini, extract_json_object
+    from .analysis_cache import AnalysisCache, fingerprint
+    from .answer_store import AnswerStore
+    from .prompt_builder import PromptBuilder
+    from .skill_extractor import SkillExtractor
+    from .session_cache import GeminiSessionCache
+    from .llm_router import LLMRouter, GeminiWebBackend, GeminiApiBackend
+    from .llm_telemetry import LLMTelemetry
+    from .cassette import Cassette, CassetteModel
 except ImportError:
-    from src.gemini_web_client import AntigravityGemini
+    from src.gemini_web_client import AntigravityGemini, extract_json_object
+    from src.analysis_cache import AnalysisCache, fingerprint
+    from src.answer_store import AnswerStore
+    from src.prompt_builder import PromptBuilder
+    from src.skill_extractor import SkillExtractor
+    from src.session_cache import GeminiSessionCache
+    from src.llm_router import LLMRouter, GeminiWebBackend, GeminiApiBackend
+    from src.llm_telemetry import LLMTelemetry
+    from src.cassette import Cassette, CassetteModel
+
+# JSON keys that mark a complete response (used for streaming early completion)
+ANALYSIS_KEYS = ("match_percentage", "priority_score", "analysis")
+ANSWER_KEYS = ("answer", "confidence")
+# The web session is free and already holds the profile; the paid API must be clearly faster to win
+API_BACKEND_WEIGHT = 2.0
+# Paid API next to a working web session (failover target). Off: the API is only used when the web client is unavailable
+API_WITH_WEB = False
+# Duplicate slow web calls onto the paid API (only with API_WITH_WEB)
+HEDGE_TO_API = False
+# Web conversation rotation: a fresh chat (re-primed with the compact rules) after N turns,
+# or when the median latency of the last turns exceeds the threshold (the chat got too long)
+ROTATE_AFTER_TURNS = 30
+ROTATE_LATENCY_SECONDS = 30.0
+ROTATE_LATENCY_WINDOW = 3
 
 class JobAnalyzer:
-    def __init__(self, api_key=None, credentials_path="config/credentials.yaml", prompt_path="prompts/analyze_job.txt", profile_path="config/profile_config.json"):
-        import yaml
-        
-        self.client = None
+    def __init__(self, api_key=None, credentials_path="config/credentials.yaml", prompt_path="prompts/analyze_job.txt", profile_path="config/profile_config.json", background=True, cassette=None,
+                 api_with_web=API_WITH_WEB, hedge=HEDGE_TO_API, data_dir="user_data"):
+        """
+        background=True: the LLM backend (cookie scan, handshake, API fallback import) connects on a
+        separate thread so it overlaps with browser startup. The first call that needs
+        `client`/`model` waits for it.
+        cassette: Cassette for record/replay (default: GEMINI_CASSETTE env var). Replay needs no cookies or network.
+        api_with_web / hedge: opt in to the paid API alongside the web session, and to hedging onto it.
+        data_dir: where caches, logs and the saved session live (tests point it at a temp dir).
+        """
+        self._client = None
+        self._model = None
+        self._router = None
+        self._web_backend = None
+        self.api_with_web = api_with_web
+        self.hedge = hedge
         self.gemini_cookies_dict = {}
+        self._backend_ready = threading.Event()
+        self._backend_error = None
+        # Structured per-call LLM metrics (user_data/llm_calls.jsonl + summary for the dashboard)
+        self.data_dir = data_dir
+        self.telemetry = LLMTelemetry(log_path=os.path.join(data_dir, "llm_calls.jsonl"))
+        self.cassette = cassette or Cassette.from_env()
+
+        self.system_prompt = self._load_file(prompt_path)
+        self.profile = self._load_file(profile_path)
+        # Compact prompts: minified profile digest + descriptions without boilerplate
+        # and, per job, only the profile skills the description mentions
+        try:
+            skill_extractor = SkillExtractor(json.loads(self.profile))
+        except Exception:
+            skill_extractor = None
+        self.prompt_builder = PromptBuilder(self.profile, skill_extractor=skill_extractor)
+
+        # Cache persistente de análisis (clave: job_id + hash de oferta/prompt/perfil)
+        self.context_hash = fingerprint(self.system_prompt, self.profile)
+        try:
+            self.analysis_cache = AnalysisCache(db_path=os.path.join(data_dir, "analysis_cache.sqlite"))
+        except Exception as e:
+            print(f"   [Brain] Cache de análisis deshabilitado: {e}")
+            self.analysis_cache = None
+
+        # Memoria de respuestas a formularios (se invalida si cambia el perfil)
+        try:
+            self.answer_store = AnswerStore(db_path=os.path.join(data_dir, "answer_store.sqlite"),
+                                            profile_hash=fingerprint(self.profile))
+        except Exception as e:
+            print(f"   [Brain] Memoria de respuestas deshabilitada: {e}")
+            self.answer_store = None
+        
+        # Labelled history for the local match model (python -m src.match_model train)
+        self.training_log = os.path.join(data_dir, "match_training.jsonl")
+
+        # Session Persistence Logic
+        self.session_file = os.path.join(data_dir, "gemini_session_state.json")
+        self.chat_initialized = False
+        # Per-turn latency of the web conversation (drives rotation; logged for tuning)
+        self.session_turns = 0
+        self.turn_latencies = deque(maxlen=ROTATE_LATENCY_WINDOW)
+        self.turn_log = os.path.join(data_dir, "gemini_turn_latency.jsonl")
+
+        if background:
+            threading.Thread(target=self._connect_backend, args=(credentials_path,), name="JobAnalyzerBackend", daemon=True).start()
+        else:
+            self._connect_backend(credentials_path)
+            self._wait_for_backend()
+
+    @property
+    def client(self):
+        """Gemini Web client (blocks until the background connection finishes)."""
+        self._wait_for_backend()
+        return self._client
+
+    @property
+    def model(self):
+        """Standard API fallback model (blocks until the background connection finishes)."""
+        self._wait_for_backend()
+        return self._model
+
+    @property
+    def router(self):
+        """LLMRouter over every connected backend (blocks until the background connection finishes)."""
+        self._wait_for_backend()
+        return self._router
+
+    def _wait_for_backend(self):
+        """Blocks until the connection finishes and re-raises its error in the caller's thread."""
+        if not self._backend_ready.is_set():
+            print("   [Brain] Esperando conexión del backend LLM...")
+            self._backend_ready.wait()
+        if self._backend_error is not None:
+            raise RuntimeError(f"Backend LLM no disponible: {self._backend_error}") from self._backend_error
+
+    def _connect_backend(self, credentials_path):
+        """Runs the backend connection and always releases the waiters."""
+        started = time.time()
+        try:
+            self._connect_backend_inner(credentials_path)
+        except Exception as e:
+            print(f"   [Brain] Error inicializando backend: {e}")
+            self._backend_error = e
+        finally:
+            print(f"   [Brain] Backend listo en {time.time() - started:.1f}s.")
+            self._backend_ready.set()
+
+    def _connect_backend_inner(self, credentials_path):
+        """Cookie scan + Gemini Web handshake (or API fallback) + session restore."""
+        import yaml
+
+        if self.cassette and self.cassette.replaying:
+            # Offline: backends serve recorded responses; no cookies, handshake or saved session
+            self._client = AntigravityGemini({}, cassette=self.cassette) if self.cassette.has("web") else None
+            self._model = CassetteModel(None, self.cassette) if self.cassette.has("api") else None
+            self._build_router()
+            print(f"[Brain] Modo replay ({self.cassette.stats()['recorded']} respuestas grabadas).")
+            return
 
         # 1. Try Config File
         gemini_cookie_val = None
@@ -24,8 +171,99 @@ class JobAnalyzer:
         if gemini_cookie_val and "PEGAR" not in gemini_cookie_val:
             self.gemini_cookies_dict["__Secure-1PSID"] = gemini_cookie_val
 
-        # 2. MAGIC: Robust Browser Extraction (Ported from dev/promt)
-        # Always try to refresh/enrich from browser if possible using the robust method
+        # 2. Disk cache (cookies + nonce) shared by the search and apply bots
+        self.session_cache = GeminiSessionCache(path=os.path.join(self.data_dir, "gemini_handshake_cache.json"),
+                                                source=gemini_cookie_val)
+        cached_session = self.session_cache.load()
+        if cached_session:
+            print("   [Brain] Sesión Gemini en cache. Saltando escaneo de cookies.")
+            self.gemini_cookies_dict.update(cached_session["cookies"])
+        else:
+            # 3. MAGIC: Robust Browser Extraction (Ported from dev/promt)
+            # Always try to refresh/enrich from browser if possible using the robust method
+            self.gemini_cookies_dict.update(self._scan_browser_cookies())
+
+        if not self.gemini_cookies_dict.get("__Secure-1PSID"):
+             print("Warning: Could not find Gemini Cookie (Config or Browser). Analysis will fail.")
+             self._client = None
+        else:
+             print("[Brain] Inicializando cliente nativo...")
+             try:
+                 self._client = AntigravityGemini(
+                     self.gemini_cookies_dict,
+                     session_cache=self.session_cache,
+                     cookie_refresher=self._scan_browser_cookies,
+                     cassette=self.cassette
+                 )
+             except Exception as e:
+                 print(f"   [Brain] Error conectando con Gemini Web: {e}")
+                 self._client = None
+
+        # Standard API (paid): only backend if the web client failed; alongside it only when opted in
+        if self._client and not self.api_with_web:
+            print("[Brain] Standard API no configurada (sesión web activa; api_with_web=False).")
+            self._build_router()
+            self._restore_session()
+            return
+        print("[Brain] Configurando Standard API Key como backend...")
+        try:
+            import google.generativeai as genai
+            # Check env var or creds
+            api_key = os.getenv("GEMINI_API_KEY")
+            if not api_key and os.path.exists(credentials_path):
+                 with open(credentials_path, 'r') as f:
+                    creds = yaml.safe_load(f)
+                    api_key = creds.get("gemini", {}).get("api_key")
+            
+            if api_key:
+                genai.configure(api_key=api_key)
+                # Use a model we know exists or try valid ones
+                self._model = genai.GenerativeModel('gemini-1.5-flash')
+                if self.cassette:
+                    self._model = CassetteModel(self._model, self.cassette)
+                print("[Brain] API Oficial disponible (gemini-1.5-flash)")
+            else:
+                print("[Brain] No se encontró API Key para fallback.")
+        except Exception as e:
+            print(f"   [Brain] Fallback API failed: {e}")
+
+        self._build_router()
+        self._restore_session()
+
+    def _restore_session(self):
+        """Session Persistence Logic: restore the persisted web conversation."""
+        # (not while recording: a cassette starts from a fresh, reproducible conversation)
+        if self._client and not self.cassette and os.path.exists(self.session_file):
+            try:
+                with open(self.session_file, "r") as f:
+                    session_state = json.load(f)
+                    self._client.set_context(session_state)
+                    # If we have a session ID, we assume context (rules) is already there
+                    if session_state.get("conversation_id"):
+                        self.session_turns = session_state.get("turns", 0)
+                        print(f"   [Brain] Sesión 'JobSearch' recuperada ({self.session_turns} turnos). Saltando re-entrenamiento.")
+                        self.chat_initialized = True
+            except Exception as e:
+                print(f"Warning loading session: {e}")
+
+    def _build_router(self):
+        self._web_backend = GeminiWebBackend(self._client, on_turn=self._on_web_turn) if self._client else None
+        self._router = LLMRouter([
+            self._web_backend,
+            GeminiApiBackend(self._model, weight=API_BACKEND_WEIGHT) if self._model else None,
+        ], hedge=self.hedge, telemetry=self.telemetry)
+        print(f"[Brain] Backends LLM: {[b.name for b in self._router.backends] or 'ninguno'}")
+
+    def close(self):
+        """Shuts down the router's worker threads and flushes the analysis cache."""
+        if self._router:
+            self._router.close()
+        if self.analysis_cache:
+            self.analysis_cache.close()
+
+    def _scan_browser_cookies(self):
+        """Scans local Chrome profiles for the Gemini session cookies."""
+        cookies = {}
         print("   [Brain] Escaneando cookies en navegador (Método Robusto)...")
         try:
             import browser_cookie3
@@ -45,7 +283,7 @@ class JobAnalyzer:
                     found_in_path = False
                     for c in cj_temp:
                             if c.name in ["__Secure-1PSID", "__Secure-1PSIDTS"]:
-                                self.gemini_cookies_dict[c.name] = c.value
+                                cookies[c.name] = c.value
                                 found_in_path = True
                     
                     if found_in_path:
@@ -55,58 +293,19 @@ class JobAnalyzer:
                     continue
         except Exception as e:
             print(f"   [Brain] Auto-extraction failed: {e}")
+        return cookies
 
-        if not self.gemini_cookies_dict.get("__Secure-1PSID"):
-             print("Warning: Could not find Gemini Cookie (Config or Browser). Analysis will fail.")
-             self.client = None
-        else:
-             print("[Brain] Inicializando cliente nativo...")
-             try:
-                 self.client = AntigravityGemini(self.gemini_cookies_dict)
-             except Exception as e:
-                 print(f"   [Brain] Error conectando con Gemini Web: {e}")
-                 self.client = None
-
-        # FALLBACK: If Web Client failed, try Standard API
-        if not self.client:
-            print("[Brain] Intentando fallback to Standard API Key...")
-            try:
-                import google.generativeai as genai
-                # Check env var or creds
-                api_key = os.getenv("GEMINI_API_KEY")
-                if not api_key and os.path.exists(credentials_path):
-                     with open(credentials_path, 'r') as f:
-                        creds = yaml.safe_load(f)
-                        api_key = creds.get("gemini", {}).get("api_key")
-                
-                if api_key:
-                    genai.configure(api_key=api_key)
-                    # Use a model we know exists or try valid ones
-                    self.model = genai.GenerativeModel('gemini-1.5-flash')
-                    print("[Brain] Fallback exitoso: Usando API Oficial (gemini-1.5-flash)")
-                else:
-                    print("[Brain] No se encontró API Key para fallback.")
-            except Exception as e:
-                print(f"   [Brain] Fallback API failed: {e}")
-
-        self.system_prompt = self._load_file(prompt_path)
-        self.profile = self._load_file(profile_path)
-        
-        # Session Persistence Logic
-        self.session_file = "user_data/gemini_session_state.json"
-        self.chat_initialized = False
-        
-        if self.client and os.path.exists(self.session_file):
-            try:
-                with open(self.session_file, "r") as f:
-                    session_state = json.load(f)
-                    self.client.set_context(session_state)
-                    # If we have a session ID, we assume context (rules) is already there
-                    if session_state.get("conversation_id"):
-                        print(f"   [Brain] Sesión 'JobSearch' recuperada. Saltando re-entrenamiento.")
-                        self.chat_initialized = True
-            except Exception as e:
-                print(f"Warning loading session: {e}")
+    def llm_stats(self):
+        """LLM telemetry summary plus router/cache/prompt counters, for the run's status data."""
+        stats = self.telemetry.summary()
+        if self._router:
+            stats["router"] = self._router.stats()
+        if self.analysis_cache:
+            stats["analysis_cache"] = self.analysis_cache.stats()
+        if self.answer_store:
+            stats["answer_store"] = self.answer_store.stats()
+        stats["prompt_savings"] = self.prompt_builder.stats()
+        return stats
 
     def _load_file(self, path):
         """Loads text or JSON from file."""
@@ -119,12 +318,49 @@ class JobAnalyzer:
 
     def _save_session(self):
         """Saves current chat session to file."""
-        if self.client:
+        if self.client and not self.cassette:
             state = self.client.get_context()
             if state.get("conversation_id"):
+                state["turns"] = self.session_turns
                 with open(self.session_file, "w") as f:
                     json.dump(state, f)
-                print("   [Brain] Sesión guardada en disco.")
+
+    def _on_web_turn(self, latency, prompt_bytes, ok):
+        """Called by the web backend after every message: counts turns and logs latency."""
+        self.session_turns += 1
+        self.turn_latencies.append(latency)
+        conversation_id = self._client.get_context().get("conversation_id", "") if self._client else ""
+        print(f"   ⏱️ [Brain] Turno {self.session_turns} de la conversación: {latency:.1f}s ({prompt_bytes}B)")
+        try:
+            with open(self.turn_log, "a", encoding="utf-8") as f:
+                f.write(json.dumps({
+                    "ts": time.time(), "conversation_id": conversation_id, "turn": self.session_turns,
+                    "latency": round(latency, 3), "prompt_bytes": prompt_bytes, "ok": ok
+                }) + "\n")
+        except Exception as e:
+            print(f"   [Brain] No se pudo registrar latencia: {e}")
+        self._save_session()
+
+    def _rotation_reason(self):
+        if self.session_turns >= ROTATE_AFTER_TURNS:
+            return f"{self.session_turns} turnos"
+        if len(self.turn_latencies) == ROTATE_LATENCY_WINDOW:
+            median = statistics.median(self.turn_latencies)
+            if median > ROTATE_LATENCY_SECONDS:
+                return f"latencia mediana {median:.1f}s > {ROTATE_LATENCY_SECONDS:.0f}s"
+        return None
+
+    def _prepare_web_session(self):
+        """Rotates the web conversation if the policy says so, and primes it if needed."""
+        # Same lock as the web backend: a hedged call that lost may still be talking to this conversation
+        with self._web_backend.lock if self._web_backend else contextlib.nullcontext():
+            reason = self.chat_initialized and self._rotation_reason()
+            if reason:
+                print(f"   ♻️ [Brain] Rotando conversación ({reason}).")
+                self.client.reset_context()
+                self.chat_initialized = False
+            if not self.chat_initialized:
+                self._initialize_chat()
 
     def _initialize_chat(self):
         """Sends the initial system prompt and profile to context."""
@@ -134,91 +370,299 @@ class JobAnalyzer:
         # Create a condensed initial message to set the stage
         initial_msg = (
             f"IDENTIFICADOR DE SESION: JOB_SEARCH_AUTO_2026\n\n"
-            f"ACT AS A RECRUITER AI. HERE ARE THE RULES:\n{self.system_prompt}\n\n"
-            f"HERE IS THE CANDIDATE PROFILE:\n{self.profile}\n\n"
+            f"ACT AS A RECRUITER AI. HERE ARE THE RULES:\n{self.prompt_builder.compact_rules(self.system_prompt)}\n\n"
+            f"HERE IS THE CANDIDATE PROFILE:\n{self.prompt_builder.digest}\n\n"
             "Confirma con un simple 'LISTO' si entendiste las instrucciones y el perfil."
         )
+        self.prompt_builder.record(initial_msg.replace(self.prompt_builder.compact_rules(self.system_prompt), self.system_prompt), initial_msg, "prime")
         try:
+            started = time.time()
             resp = self.client.chat(initial_msg)
+            stats = getattr(self.client, "last_call", {}) or {}
+            self.telemetry.record(
+                "init", "web", request_bytes=len(initial_msg.encode("utf-8")), response_bytes=len((resp or "").encode("utf-8")),
+                attempts=stats.get("attempts", 1), rate_limited=stats.get("rate_limited", 0),
+                wait_seconds=stats.get("wait_seconds", 0.0), network_seconds=stats.get("network_seconds", 0.0),
+                parse_ok=bool(resp) and not resp.startswith("Error:"), latency=time.time() - started
+            )
             print(f"   [Brain] Respuesta inicial: {resp}")
             self.chat_initialized = True
+            self.session_turns = 0
+            self.turn_latencies.clear()
             self._save_session() # Save immediately after init
+            print("   [Brain] Sesión guardada en disco.")
         except Exception as e:
             print(f"   [Brain] Error inicializando chat: {e}")
 
-    def analyze(self, job_html_or_text):
-        """Analyzes the job description against the profile using persistent chat or API."""
+    def analyze(self, job_html_or_text, job_id=None):
+        """
+        Analyzes the job description against the profile using persistent chat or API.
+        Results are served from the on-disk analysis cache when the same job/profile was seen before.
+        """
         if not job_html_or_text:
             return None
-        
-        # 1. Try Web Client
-        if self.client:
-             if not self.chat_initialized:
-                 self._initialize_chat()
-             
-             print("   [Brain] Enviando oferta para análisis (Web Session)...")
-             prompt = f"""
-             CANDIDATO:
-             {self.profile}
-             
-             ANALIZA ESTA OFERTA (Fecha: {job_html_or_text}):
-             Responde ÚNICAMENTE en JSON con keys: match_percentage (0-100), priority_score (1-5), analysis (resumen).
-             """
-             response_text = self.client.chat(prompt)
-             if not response_text: return None
-             
-             try:
-                 clean_text = response_text.replace("```json", "").replace("```", "").strip()
-                 if "{" in clean_text:
-                     start = clean_text.find("{")
-                     end = clean_text.rfind("}") + 1
-                     clean_text = clean_text[start:end]
-                 return json.loads(clean_text)
-             except Exception as e:
-                 print(f"Error parsing JSON: {e}")
-                 return None
-
-        # 2. Try Standard API (Fallback)
-        elif hasattr(self, 'model') and self.model:
-             print("   [Brain] Enviando oferta para análisis (Standard API)...")
-             prompt = f"""
-             {self.system_prompt}
-             CANDIDATE PROFILE: {self.profile}
-             JOB DESCRIPTION: {job_html_or_text}
-             """
-             try:
-                 response = self.model.generate_content(prompt, generation_config={"response_mime_type": "application/json"})
-                 return json.loads(response.text)
-             except Exception as e:
-                 print(f"   [Brain] API Error: {e}")
-                 return None
-        
-        else:
+        return self._analyze_cached(job_html_or_text, job_id)
+
+    def _analyze_cached(self, job_html_or_text, job_id=None, count=True):
+        """analyze() body; count=False when the cache lookup was already counted (analyze_batch fallback)."""
+        if not self.analysis_cache:
+            return self._analyze_and_log(job_html_or_text)
+
+        # The publication date ("2 hours ago") changes between runs; don't let it break the key
+        cache_body = re.sub(r"^PUBLICATION DATE:.*\n+", "", job_html_or_text)
+        key = self.analysis_cache.make_key(job_id, cache_body, self.context_hash)
+        result = self.analysis_cache.get_or_compute(key, lambda: self._analyze_and_log(job_html_or_text),
+                                                    job_id=job_id, count=count)
+        stats = self.analysis_cache.stats()
+        print(f"   [Brain] Cache análisis: {stats['hits']} hits / {stats['misses']} misses ({stats['entries']} en disco)")
+        return result
+
+    def _analyze_and_log(self, job_html_or_text):
+        result = self._analyze_uncached(job_html_or_text)
+        self._log_training_example(job_html_or_text, result)
+        return result
+
+    def _log_training_example(self, job_html_or_text, analysis):
+        """Appends an LLM-labelled job to the match model training log."""
+        if not isinstance(analysis, dict) or analysis.get("match_percentage") is None:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.training_log), exist_ok=True)
+            with open(self.training_log, "a", encoding="utf-8") as f:
+                f.write(json.dumps({
+                    "text": re.sub(r"^PUBLICATION DATE:.*\n+", "", job_html_or_text),
+                    "match_percentage": analysis.get("match_percentage"),
+                    "priority_score": analysis.get("priority_score"),
+                    "ts": time.time()
+                }, ensure_ascii=False) + "\n")
+        except Exception as e:
+            print(f"   [Brain] No se pudo guardar ejemplo de entrenamiento: {e}")
+
+    def _analyze_uncached(self, job_html_or_text):
+        """Sends the job to the healthiest LLM backend (no cache)."""
+        router = self.router
+        if not router:
              print("[Brain] No brain backend available (No Client, No API). Skipping analysis.")
              return None
 
+        self._record_call("analyze", text=job_html_or_text)
+        slim = self.prompt_builder.slim_description(job_html_or_text)
+
+        def build_prompt(backend):
+            # 1. Web Session: rules/profile may already live in the conversation
+            if backend.stateful:
+                 self._prepare_web_session()
+                 print("   [Brain] Enviando oferta para análisis (Web Session)...")
+                 prompt = (
+                     f"CANDIDATO:\n{self.prompt_builder.profile_block(session_has_profile=self.chat_initialized, description=job_html_or_text)}\n\n"
+                     f"ANALIZA ESTA OFERTA (Fecha: {slim}):\n"
+                     "Responde ÚNICAMENTE en JSON con keys: match_percentage (0-100), priority_score (1-5), analysis (resumen)."
+                 )
+                 self.prompt_builder.record(f"CANDIDATO:\n{self.profile}\n\nANALIZA ESTA OFERTA (Fecha: {job_html_or_text}):\n", prompt, "analyze")
+                 return prompt
+            # 2. Standard API: stateless, full rules + digest
+            print("   [Brain] Enviando oferta para análisis (Standard API)...")
+            prompt = (
+                 f"{self.system_prompt}\n"
+                 f"CANDIDATE PROFILE: {self.prompt_builder.digest_for(job_html_or_text)}\n"
+                 f"JOB DESCRIPTION: {slim}"
+            )
+            self.prompt_builder.record(f"{self.system_prompt}\nCANDIDATE PROFILE: {self.profile}\nJOB DESCRIPTION: {job_html_or_text}", prompt, "analyze")
+            return prompt
+
+        # Streaming on the web backend: returns as soon as the JSON verdict is complete
+        response_text = router.call(build_prompt, required_keys=ANALYSIS_KEYS, validate=self._has_keys(ANALYSIS_KEYS), purpose="analyze")
+        if not response_text: return None
+        try:
+            return self._parse_json_object(response_text)
+        except Exception as e:
+            print(f"Error parsing JSON: {e}")
+            return None
+
+    def _record_call(self, method, **args):
+        """While recording a cassette, keeps the LLM call exactly as it was made (for replay_call)."""
+        if self.cassette and not self.cassette.replaying:
+            self.cassette.record_call(method, **args)
+
+    def replay_call(self, call):
+        """Re-runs a call recorded in the cassette through the same entry point. Returns its analyses."""
+        if call["method"] == "analyze_batch":
+            parsed = self._analyze_batch_uncached(call["jobs"])
+            for analysis in parsed.values():
+                if isinstance(analysis, dict): analysis.pop("job_id", None)  # Same shape as analyze_batch
+            return [parsed.get(bid) for bid in call["jobs"]]
+        return [self._analyze_uncached(call["text"])]
+
+    @staticmethod
+    def _has_keys(required_keys):
+        """Router validator: the response must contain a JSON object with these keys."""
+        return lambda text: extract_json_object(text, required_keys) is not None
+
+    @staticmethod
+    def _parse_json_object(response_text):
+        """Extracts the JSON object from a response (tolerates ``` fences and surrounding text)."""
+        clean_text = response_text.replace("```json", "").replace("```", "").strip()
+        if "{" in clean_text:
+            start = clean_text.find("{")
+            end = clean_text.rfind("}") + 1
+            clean_text = clean_text[start:end]
+        return json.loads(clean_text)
+
+    def analyze_batch(self, jobs, max_retries=1):
+        """
+        Analyzes several jobs in ONE LLM request.
+        jobs: list of dicts {"job_id": ..., "text": ...}. Returns a list of analyses (or None) in the same order.
+        Cached jobs are served from disk; only jobs whose result could not be parsed are retried.
+        """
+        results = {}
+        pending = {}  # stable batch id -> (job_id, text, cache_key)
+        order = []
+
+        for job in jobs:
+            text = job.get("text")
+            if not text:
+                order.append(None)
+                continue
+            cache_body = re.sub(r"^PUBLICATION DATE:.*\n+", "", text)
+            # Stable per-job ID: LinkedIn ID when known, content hash otherwise
+            batch_id = str(job.get("job_id") or f"H{fingerprint(cache_body)[:10]}")
+            order.append(batch_id)
+            if batch_id in results: continue
+            results[batch_id] = None
+
+            cache_key = None
+            if self.analysis_cache:
+                cache_key = self.analysis_cache.make_key(job.get("job_id"), cache_body, self.context_hash)
+                cached = self.analysis_cache.lookup(cache_key)
+                if cached is not None:
+                    results[batch_id] = cached
+                    continue
+            pending[batch_id] = (job.get("job_id"), text, cache_key)
+
+        if pending:
+            print(f"   [Brain] Lote: {len(results) - len(pending)} desde cache, {len(pending)} al LLM.")
+
+        attempt = 0
+        while pending and attempt <= max_retries:
+            attempt += 1
+            parsed = self._analyze_batch_uncached({bid: text for bid, (_, text, _) in pending.items()})
+            for bid, analysis in parsed.items():
+                if bid not in pending or not isinstance(analysis, dict): continue
+                job_id, text, cache_key = pending.pop(bid)
+                analysis.pop("job_id", None)
+                results[bid] = analysis
+                self._log_training_example(text, analysis)
+                if self.analysis_cache and cache_key:
+                    self.analysis_cache.put(cache_key, analysis, job_id=job_id)
+            if pending:
+                print(f"   [Brain] Lote intento {attempt}: {len(pending)} ofertas sin respuesta válida.")
+
+        # Last resort: jobs the batch could not resolve go one by one (their cache miss is already counted)
+        for bid, (job_id, text, _) in pending.items():
+            results[bid] = self._analyze_cached(text, job_id=job_id, count=False)
+
+        return [results.get(bid) if bid else None for bid in order]
+
+    def _analyze_batch_uncached(self, jobs_by_id):
+        """Sends {batch_id: text} in a single prompt and parses back a JSON array. Returns {batch_id: dict}."""
+        raw_blocks = "\n\n".join(
+            f"=== JOB_ID: {bid} ===\n{text}\n=== END JOB_ID: {bid} ===" for bid, text in jobs_by_id.items()
+        )
+        blocks = "\n\n".join(
+            f"=== JOB_ID: {bid} ===\n{self.prompt_builder.slim_description(text)}\n=== END JOB_ID: {bid} ==="
+            for bid, text in jobs_by_id.items()
+        )
+        all_text = "\n".join(jobs_by_id.values())
+        instructions = (
+            f"ANALIZA ESTAS {len(jobs_by_id)} OFERTAS DE FORMA INDEPENDIENTE.\n"
+            "Responde ÚNICAMENTE con un JSON array, un objeto por oferta, con keys: "
+            "job_id (exactamente el JOB_ID recibido), match_percentage (0-100), priority_score (1-5), analysis (resumen).\n\n"
+        )
+
+        router = self.router
+        if not router:
+            print("[Brain] No brain backend available (No Client, No API). Skipping analysis.")
+            return {}
+        self._record_call("analyze_batch", jobs=jobs_by_id)
+
+        def build_prompt(backend):
+            if backend.stateful:
+                self._prepare_web_session()
+                print(f"   [Brain] Enviando lote de {len(jobs_by_id)} ofertas (Web Session)...")
+                prompt = f"CANDIDATO:\n{self.prompt_builder.profile_block(session_has_profile=self.chat_initialized, description=all_text)}\n\n{instructions}{blocks}"
+                self.prompt_builder.record(f"CANDIDATO:\n{self.profile}\n\n{instructions}{raw_blocks}", prompt, "analyze_batch")
+                return prompt
+            print(f"   [Brain] Enviando lote de {len(jobs_by_id)} ofertas (Standard API)...")
+            prompt = f"{self.system_prompt}\nCANDIDATE PROFILE: {self.prompt_builder.digest_for(all_text)}\n\n{instructions}{blocks}"
+            self.prompt_builder.record(f"{self.system_prompt}\nCANDIDATE PROFILE: {self.profile}\n\n{instructions}{raw_blocks}", prompt, "analyze_batch")
+            return prompt
+
+        try:
+            response_text = router.call(build_prompt, validate=lambda text: bool(self._parse_batch_response(text)), purpose="analyze_batch")
+        except Exception as e:
+            print(f"   [Brain] Error en lote: {e}")
+            return {}
+
+        return self._parse_batch_response(response_text)
+
+    @staticmethod
+    def _parse_batch_response(response_text):
+        """Parses a JSON array of analyses (tolerates ``` fences and one bad element)."""
+        if not response_text: return {}
+        clean_text = response_text.replace("```json", "").replace("```", "").strip()
+
+        items = None
+        start = clean_text.find("[")
+        end = clean_text.rfind("]") + 1
+        if start != -1 and end > start:
+            try:
+                items = json.loads(clean_text[start:end])
+            except Exception:
+                items = None
+        if not isinstance(items, list):
+            # Array is broken or truncated: salvage every standalone {...} object we can decode
+            items = []
+            decoder = json.JSONDecoder()
+            pos = clean_text.find("{")
+            while pos != -1:
+                try:
+                    obj, end_pos = decoder.raw_decode(clean_text, pos)
+                    items.append(obj)
+                    pos = clean_text.find("{", end_pos)
+                except Exception:
+                    pos = clean_text.find("{", pos + 1)
+
+        parsed = {}
+        for item in items:
+            if isinstance(item, dict) and item.get("job_id") is not None and "match_percentage" in item:
+                parsed[str(item["job_id"])] = item
+        return parsed
+
     def answer_question(self, question, options=None):
         """
         Asks the AI to answer a specific application question based on the profile.
         Returns: String answer or None.
         """
         if not question: return None
-        
-        # Initialize if needed
-        if self.client and not self.chat_initialized:
-            self._initialize_chat()
 
+        # 0. Answer memory: near-identical questions with the same options skip the LLM
+        if self.answer_store:
+            cached = self.answer_store.lookup(question, options)
+            if cached and (not options or cached["answer"] in options):
+                print(f"   💾 [Brain] Answer (memoria, sim={cached['similarity']}): {cached['answer']}")
+                return cached["answer"]
+        
         print(f"   🧠 [Brain] Thinking about: '{question}'...")
         
         options_text = f"OPTIONS: {options}" if options else "OPTIONS: Open text (Keep it short and professional)"
         
-        prompt = f"""
+        prompt_template = f"""
         TASK: Answer this job application question acting as the candidate.
         QUESTION: "{question}"
         {options_text}
         
         CANDIDATE PROFILE:
-        {self.profile}
+        {{profile}}
         
         INSTRUCTIONS:
         1. **ROLE:** You are the candidate's intelligent agent. Your SOLE GOAL is to get them to the next stage (Interview).
@@ -240,24 +684,29 @@ class JobAnalyzer:
         
         FORMAT: Respond formatted strictly as JSON: {{ "answer": "YOUR_ANSWER", "confidence": "High/Medium/Low", "reasoning": "brief reason" }}
         """
-        
-        response_text = None
+        router = self.router
+        if not router:
+            print("[Brain] No brain backend available (No Client, No API).")
+            return None
+
+        def build_prompt(backend):
+            # Initialize (or rotate) the web conversation if needed
+            if backend.stateful:
+                self._prepare_web_session()
+            # Compact: profile reference (web session already has it) or digest, and no indentation padding
+            profile_block = self.prompt_builder.profile_block(session_has_profile=bool(backend.stateful and self.chat_initialized))
+            prompt = re.sub(r"\n[ \t]+", "\n", prompt_template.replace("{profile}", profile_block)).strip()
+            self.prompt_builder.record(prompt_template.replace("{profile}", self.profile), prompt, "answer")
+            return prompt
+
         try:
-            if self.client:
-                 response_text = self.client.chat(prompt)
-            elif hasattr(self, 'model') and self.model:
-                 response = self.model.generate_content(prompt, generation_config={"response_mime_type": "application/json"})
-                 response_text = response.text
-            
+            response_text = router.call(build_prompt, required_keys=ANSWER_KEYS, validate=self._has_keys(ANSWER_KEYS), purpose="answer")
             if response_text:
                 try:
-                    clean_text = response_text.replace("```json", "").replace("```", "").strip()
-                    if "{" in clean_text:
-                         start = clean_text.find("{")
-                         end = clean_text.rfind("}") + 1
-                         clean_text = clean_text[start:end]
-                    data = json.loads(clean_text)
+                    data = self._parse_json_object(response_text)
                     print(f"   💡 [Brain] Answer: {data.get('answer')} (Confidence: {data.get('confidence')})")
+                    if self.answer_store and data.get("answer") is not None:
+                        self.answer_store.put(question, options, data.get("answer"), data.get("confidence") or "Low")
                     return data.get("answer")
                 except:
                     print(f"   ⚠️ [Brain] Could not parse AI answer: {response_text[:50]}...")
@@ -0,0 +1,207 @@
+import os
+import json
+import time
+import hashlib
+import argparse
+import threading
+
+MODE_RECORD = "record"
+MODE_REPLAY = "replay"
+
+
+def request_fingerprint(kind, model, prompt):
+    """Huella estable de la petición (sin nonce, req_id ni ids de conversación)."""
+    return hashlib.sha256(json.dumps([kind, model, prompt], ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+class CassetteMiss(Exception):
+    """La petición no está grabada en el cassette (modo replay)."""
+
+
+class ReplayResponse:
+    """Imita lo que usa el cliente de requests.Response: text, iter_lines(), raise_for_status(), close()."""
+
+    status_code = 200
+
+    def __init__(self, body):
+        self.text = body
+
+    def iter_lines(self, decode_unicode=True):
+        for line in self.text.splitlines():
+            yield line
+
+    def raise_for_status(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class Cassette:
+    """
+    Grabación/reproducción de respuestas LLM para benchmarks y regresiones offline.
+    - record: guarda la huella de cada petición y el cuerpo crudo de la respuesta
+      (StreamGenerate para el cliente web, response.text para la API) con su latencia.
+    - replay: sirve las respuestas grabadas sin red ni cookies.
+      latency="recorded" duerme la latencia grabada, "none" no duerme, y un número
+      fija una latencia sintética en segundos.
+    Si la misma petición se grabó varias veces se sirven en orden (la última se repite).
+    calls guarda además cada llamada al LLM de JobAnalyzer (método + textos tal cual),
+    para que el benchmark las repita por el mismo punto de entrada y con los mismos prompts.
+    """
+
+    def __init__(self, path, mode=MODE_REPLAY, latency="recorded"):
+        if mode not in (MODE_RECORD, MODE_REPLAY):
+            raise ValueError(f"Cassette mode must be '{MODE_RECORD}' or '{MODE_REPLAY}', not {mode!r}")
+        self.path = path
+        self.mode = mode
+        self.latency = latency
+        self.hits = 0
+        self.misses = 0
+        self._served = {}
+        self._lock = threading.Lock()
+        self.interactions = {}
+        self.calls = []
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.interactions = data.get("interactions", {})
+            self.calls = data.get("calls", [])
+        elif mode == MODE_REPLAY:
+            raise FileNotFoundError(f"Cassette not found: {path}")
+
+    @classmethod
+    def from_env(cls):
+        """GEMINI_CASSETTE=<ruta>, GEMINI_CASSETTE_MODE=record|replay, GEMINI_CASSETTE_LATENCY=recorded|none|<segundos>."""
+        path = os.getenv("GEMINI_CASSETTE")
+        if not path:
+            return None
+        latency = os.getenv("GEMINI_CASSETTE_LATENCY", "recorded")
+        try:
+            latency = float(latency)
+        except ValueError:
+            pass
+        return cls(path, mode=os.getenv("GEMINI_CASSETTE_MODE", MODE_REPLAY), latency=latency)
+
+    @property
+    def replaying(self):
+        return self.mode == MODE_REPLAY
+
+    def has(self, kind):
+        """¿Hay grabaciones de este tipo ("web" / "api")?"""
+        return any(entries and entries[0].get("kind") == kind for entries in self.interactions.values())
+
+    def record(self, kind, model, prompt, body, latency):
+        key = request_fingerprint(kind, model, prompt)
+        with self._lock:
+            self.interactions.setdefault(key, []).append({
+                "kind": kind,
+                "model": model,
+                "prompt_bytes": len(prompt.encode("utf-8")),
+                "body": body,
+                "latency": round(latency, 3),
+                "recorded_at": time.time(),
+            })
+            self._save()
+
+    def record_call(self, method, **args):
+        """Registra una llamada de JobAnalyzer ("analyze" con text, "analyze_batch" con jobs)."""
+        with self._lock:
+            self.calls.append(dict(args, method=method))
+            self._save()
+
+    def replay(self, kind, model, prompt):
+        """Devuelve el cuerpo grabado (tras la latencia configurada) o lanza CassetteMiss."""
+        key = request_fingerprint(kind, model, prompt)
+        with self._lock:
+            entries = self.interactions.get(key)
+            if not entries:
+                self.misses += 1
+                raise CassetteMiss(f"No recorded {kind} response for prompt {key[:12]}")
+            index = self._served.get(key, 0)
+            self._served[key] = index + 1
+            self.hits += 1
+            entry = entries[min(index, len(entries) - 1)]
+
+        if self.latency == "recorded":
+            time.sleep(entry.get("latency", 0.0))
+        elif isinstance(self.latency, (int, float)) and self.latency > 0:
+            time.sleep(self.latency)
+        return entry["body"]
+
+    def _save(self):
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": 1, "interactions": self.interactions, "calls": self.calls}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def stats(self):
+        return {
+            "mode": self.mode,
+            "recorded": sum(len(v) for v in self.interactions.values()),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+class _ApiReplayResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class CassetteModel:
+    """Envoltorio de google.generativeai.GenerativeModel con record/replay (model puede ser None en replay)."""
+
+    def __init__(self, model, cassette, model_name="gemini-1.5-flash"):
+        self.model = model
+        self.cassette = cassette
+        self.model_name = model_name
+
+    def generate_content(self, prompt, generation_config=None):
+        if self.cassette.replaying:
+            return _ApiReplayResponse(self.cassette.replay("api", self.model_name, prompt))
+        started = time.time()
+        response = self.model.generate_content(prompt, generation_config=generation_config)
+        self.cassette.record("api", self.model_name, prompt, response.text, time.time() - started)
+        return response
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cassettes LLM: inspección y benchmark offline del pipeline de análisis.")
+    parser.add_argument("command", choices=["info", "bench"])
+    parser.add_argument("cassette")
+    parser.add_argument("--limit", type=int, default=0, help="Solo las primeras N llamadas grabadas")
+    parser.add_argument("--latency", default="recorded", help="recorded | none | segundos")
+    args = parser.parse_args()
+
+    cassette = Cassette(args.cassette, mode=MODE_REPLAY, latency=args.latency)
+    if args.command == "info":
+        print(json.dumps(dict(cassette.stats(), calls=len(cassette.calls)), indent=2))
+        return
+    if not cassette.calls:
+        print("❌ [Bench] El cassette no tiene llamadas grabadas (grábalo con GEMINI_CASSETTE_MODE=record).")
+        return
+
+    try:
+        cassette.latency = float(args.latency)
+    except ValueError:
+        pass
+    try:
+        from .brain import JobAnalyzer
+    except ImportError:
+        from src.brain import JobAnalyzer
+
+    brain = JobAnalyzer(cassette=cassette, background=False)
+    # Same calls, same order as the recorded run: the prompts (and the web conversation) match
+    calls = cassette.calls[:args.limit] if args.limit else cassette.calls
+    started = time.time()
+    results = [result for call in calls for result in brain.replay_call(call)]
+    elapsed = time.time() - started
+    print(f"⏱️ [Bench] {len(calls)} llamadas / {len(results)} ofertas en {elapsed:.2f}s ({sum(r is not None for r in results)} con análisis)")
+    print(json.dumps({"cassette": brain.cassette.stats(), "llm": brain.llm_stats()}, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,13 @@ import os
 import time
 import socket
 
+try:
+    from .rate_limiter import AdaptiveRateLimiter
+    from .cassette import ReplayResponse, CassetteMiss
+except ImportError:
+    from src.rate_limiter import AdaptiveRateLimiter
+    from src.cassette import ReplayResponse, CassetteMiss
+
 # --- FORCE IPV4 PATCH ---
 # Esto obliga a requests a usar solo IPv4, evitando el bloqueo de rango IPv6 de Google.
 orig_getaddrinfo = socket.getaddrinfo
@@ -17,20 +24,189 @@ def getaddrinfo_ipv4_only(host, port, family=0, type=0, proto=0, flags=0):
 socket.getaddrinfo = getaddrinfo_ipv4_only
 # ------------------------
 
-class AntigravityGemini:
+def extract_json_object(text, required_keys=None):
     """
-    Cliente nativo Antigravity para Gemini Web.
-    Re-implementación limpia y controlada de la lógica de conexión.
+    Devuelve el primer objeto JSON completo (dict) dentro de text que contenga
+    todas las required_keys, o None si todavía no hay uno (p.ej. stream parcial).
     """
-    
+    if not text:
+        return None
+    clean_text = text.replace("```json", "").replace("```", "")
+    decoder = json.JSONDecoder()
+    pos = clean_text.find("{")
+    while pos != -1:
+        try:
+            obj, _ = decoder.raw_decode(clean_text, pos)
+            if isinstance(obj, dict) and all(k in obj for k in (required_keys or [])):
+                return obj
+        except ValueError:
+            pass
+        pos = clean_text.find("{", pos + 1)
+    return None
+
+
+class GeminiWebProtocol:
+    """
+    Lógica compartida del protocolo Gemini Web (handshake, payload y parseo),
+    independiente del transporte HTTP.
+    """
+
     HEADERS = {
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
         "Referer": "https://gemini.google.com/",
         "Origin": "https://gemini.google.com",
         "X-Same-Domain": "1",
     }
+
+    APP_URL = "https://gemini.google.com/app"
+    STREAM_URL = "https://gemini.google.com/_/BardChatUi/data/assistant.lamda.BardFrontendService/StreamGenerate"
+    UPLOAD_URL = "https://content-push.googleapis.com/upload/"
+    UPLOAD_HEADERS = {
+        "Push-ID": "feeds/mcudyrk2a4khkz", # From constants.py
+        "Content-Type": "application/octet-stream"
+    }
+    BL = "boq_assistant-bard-web-server_20240227.13_p0" # From constants.py
+
+    # 1x1 GIF transparente (pixel fantasma para modo Pro/Ultra)
+    DUMMY_IMAGE = b'\x47\x49\x46\x38\x39\x61\x01\x00\x01\x00\x80\x00\x00\x00\x00\x00\xFF\xFF\xFF\x21\xF9\x04\x01\x00\x00\x00\x00\x2C\x00\x00\x00\x00\x01\x00\x01\x00\x00\x02\x01\x44\x00\x3B'
+
+    # Gestión básica de contexto (se actualizaría con la respuesta)
+    rcid = ""
+    rid = ""
+    cid = ""
+
+    @staticmethod
+    def _extract_snlm0e(html):
+        """Busca el SNlM0e (Nonce) en el HTML de /app."""
+        match = re.search(r'"SNlM0e":"(.*?)"', html)
+        return match.group(1) if match else None
+
+    @staticmethod
+    def _retry_after(headers):
+        """Segundos indicados en la cabecera Retry-After (si viene numérica)."""
+        try:
+            return float(headers.get("Retry-After"))
+        except (TypeError, ValueError):
+            return None
+
+    def _build_params(self):
+        return {
+            "bl": self.BL,
+            "_reqid": str(self.req_id),
+            "rt": "c"
+        }
+
+    def _build_form_data(self, payload):
+        """Form Data para batchexecute."""
+        return {
+            "f.req": json.dumps([None, json.dumps(payload)]),
+            "at": self.snlm0e
+        }
+
+    def _build_payload(self, prompt, image_url=None, context_ids=None):
+        """Construye el array JSON esotérico de Google."""
+        
+        # Estructura BASE para texto (debe estar anidada correctamente)
+        # [[prompt, 0, None, None], None, [IDs]]
+        msg_internal = [prompt, 0, None, None]
+        
+        if image_url:
+             # Estructura multimodal: [prompt, 0, None, [[[url, 1]]], ...]
+             msg_internal = [
+                 prompt,
+                 0, 
+                 None, 
+                 [[[image_url, 1]]],
+                 None, None, None
+             ]
+
+        # Estructura final anidada
+        # CORRECCION: msg_internal ya es una lista, no envolver de nuevo.
+        # CORRECCION: Los IDs de contexto deben ser cadenas vacías para iniciar.
+        if context_ids is None:
+            context_ids = [self.cid, self.rid, self.rcid]
+        return [
+            msg_internal,
+            None,
+            list(context_ids)
+        ]
+
+    def _parse_frame(self, line, update_context=True):
+        """Parsea UNA línea 'wrb.fr' del stream. Devuelve el texto (acumulado) o None."""
+        if "wrb.fr" not in line:
+            return None
+        # Encontró un bloque de datos
+        raw_json = json.loads(line)
+        if not raw_json or not raw_json[0] or len(raw_json[0]) < 3 or not raw_json[0][2]:
+            return None
+        base_data = json.loads(raw_json[0][2])
+        
+        if update_context and len(base_data) > 1 and base_data[1]:
+            self.cid = base_data[1][0] # conversation_id
+            self.rid = base_data[1][1] # response_id
+        
+        if update_context and len(base_data) > 4 and base_data[4]:
+             if len(base_data[4]) > 0 and len(base_data[4][0]) > 0:
+                 self.rcid = base_data[4][0][0] # choice_id
+
+        # 2. Extraer respuesta de texto
+        try:
+            return base_data[4][0][1][0]
+        except:
+            return None
+
+    def _parse_response(self, text, update_context=True):
+        """Extrae texto y actualiza IDs de conversación."""
+        try:
+            # Desempaquetar batchexecute
+            for line in text.splitlines():
+                response_text = self._parse_frame(line, update_context)
+                if response_text is not None:
+                    if update_context:
+                        print(f"   🐛 [Debug] CID: {self.cid} | RID: {self.rid} | RCID: {self.rcid}")
+                    return response_text
+                        
+            return "No se pudo parsear respuesta. (Raw data received)"
+        except Exception as e:
+            print(f"Error parseando respuesta Gemini: {e}")
+            return None
+
+    def get_context(self):
+        """Devuelve el estado actual de la sesión."""
+        return {
+            "conversation_id": self.cid, # map cid to conversation_id
+            "response_id": self.rid,
+            "choice_id": self.rcid
+        }
+
+    def set_context(self, context):
+        """Restaura una sesión previa."""
+        if not context: return
+        self.cid = context.get("conversation_id", "")
+        self.rid = context.get("response_id", "")
+        self.rcid = context.get("choice_id", "")
+        print(f"   🔄 [NativeLib] Sesión restaurada: {self.cid[:10]}...")
+
+    def reset_context(self):
+        """Olvida la conversación actual: el próximo mensaje abre una nueva."""
+        self.cid, self.rid, self.rcid = "", "", ""
+
+
+class AntigravityGemini(GeminiWebProtocol):
+    """
+    Cliente nativo Antigravity para Gemini Web.
+    Re-implementación limpia y controlada de la lógica de conexión.
+    """
     
-    def __init__(self, cookies: dict):
+    # Códigos con los que Google rechaza un nonce/cookie caducados (un 400 es una petición mal formada)
+    AUTH_FAILURE_CODES = (401, 403)
+
+    def __init__(self, cookies: dict, rate_limiter=None, session_cache=None, cookie_refresher=None, cassette=None):
+        """
+        session_cache: GeminiSessionCache opcional; si tiene un nonce vigente se omite el handshake.
+        cookie_refresher: callable opcional que re-escanea cookies si el refresh lazy las necesita.
+        cassette: Cassette opcional; en record guarda cada respuesta, en replay las sirve sin red.
+        """
         self.session = requests.Session()
         self.session.headers.update(self.HEADERS)
         self.session.cookies.update(cookies)
@@ -39,27 +215,44 @@ class AntigravityGemini:
         self.req_id = int("".join(random.choices(string.digits, k=4)))
         
         # Pre-cargar pixel fantasma para modo Pro/Ultra
-        try:
-            # 1x1 GIF transparente base64 decoded
-            self.dummy_image = b'\x47\x49\x46\x38\x39\x61\x01\x00\x01\x00\x80\x00\x00\x00\x00\x00\xFF\xFF\xFF\x21\xF9\x04\x01\x00\x00\x00\x00\x2C\x00\x00\x00\x00\x01\x00\x01\x00\x00\x02\x01\x44\x00\x3B'
-        except:
-            self.dummy_image = None
+        self.dummy_image = self.DUMMY_IMAGE
+
+        # Limitador AIMD compartido con los demás procesos (búsqueda / postulación)
+        self.rate_limiter = rate_limiter or AdaptiveRateLimiter()
+        self.session_cache = session_cache
+        self.cookie_refresher = cookie_refresher
+        # Telemetría de la última llamada a chat(): intentos, 429, espera del limitador vs red
+        self._post_stats = self._empty_stats()
+        self.last_call = {}
+        self.cassette = cassette
             
         print("   🧱 [NativeLib] Inicializando cliente...")
-        self._handshake()
+        cached = self.session_cache.load() if self.session_cache else None
+        if self.cassette and self.cassette.replaying:
+            self.snlm0e = "REPLAY" # Sin red: las respuestas salen del cassette
+            print(f"   📼 [NativeLib] Modo replay: {self.cassette.path}")
+        elif cached:
+            # Reutilizar nonce en disco: el refresh ocurre solo ante el primer fallo de auth
+            self.snlm0e = cached["snlm0e"]
+            self.sid = cookies.get("__Secure-1PSID")
+            print(f"   🔑 [NativeLib] Handshake en cache ({cached['age'] / 60:.0f} min). SNlM0e: {self.snlm0e[:10]}...")
+        else:
+            self._handshake()
 
     def _handshake(self):
         """Obtiene el SNlM0e (Nonce) necesario para firmar requests."""
         try:
-            resp = self.session.get("https://gemini.google.com/app", timeout=10)
+            resp = self.session.get(self.APP_URL, timeout=10)
             resp.raise_for_status()
             
             # Buscar SNlM0e en el HTML
-            match = re.search(r'"SNlM0e":"(.*?)"', resp.text)
-            if match:
-                self.snlm0e = match.group(1)
+            snlm0e = self._extract_snlm0e(resp.text)
+            if snlm0e:
+                self.snlm0e = snlm0e
                 self.sid = self.session.cookies.get("__Secure-1PSID")
                 print(f"   🔑 [NativeLib] Handshake exitoso. SNlM0e: {self.snlm0e[:10]}...")
+                if self.session_cache:
+                    self.session_cache.save(self.session.cookies.get_dict(), self.snlm0e)
             else:
                 print("   ❌ [NativeLib] Error: No se encontró SNlM0e.")
                 raise Exception("SNlM0e not found")
@@ -67,24 +260,44 @@ class AntigravityGemini:
             print(f"   ❌ [NativeLib] Error de conexión: {e}")
             raise
 
-    def chat(self, prompt, model="fast"):
+    def _refresh_auth(self):
+        """Refresh lazy tras un fallo de auth: nuevo handshake y, si no basta, cookies nuevas."""
+        print("   🔄 [NativeLib] Auth rechazada. Renovando sesión...")
+        if self.session_cache:
+            self.session_cache.invalidate()
+        self.snlm0e = None
+        try:
+            self._handshake()
+            return True
+        except Exception:
+            pass
+        if not self.cookie_refresher:
+            return False
+        try:
+            fresh_cookies = self.cookie_refresher()
+            if not fresh_cookies:
+                return False
+            self.session.cookies.update(fresh_cookies)
+            self._handshake()
+            return True
+        except Exception as e:
+            print(f"   ❌ [NativeLib] No se pudo renovar la sesión: {e}")
+            return False
+
+    def _post(self, prompt, model="fast", stream=False):
         """
-        Envía un mensaje. 
-        model='pro' activa el hack de imagen para Ultra.
+        POST a StreamGenerate con limitador compartido y reintentos ante 429.
+        Devuelve el objeto Response, o un string "Error: ..." si falló.
         """
-        # Anti-Ban Jitter: Espera aleatoria para parecer humano
-        jitter = random.uniform(1.0, 2.5)
-        print(f"   ⏳ [NativeLib] Human-Delay: {jitter:.2f}s...")
-        time.sleep(jitter)
+        if self.cassette and self.cassette.replaying:
+            self._post_stats["attempts"] += 1
+            try:
+                return ReplayResponse(self.cassette.replay("web", model, prompt))
+            except CassetteMiss as e:
+                return f"Error: {e}"
 
         if not self.snlm0e:
             self._handshake()
-            
-        params = {
-            "bl": "boq_assistant-bard-web-server_20240227.13_p0", # From constants.py
-            "_reqid": str(self.req_id),
-            "rt": "c"
-        }
         
         # Construir payload
         # Si es PRO, inyectamos imagen para forzar endpoint multimodal
@@ -95,136 +308,138 @@ class AntigravityGemini:
         payload = self._construct_payload(prompt, image_data)
         
         # Form Data para batchexecute
-        form_data = {
-            "f.req": json.dumps([None, json.dumps(payload)]),
-            "at": self.snlm0e
-        }
+        form_data = self._build_form_data(payload)
         
-        # Retry logic for 429 errors
-        # import time removed (using global)
+        # Retry logic for 429 errors: the shared limiter decides how long to back off
         max_retries = 3
-        backoff = 2 # seconds
+        auth_refreshed = False
         
         for attempt in range(max_retries + 1):
+            # Token bucket compartido: solo espera si no hay cupo (sin sleeps fijos)
+            waited = self.rate_limiter.acquire()
+            self._post_stats["attempts"] += 1
+            self._post_stats["wait_seconds"] += waited
+            if waited:
+                print(f"   ⏳ [NativeLib] Rate-Limiter: esperó {waited:.2f}s...")
             try:
                 print(f"   📤 [NativeLib] Enviando (Mode={model}, Attempt={attempt+1})...")
+                started = time.time()
                 resp = self.session.post(
-                    "https://gemini.google.com/_/BardChatUi/data/assistant.lamda.BardFrontendService/StreamGenerate",
-                    params=params,
+                    self.STREAM_URL,
+                    params=self._build_params(),
                     data=form_data,
-                    timeout=60
+                    timeout=60,
+                    stream=stream
                 )
                 resp.raise_for_status()
                 self.req_id += 1000
-                
-                # Parsear respuesta (simplicado)
-                return self._parse_response(resp.text)
+                if self.cassette:
+                    # Record: read the full StreamGenerate body (no early completion while recording)
+                    body = resp.text
+                    self.cassette.record("web", model, prompt, body, time.time() - started)
+                    resp = ReplayResponse(body)
+                self.rate_limiter.on_success(time.time() - started)
+                return resp
                 
             except requests.exceptions.HTTPError as e:
                 if e.response.status_code == 429:
+                    self._post_stats["rate_limited"] += 1
+                    self.rate_limiter.on_rate_limited(self._retry_after(e.response.headers))
                     if attempt < max_retries:
-                        wait_time = backoff * (2 ** attempt) + random.uniform(0, 1)
-                        print(f"   ⏳ [NativeLib] Rate Limit (429). Esperando {wait_time:.2f}s...")
-                        time.sleep(wait_time)
+                        print(f"   ⏳ [NativeLib] Rate Limit (429). Reintentando cuando el limitador lo permita...")
                         continue
                     else:
                         return f"Error: Rate Limit Exceeded (429) after {max_retries} retries."
+                elif e.response.status_code in self.AUTH_FAILURE_CODES and not auth_refreshed:
+                    auth_refreshed = True
+                    if self._refresh_auth():
+                        # Re-firmar con el nuevo nonce
+                        form_data = self._build_form_data(payload)
+                        continue
+                    return f"Error: {e}"
                 else:
                     return f"Error: {e}"
             except Exception as e:
                 return f"Error: {e}"
 
-    def _construct_payload(self, prompt, image_bytes=None):
-        """Construye el array JSON esotérico de Google."""
-        
-        # Estructura BASE para texto (debe estar anidada correctamente)
-        # [[prompt, 0, None, None], None, [IDs]]
-        msg_internal = [prompt, 0, None, None]
+    @staticmethod
+    def _empty_stats():
+        return {"attempts": 0, "rate_limited": 0, "wait_seconds": 0.0}
+
+    def chat(self, prompt, model="fast", stream=False, required_keys=None):
+        """
+        Envía un mensaje. 
+        model='pro' activa el hack de imagen para Ultra.
+        stream=True: parsea los frames 'wrb.fr' según llegan y, si se indica required_keys,
+        retorna en cuanto el texto contiene un objeto JSON completo con esas keys.
+        Tras la llamada, last_call tiene intentos, 429, espera del limitador y tiempo de red.
+        """
+        self._post_stats = self._empty_stats()
+        started = time.time()
+        text = self._chat(prompt, model=model, stream=stream, required_keys=required_keys)
+        stats = dict(self._post_stats)
+        stats["network_seconds"] = max(0.0, time.time() - started - stats["wait_seconds"])
+        stats["request_bytes"] = len(prompt.encode("utf-8"))
+        stats["response_bytes"] = len((text or "").encode("utf-8"))
+        self.last_call = stats
+        return text
+
+    def _chat(self, prompt, model="fast", stream=False, required_keys=None):
+        if stream:
+            last_text = None
+            for partial in self.chat_stream(prompt, model=model):
+                last_text = partial
+                if required_keys and extract_json_object(partial, required_keys) is not None:
+                    print("   ⚡ [NativeLib] JSON completo recibido (early completion).")
+                    break
+            return last_text if last_text is not None else "No se pudo parsear respuesta. (Raw data received)"
+
+        resp = self._post(prompt, model=model)
+        if isinstance(resp, str):
+            return resp
         
+        # Parsear respuesta (simplicado)
+        return self._parse_response(resp.text)
+
+    def chat_stream(self, prompt, model="fast"):
+        """
+        Generador: produce el texto parcial (acumulado) de la respuesta a medida que
+        llegan los frames. Cerrar el generador corta la conexión.
+        """
+        resp = self._post(prompt, model=model, stream=True)
+        if isinstance(resp, str):
+            yield resp
+            return
+
+        last_text = None
+        try:
+            # iter_lines(decode_unicode=True) still yields bytes when the response has no charset
+            for line in resp.iter_lines():
+                if isinstance(line, bytes):
+                    line = line.decode("utf-8", errors="replace")
+                if not line:
+                    continue
+                try:
+                    text = self._parse_frame(line)
+                except (ValueError, IndexError, KeyError):
+                    continue # frame incompleto o de control
+                if text is not None and text != last_text:
+                    last_text = text
+                    yield text
+        finally:
+            resp.close()
+
+    def _construct_payload(self, prompt, image_bytes=None):
+        """Sube la imagen (si hay) y construye el payload."""
+        image_url = None
         if image_bytes:
              # Si hay imagen, subimos y cambiamos la estructura
              image_url = self._upload_image(image_bytes)
-             # Estructura multimodal: [prompt, 0, None, [[[url, 1]]], ...]
-             msg_internal = [
-                 prompt,
-                 0, 
-                 None, 
-                 [[[image_url, 1]]],
-                 None, None, None
-             ]
-
-        # Estructura final anidada
-        # CORRECCION: msg_internal ya es una lista, no envolver de nuevo.
-        # CORRECCION: Los IDs de contexto deben ser cadenas vacías para iniciar.
-        return [
-            msg_internal,
-            None,
-            [self.cid, self.rid, self.rcid]
-        ]
-
-    # Gestión básica de contexto (se actualizaría con la respuesta)
-    rcid = ""
-    rid = ""
-    cid = ""
+        return self._build_payload(prompt, image_url)
 
     def _upload_image(self, img_bytes):
         """Sube imagen a Google Content Push (Método Simple de Utils.py)."""
-        url = "https://content-push.googleapis.com/upload/"
-        headers = {
-            "Push-ID": "feeds/mcudyrk2a4khkz", # From constants.py
-            "Content-Type": "application/octet-stream"
-        }
-        
         # Subida directa simple (como hace la librería original)
-        r = requests.post(url, data=img_bytes, headers=headers)
+        r = requests.post(self.UPLOAD_URL, data=img_bytes, headers=self.UPLOAD_HEADERS)
         r.raise_for_status()
         return r.text
-
-    def _parse_response(self, text):
-        """Extrae texto y actualiza IDs de conversación."""
-        try:
-            # Desempaquetar batchexecute
-            lines = text.splitlines()
-            for line in lines:
-                if "wrb.fr" in line:
-                    # Encontró un bloque de datos
-                    raw_json = json.loads(line)
-                    base_data = json.loads(raw_json[0][2])
-                    
-                    if len(base_data) > 1 and base_data[1]:
-                        self.cid = base_data[1][0] # conversation_id
-                        self.rid = base_data[1][1] # response_id
-                        print(f"   🐛 [Debug] CID: {self.cid} | RID: {self.rid}")
-                    
-                    if len(base_data) > 4 and base_data[4]:
-                         if len(base_data[4]) > 0 and len(base_data[4][0]) > 0:
-                             self.rcid = base_data[4][0][0] # choice_id
-                             print(f"   🐛 [Debug] RCID: {self.rcid}")
-
-                    # 2. Extraer respuesta de texto
-                    try:
-                        response_text = base_data[4][0][1][0]
-                        return response_text
-                    except:
-                        pass
-                        
-            return "No se pudo parsear respuesta. (Raw data received)"
-        except Exception as e:
-            print(f"Error parseando respuesta Gemini: {e}")
-            return None
-
-    def get_context(self):
-        """Devuelve el estado actual de la sesión."""
-        return {
-            "conversation_id": self.cid, # map cid to conversation_id
-            "response_id": self.rid,
-            "choice_id": self.rcid
-        }
-
-    def set_context(self, context):
-        """Restaura una sesión previa."""
-        if not context: return
-        self.cid = context.get("conversation_id", "")
-        self.rid = context.get("response_id", "")
-        self.rcid = context.get("choice_id", "")
-        print(f"   🔄 [NativeLib] Sesión restaurada: {self.cid[:10]}...")
@@ -0,0 +1,178 @@
+import re
+import time
+
+try:
+    from .job_details import extract_raw_requirements
+except ImportError:
+    from src.job_details import extract_raw_requirements
+
+# urn:li:fs_workplaceType:<n> / urn:li:fsd_workplaceType:<n>
+WORKPLACE_TYPES = {"1": "On-site", "2": "Remote", "3": "Hybrid"}
+_JOB_URN = re.compile(r"jobPosting[^:]*:\(?(\d+)")
+_MODE_IN_TEXT = re.compile(r"\((remote|remoto|hybrid|híbrido|on-site|presencial)\)", re.IGNORECASE)
+_MODE_WORDS = {"remote": "Remote", "remoto": "Remote", "hybrid": "Hybrid", "híbrido": "Hybrid",
+               "on-site": "On-site", "presencial": "On-site"}
+MIN_DESCRIPTION = 100
+
+
+def time_ago(epoch_ms, now=None):
+    """Fecha de publicación en el mismo formato que muestra LinkedIn ("3 days ago")."""
+    seconds = max(0, (now or time.time()) - epoch_ms / 1000.0)
+    for unit, size in (("month", 30 * 86400), ("week", 7 * 86400), ("day", 86400), ("hour", 3600), ("minute", 60)):
+        if seconds >= size:
+            n = int(seconds // size)
+            return f"{n} {unit}{'s' if n > 1 else ''} ago"
+    return "just now"
+
+
+def _text(value):
+    """TextViewModel ({"text": ...}) o string."""
+    if isinstance(value, dict):
+        value = value.get("text")
+    return value.strip() if isinstance(value, str) and value.strip() else None
+
+
+def _find_name(value, depth=0):
+    """Primer "name" dentro de companyDetails (estructura anidada que cambia entre versiones)."""
+    if depth > 4 or not isinstance(value, dict):
+        return None
+    if isinstance(value.get("name"), str):
+        return value["name"]
+    for v in value.values():
+        name = _find_name(v, depth + 1)
+        if name:
+            return name
+    return None
+
+
+class JobApiCapture:
+    """
+    Parser de las respuestas JSON de la API interna de LinkedIn (/voyager/api/...)
+    que la página pide mientras se navega la búsqueda: tarjetas de la lista
+    (título, empresa, ubicación, fecha) y fichas jobPosting (descripción, modalidad).
+    Recorre data + included sin depender del $type exacto y acumula los campos por
+    ID de oferta. details_for(id) devuelve el mismo dict que el scraping del DOM.
+    """
+
+    def __init__(self):
+        self.jobs = {}
+        self.companies = {}
+        self.payloads = 0
+        self.hits = 0
+        self.fallbacks = 0
+
+    @staticmethod
+    def is_job_api(url):
+        return "/voyager/api/" in url and ("job" in url.lower() or "graphql" in url)
+
+    def feed(self, payload):
+        """Procesa un payload JSON (dict) y devuelve los IDs de oferta que actualizó."""
+        self.payloads += 1
+        entities = []
+        self._collect(payload, entities, 0)
+        # Company entities first so job cards/postings can resolve "*company" references
+        for entity in entities:
+            urn = entity.get("entityUrn") or ""
+            if "company" in urn.lower() and isinstance(entity.get("name"), str):
+                self.companies[urn] = entity["name"]
+        updated = set()
+        for entity in entities:
+            job_id = self._job_id(entity)
+            if job_id and self._merge(job_id, entity):
+                updated.add(job_id)
+        return updated
+
+    def _collect(self, value, out, depth):
+        if depth > 12:
+            return
+        if isinstance(value, dict):
+            out.append(value)
+            for v in value.values():
+                if isinstance(v, (dict, list)):
+                    self._collect(v, out, depth + 1)
+        elif isinstance(value, list):
+            for v in value:
+                self._collect(v, out, depth + 1)
+
+    @staticmethod
+    def _job_id(entity):
+        for key in ("entityUrn", "jobPostingUrn", "*jobPosting", "dashEntityUrn", "jobPosting"):
+            value = entity.get(key)
+            if isinstance(value, str):
+                match = _JOB_URN.search(value)
+                if match:
+                    return match.group(1)
+        return None
+
+    def _merge(self, job_id, entity):
+        fields = {}
+        title = entity.get("title") if isinstance(entity.get("title"), str) else _text(entity.get("jobPostingTitle"))
+        if title: fields["title"] = title.strip()
+
+        company = entity.get("companyName") if isinstance(entity.get("companyName"), str) else None
+        company = company or _find_name(entity.get("companyDetails")) or _text(entity.get("primaryDescription"))
+        if not company:
+            for key in ("*company", "company"):
+                if isinstance(entity.get(key), str) and entity[key] in self.companies:
+                    company = self.companies[entity[key]]
+        if company: fields["company"] = company
+
+        location = entity.get("formattedLocation") if isinstance(entity.get("formattedLocation"), str) else None
+        location = location or _text(entity.get("secondaryDescription"))
+        if location:
+            mode = _MODE_IN_TEXT.search(location)
+            if mode:
+                fields["work_mode"] = _MODE_WORDS[mode.group(1).lower()]
+                location = _MODE_IN_TEXT.sub("", location).strip()
+            fields["location"] = location
+
+        workplace = entity.get("workplaceTypes") or entity.get("*workplaceTypes")
+        if isinstance(workplace, list) and workplace and isinstance(workplace[0], str):
+            mode = WORKPLACE_TYPES.get(workplace[0].rsplit(":", 1)[-1])
+            if mode: fields["work_mode"] = mode
+        elif entity.get("workRemoteAllowed") is True:
+            fields.setdefault("work_mode", "Remote")
+
+        listed_at = entity.get("listedAt")
+        if not isinstance(listed_at, (int, float)):
+            for item in entity.get("footerItems") or []:
+                if isinstance(item, dict) and item.get("type") == "LISTED_DATE" and item.get("timeAt"):
+                    listed_at = item["timeAt"]
+        if isinstance(listed_at, (int, float)):
+            fields["listed_at"] = listed_at
+
+        description = _text(entity.get("description"))
+        if description and len(description) > len(self.jobs.get(job_id, {}).get("description", "")):
+            fields["description"] = description
+
+        if fields:
+            self.jobs.setdefault(job_id, {}).update(fields)
+        return bool(fields)
+
+    def details_for(self, job_id, require_description=True):
+        """Dict de detalles (formato de parse_job_details) o None si falta la descripción."""
+        job = self.jobs.get(str(job_id)) if job_id else None
+        if not job:
+            return None
+        description = job.get("description", "")
+        if require_description and len(description) < MIN_DESCRIPTION:
+            return None
+        details = {
+            "description": description,
+            "date": time_ago(job["listed_at"]) if "listed_at" in job else "Unknown",
+            "company": job.get("company", "Unknown"),
+            "location": job.get("location", "Unknown"),
+            "work_mode": job.get("work_mode", "Unknown"),
+        }
+        if job.get("title"): details["title"] = job["title"]
+        if description: details["raw_requirements"] = extract_raw_requirements(description)
+        return details
+
+    def stats(self):
+        return {
+            "payloads": self.payloads,
+            "jobs_seen": len(self.jobs),
+            "with_description": sum(1 for j in self.jobs.values() if len(j.get("description", "")) >= MIN_DESCRIPTION),
+            "api_hits": self.hits,
+            "dom_fallbacks": self.fallbacks,
+        }
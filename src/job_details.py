@@ -0,0 +1,167 @@
+import re
+
+# Selectores de la ficha de una oferta (panel derecho de la búsqueda o /jobs/view/)
+DETAIL_SELECTORS = {
+    "title": [
+        ".job-details-jobs-unified-top-card__job-title h1",
+        "h2.job-details-jobs-unified-top-card__job-title",
+        ".job-details-jobs-unified-top-card__job-title",
+    ],
+    # Specific container first (-container suffix), then the whole top card
+    "top_card": [
+        ".job-details-jobs-unified-top-card__primary-description-container",
+        ".job-details-jobs-unified-top-card__primary-description",
+        ".job-details-jobs-unified-top-card",
+    ],
+    "insights": [
+        ".job-details-fit-level-preferences button",
+        ".job-details-jobs-unified-top-card__job-insight",
+        ".job-details-jobs-unified-top-card__workplace-type",
+        "li.job-details-jobs-unified-top-card__job-insight",
+        ".ui-label",
+        ".mt2 span",
+    ],
+    "date_fallback": [".tvm__text--low-emphasis", ".posted-time-ago__text"],
+    "company": [
+        ".job-details-jobs-unified-top-card__company-name",
+        ".job-card-container__company-name",
+    ],
+    "description": [".jobs-description__content", "#job-details", ".show-more-less-html__markup", "article", ".description"],
+}
+
+# Un solo page.evaluate: recoge todos los textos crudos en el navegador y los devuelve en un JSON.
+# Async: tras pulsar "Show more" espera a que LinkedIn expanda la descripción (lo hace en un render posterior)
+EXTRACT_DETAILS_JS = """
+async (sel) => {
+    const text = (el) => el ? (el.innerText || "").trim() : null;
+    const visible = (el) => !!el && el.getClientRects().length > 0 && getComputedStyle(el).visibility !== "hidden";
+    const first = (list) => {
+        for (const s of list) { const el = document.querySelector(s); if (el) return el; }
+        return null;
+    };
+
+    const topCard = first(sel.top_card);
+    let description = null;
+    for (const s of sel.description) {
+        const el = document.querySelector(s);
+        if (visible(el)) { description = el; break; }
+    }
+    if (description) {
+        const more = description.querySelector("button[aria-label*='Show more']");
+        if (visible(more)) {
+            const before = description.innerText.length;
+            more.click();
+            // Until the button goes away or the text grows (max 1.5 s)
+            for (let waited = 0; waited < 1500 && visible(more) && description.innerText.length <= before; waited += 50) {
+                await new Promise((resolve) => setTimeout(resolve, 50));
+            }
+        }
+    }
+
+    return {
+        title: text(first(sel.title)),
+        top_card: topCard ? topCard.innerText : null,
+        spans: topCard ? Array.from(topCard.querySelectorAll("span.tvm__text--low-emphasis"), text) : [],
+        insights: sel.insights.map((s) => Array.from(document.querySelectorAll(s), text)),
+        date_fallback: sel.date_fallback.map((s) => text(document.querySelector(s))),
+        company: text(first(sel.company)),
+        description: description ? description.innerText : "",
+    };
+}
+"""
+
+DATE_PATTERNS = [
+    r"(\d+\s+(?:hour|minute|day|week|month)s?\s+ago)",
+    r"(just\s+now)",
+    r"(hace\s+\d+\s+(?:hora|minuto|día|semana|mes)s?)",
+    r"(recién\s+publicado)",
+    r"(\d+\s+(?:h|d|w|m|y)\s+ago)"
+]
+
+REQUIREMENTS_REGEX = r"(?i)(?:Requisitos|Requirements|Perfil|Profile|What you need|Who you are|Experiencia|Experience|Qualifications)(?:[\s:]+)(.*?)(?:Benefits|Beneficios|Ofrecemos|Offer|About|Sobre|Compensation|What we offer|TalentFlow|$)"
+
+
+def extract_raw_requirements(description):
+    """Raw requirements section ("Requirements"/"Experience" block), else the start of the description."""
+    match_req = re.search(REQUIREMENTS_REGEX, description, re.DOTALL)
+    raw_req = match_req.group(1).strip() if match_req else ""
+    # If too short, might be a false positive title, keep full description
+    return raw_req[:1000] if len(raw_req) > 50 else description[:1000]
+
+
+def _work_mode_from_insight(txt):
+    txt = txt.lower().strip()
+    # Clean up text (sometimes includes "Matches your profile" etc)
+    if "remote" in txt or "remoto" in txt: return "Remote"
+    if "hybrid" in txt or "híbrido" in txt: return "Hybrid"
+    if "on-site" in txt or "presencial" in txt: return "On-site"
+    return None
+
+
+def parse_job_details(raw):
+    """Convierte el JSON crudo de EXTRACT_DETAILS_JS en el dict de detalles (regex en Python)."""
+    details = {
+        "description": "",
+        "date": "Unknown",
+        "company": "Unknown",
+        "location": "Unknown",
+        "work_mode": "Unknown"
+    }
+    if raw.get("title"): details["title"] = raw["title"]
+
+    # Date (Time Ago), Location & Work Mode from the text of the Unified Top Card
+    if raw.get("top_card") is not None:
+        full_text = raw["top_card"].replace("\n", " ").strip()
+
+        # Priority 1: individual tvm__text--low-emphasis spans
+        for span_text in raw.get("spans") or []:
+            if span_text and any(re.search(pat, span_text, re.IGNORECASE) for pat in DATE_PATTERNS):
+                details["date"] = span_text # Found clean date in span
+                break
+
+        # Priority 2: regex on full text
+        if details["date"] == "Unknown":
+            for pat in DATE_PATTERNS:
+                match = re.search(pat, full_text, re.IGNORECASE)
+                if match:
+                    details["date"] = match.group(1)
+                    break
+
+        if re.search(r"\b(remote|remoto)\b", full_text, re.IGNORECASE): details["work_mode"] = "Remote"
+        elif re.search(r"\b(hybrid|híbrido)\b", full_text, re.IGNORECASE): details["work_mode"] = "Hybrid"
+        elif re.search(r"\b(on-site|presencial)\b", full_text, re.IGNORECASE): details["work_mode"] = "On-site"
+
+        # Work mode fallback (Pills/Insights)
+        if details["work_mode"] == "Unknown":
+            for texts in raw.get("insights") or []:
+                mode = next((m for m in (_work_mode_from_insight(t or "") for t in texts) if m), None)
+                if mode:
+                    details["work_mode"] = mode
+                    break
+
+        # Location heuristic
+        clean_text_for_split = re.sub(r"[·•|]", "###", full_text)
+        parts = [p.strip() for p in clean_text_for_split.split("###") if p.strip()]
+        for part in parts:
+            if details["date"] != "Unknown" and part in details["date"]: continue
+            if re.search(r"(applicant|solicitud|remote|remoto|hybrid|híbrido|onsite|presencial|ago|hace)", part, re.IGNORECASE): continue
+            details["location"] = part
+            break
+
+    # Fallback date selectors if regex failed
+    if details["date"] == "Unknown":
+        for text in raw.get("date_fallback") or []:
+            if text is not None:
+                details["date"] = text
+                break
+
+    if raw.get("company"): details["company"] = raw["company"]
+
+    description = raw.get("description") or ""
+    if description:
+        details["description"] = description
+        details["raw_requirements"] = extract_raw_requirements(description)
+
+    if len(details["description"]) < 100:
+        print("   [Browser] Warning: Description empty or too short.")
+    return details
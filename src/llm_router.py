@@ -0,0 +1,283 @@
+import time
+import threading
+import statistics
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+try:
+    from .llm_telemetry import percentile
+except ImportError:
+    from src.llm_telemetry import percentile
+
+
+class BackendError(Exception):
+    """Fallo de un backend LLM (HTTP, 429, respuesta vacía o sin el JSON esperado)."""
+
+    def __init__(self, message, rate_limited=False):
+        super().__init__(message)
+        self.rate_limited = rate_limited
+
+
+class GeminiWebBackend:
+    """Backend sobre AntigravityGemini (sesión web con contexto: el perfil ya puede estar cargado)."""
+
+    stateful = True
+
+    def __init__(self, client, name="web", weight=1.0, on_turn=None):
+        """on_turn(latency, prompt_bytes, ok): se llama tras cada mensaje enviado a la conversación."""
+        self.client = client
+        self.name = name
+        self.weight = weight
+        self.on_turn = on_turn
+        # Una sola conversación: nunca dos mensajes a la vez (p.ej. tras perder un hedge).
+        # Público para que quien reinicia/prepara la conversación fuera de call() también lo tome.
+        self.lock = threading.RLock()
+        self._local = threading.local()
+
+    def call(self, prompt, required_keys=None):
+        with self.lock:
+            started = time.time()
+            text = self.client.chat(prompt, stream=bool(required_keys), required_keys=required_keys)
+            self._local.stats = dict(getattr(self.client, "last_call", {}) or {})
+            if self.on_turn:
+                self.on_turn(time.time() - started, len(prompt.encode("utf-8")), bool(text) and not text.startswith("Error:"))
+        if not text or text.startswith("Error:") or text.startswith("No se pudo parsear"):
+            raise BackendError(text or "Empty response", rate_limited="429" in (text or ""))
+        return text
+
+    def last_stats(self):
+        """Intentos / 429 / espera / red de la última llamada hecha desde este hilo."""
+        return getattr(self._local, "stats", {})
+
+
+class GeminiApiBackend:
+    """Backend sobre google.generativeai (API oficial, sin estado: el prompt lleva el perfil completo)."""
+
+    stateful = False
+
+    def __init__(self, model, name="api", weight=1.0):
+        self.model = model
+        self.name = name
+        self.weight = weight
+        self._local = threading.local()
+
+    def call(self, prompt, required_keys=None):
+        started = time.time()
+        try:
+            response = self.model.generate_content(prompt, generation_config={"response_mime_type": "application/json"})
+            text = response.text
+        except Exception as e:
+            rate_limited = "429" in str(e) or "ResourceExhausted" in type(e).__name__
+            self._local.stats = {"attempts": 1, "rate_limited": int(rate_limited), "wait_seconds": 0.0,
+                                 "network_seconds": time.time() - started}
+            raise BackendError(str(e), rate_limited=rate_limited)
+        self._local.stats = {"attempts": 1, "rate_limited": 0, "wait_seconds": 0.0, "network_seconds": time.time() - started}
+        if not text:
+            raise BackendError("Empty response")
+        return text
+
+    def last_stats(self):
+        return getattr(self._local, "stats", {})
+
+
+class BackendStats:
+    """Ventana móvil de latencias/errores de un backend."""
+
+    def __init__(self, window=50):
+        self.latencies = deque(maxlen=window)
+        self.outcomes = deque(maxlen=window)  # True = éxito
+        self.calls = 0
+        self.errors = 0
+        self.rate_limited = 0
+        self.consecutive_failures = 0
+        self.cooldown_until = 0.0
+
+    def record(self, latency, ok, rate_limited=False):
+        self.calls += 1
+        self.outcomes.append(ok)
+        if ok:
+            self.latencies.append(latency)
+            self.consecutive_failures = 0
+        else:
+            self.errors += 1
+            self.consecutive_failures += 1
+            if rate_limited:
+                self.rate_limited += 1
+
+    def percentile(self, pct):
+        return percentile(self.latencies, pct)
+
+    def error_rate(self):
+        if not self.outcomes:
+            return 0.0
+        return 1.0 - sum(self.outcomes) / len(self.outcomes)
+
+
+class LLMRouter:
+    """
+    Reparte cada llamada (analyze / answer_question) entre varios backends LLM
+    según su salud reciente:
+    - Puntuación = latencia mediana x (1 + penalización por tasa de error) x weight.
+    - Tras un 429 o varios fallos seguidos el backend entra en cooldown.
+    - Si el backend elegido falla, se prueba el siguiente (cada uno una vez).
+    - hedge=True (opcional): si la respuesta tarda más que su p95, se lanza la misma
+      petición al segundo backend y gana la primera respuesta válida.
+    close() libera los hilos del executor.
+    """
+
+    def __init__(self, backends, hedge=False, window=50, min_samples=5, prior_latency=10.0, error_penalty=4.0,
+                 failure_cooldown=60.0, rate_limit_cooldown=120.0, max_consecutive_failures=3,
+                 min_hedge_delay=2.0, default_hedge_delay=20.0, telemetry=None):
+        self.backends = [b for b in backends if b is not None]
+        self.stats_by_name = {b.name: BackendStats(window) for b in self.backends}
+        self.hedge = hedge
+        self.min_samples = min_samples
+        self.prior_latency = prior_latency
+        self.error_penalty = error_penalty
+        self.failure_cooldown = failure_cooldown
+        self.rate_limit_cooldown = rate_limit_cooldown
+        self.max_consecutive_failures = max_consecutive_failures
+        self.min_hedge_delay = min_hedge_delay
+        self.default_hedge_delay = default_hedge_delay
+        self.telemetry = telemetry  # LLMTelemetry opcional: un registro por llamada a backend
+        self.hedges_launched = 0
+        self.hedges_won = 0
+        self._lock = threading.Lock()
+        # Hilos propios: las llamadas HTTP son bloqueantes y la que pierde el hedge termina sola
+        self._executor = ThreadPoolExecutor(max_workers=max(2, 2 * len(self.backends)), thread_name_prefix="LLMRouter")
+
+    def __bool__(self):
+        return bool(self.backends)
+
+    # --- Selección -------------------------------------------------------------
+    def score(self, backend):
+        stats = self.stats_by_name[backend.name]
+        latency = statistics.median(stats.latencies) if len(stats.latencies) >= self.min_samples else self.prior_latency
+        return latency * (1.0 + self.error_penalty * stats.error_rate()) * backend.weight
+
+    def ranked(self):
+        """Backends ordenados del más sano al menos sano; los que están en cooldown van al final."""
+        now = time.time()
+        with self._lock:
+            scored = [(self.stats_by_name[b.name].cooldown_until > now, self.score(b), i, b) for i, b in enumerate(self.backends)]
+        return [b for _, _, _, b in sorted(scored, key=lambda item: item[:3])]
+
+    def hedge_delay(self, backend):
+        """p95 del backend (o un valor por defecto hasta tener muestras suficientes)."""
+        stats = self.stats_by_name[backend.name]
+        if len(stats.latencies) < self.min_samples:
+            return self.default_hedge_delay
+        return max(self.min_hedge_delay, stats.percentile(95))
+
+    # --- Registro ---------------------------------------------------------------
+    def _record(self, backend, latency, error=None):
+        with self._lock:
+            stats = self.stats_by_name[backend.name]
+            rate_limited = bool(error is not None and getattr(error, "rate_limited", False))
+            stats.record(latency, error is None, rate_limited=rate_limited)
+            if rate_limited:
+                stats.cooldown_until = time.time() + self.rate_limit_cooldown
+            elif stats.consecutive_failures >= self.max_consecutive_failures:
+                stats.cooldown_until = time.time() + self.failure_cooldown
+
+    def _run(self, backend, prompt, required_keys, validate, purpose="llm"):
+        started = time.time()
+        text, error, parse_ok = None, None, None
+        try:
+            text = backend.call(prompt, required_keys=required_keys)
+            if validate:
+                parse_ok = bool(validate(text))
+                if not parse_ok:
+                    raise BackendError(f"Respuesta inválida: {text[:60]}")
+        except Exception as e:
+            error = e
+        latency = time.time() - started
+        self._record(backend, latency, error=error)
+        if self.telemetry:
+            self._record_telemetry(purpose, backend, prompt, text, latency, parse_ok, error)
+        if error is not None:
+            raise error
+        return text
+
+    def _record_telemetry(self, purpose, backend, prompt, text, latency, parse_ok, error):
+        stats = backend.last_stats() if hasattr(backend, "last_stats") else {}
+        wait_seconds = stats.get("wait_seconds", 0.0)
+        self.telemetry.record(
+            purpose, backend.name,
+            request_bytes=len(prompt.encode("utf-8")),
+            response_bytes=len((text or "").encode("utf-8")),
+            attempts=stats.get("attempts", 1),
+            rate_limited=stats.get("rate_limited", int(bool(getattr(error, "rate_limited", False)))),
+            wait_seconds=wait_seconds,
+            network_seconds=stats.get("network_seconds", max(0.0, latency - wait_seconds)),
+            parse_ok=parse_ok,
+            latency=latency,
+        )
+
+    # --- API --------------------------------------------------------------------
+    def call(self, build_prompt, required_keys=None, validate=None, purpose="llm"):
+        """
+        build_prompt(backend) -> prompt para ese backend (los stateful ya pueden tener el perfil en contexto).
+        validate(text) -> bool: una respuesta que no lo cumple cuenta como fallo y se prueba otro backend.
+        Devuelve el texto de la primera respuesta válida, o None si todos los backends fallaron.
+        """
+        candidates = self.ranked()
+        if not candidates:
+            print("[Router] No brain backend available (No Client, No API).")
+            return None
+
+        futures = {}  # future -> backend
+        primary = None
+        while candidates or futures:
+            if not futures:
+                primary = candidates.pop(0)
+                print(f"   🧭 [Router] {purpose} -> {primary.name}")
+                futures[self._executor.submit(self._run, primary, build_prompt(primary), required_keys, validate, purpose)] = primary
+
+            timeout = None
+            running = next(iter(futures.values()))
+            if self.hedge and candidates and len(futures) == 1:
+                timeout = self.hedge_delay(running)
+            done, _ = wait(list(futures), timeout=timeout, return_when=FIRST_COMPLETED)
+
+            if not done:
+                # Hedge: el backend actual va lento; probar el siguiente en paralelo
+                backend = candidates.pop(0)
+                self.hedges_launched += 1
+                print(f"   🪁 [Router] {running.name} tarda más de {timeout:.1f}s (p95). Hedge -> {backend.name}")
+                futures[self._executor.submit(self._run, backend, build_prompt(backend), required_keys, validate, purpose)] = backend
+                continue
+
+            for future in done:
+                backend = futures.pop(future)
+                try:
+                    text = future.result()
+                except Exception as e:
+                    print(f"   ⚠️ [Router] {backend.name} falló: {str(e)[:80]}")
+                    continue
+                if backend is not primary:
+                    self.hedges_won += 1
+                return text
+        return None
+
+    def close(self):
+        """Cierra el executor (las llamadas pendientes que no empezaron se cancelan)."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self):
+        now = time.time()
+        backends = {}
+        with self._lock:
+            for b in self.backends:
+                s = self.stats_by_name[b.name]
+                p50, p95 = s.percentile(50), s.percentile(95)
+                backends[b.name] = {
+                    "calls": s.calls,
+                    "errors": s.errors,
+                    "rate_limited": s.rate_limited,
+                    "error_rate": round(s.error_rate(), 3),
+                    "p50": round(p50, 2) if p50 is not None else None,
+                    "p95": round(p95, 2) if p95 is not None else None,
+                    "cooldown": max(0.0, round(s.cooldown_until - now, 1)),
+                }
+        return {"backends": backends, "hedges_launched": self.hedges_launched, "hedges_won": self.hedges_won}
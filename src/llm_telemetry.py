@@ -0,0 +1,95 @@
+import os
+import json
+import time
+import threading
+from collections import deque
+
+
+def percentile(values, pct):
+    """Percentil por rango más cercano (None si no hay datos)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))]
+
+
+class LLMTelemetry:
+    """
+    Registro estructurado de cada llamada LLM (web o API):
+    propósito (analyze/answer/init/...), bytes enviados/recibidos, intentos, 429,
+    tiempo esperando al limitador vs tiempo de red, y si la respuesta se pudo parsear.
+    summary() agrega p50/p95/p99 y llamadas por minuto para dashboard/status.json.
+    """
+
+    def __init__(self, log_path="user_data/llm_calls.jsonl", window=1000):
+        self.log_path = log_path
+        self.calls = deque(maxlen=window)
+        self.started_at = time.time()
+        self.total_calls = 0
+        self._lock = threading.Lock()
+        if log_path and os.path.dirname(log_path):
+            os.makedirs(os.path.dirname(log_path), exist_ok=True)
+
+    def record(self, purpose, backend, request_bytes=0, response_bytes=0, attempts=1, rate_limited=0,
+               wait_seconds=0.0, network_seconds=0.0, parse_ok=None, latency=None):
+        entry = {
+            "ts": time.time(),
+            "purpose": purpose,
+            "backend": backend,
+            "request_bytes": request_bytes,
+            "response_bytes": response_bytes,
+            "attempts": attempts,
+            "rate_limited": rate_limited,
+            "wait_seconds": round(wait_seconds, 3),
+            "network_seconds": round(network_seconds, 3),
+            "latency": round(latency if latency is not None else wait_seconds + network_seconds, 3),
+            "parse_ok": parse_ok,
+        }
+        with self._lock:
+            self.calls.append(entry)
+            self.total_calls += 1
+            if self.log_path:
+                try:
+                    with open(self.log_path, "a", encoding="utf-8") as f:
+                        f.write(json.dumps(entry) + "\n")
+                except Exception as e:
+                    print(f"   [Telemetry] No se pudo escribir {self.log_path}: {e}")
+        return entry
+
+    @staticmethod
+    def _aggregate(calls):
+        latencies = [c["latency"] for c in calls]
+        parsed = [c["parse_ok"] for c in calls if c["parse_ok"] is not None]
+        return {
+            "calls": len(calls),
+            "p50": percentile(latencies, 50),
+            "p95": percentile(latencies, 95),
+            "p99": percentile(latencies, 99),
+            "request_bytes": sum(c["request_bytes"] for c in calls),
+            "response_bytes": sum(c["response_bytes"] for c in calls),
+            "attempts": sum(c["attempts"] for c in calls),
+            "rate_limited": sum(c["rate_limited"] for c in calls),
+            "wait_seconds": round(sum(c["wait_seconds"] for c in calls), 2),
+            "network_seconds": round(sum(c["network_seconds"] for c in calls), 2),
+            "parse_success": round(sum(parsed) / len(parsed), 3) if parsed else None,
+        }
+
+    def summary(self):
+        """Agregados globales, por propósito y por backend (sobre la ventana reciente)."""
+        now = time.time()
+        with self._lock:
+            calls = list(self.calls)
+            total = self.total_calls
+        by_purpose, by_backend = {}, {}
+        for c in calls:
+            by_purpose.setdefault(c["purpose"], []).append(c)
+            by_backend.setdefault(c["backend"], []).append(c)
+        elapsed_minutes = max((now - self.started_at) / 60.0, 1e-9)
+        return {
+            "total_calls": total,
+            "calls_per_minute": round(total / elapsed_minutes, 2),
+            "calls_last_minute": sum(1 for c in calls if now - c["ts"] <= 60),
+            "overall": self._aggregate(calls),
+            "by_purpose": {k: self._aggregate(v) for k, v in by_purpose.items()},
+            "by_backend": {k: self._aggregate(v) for k, v in by_backend.items()},
+        }
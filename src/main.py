@@ -4,6 +4,11 @@ import json
 from datetime import datetime
 from src.browser import JobSearchBrowser
 from src.brain import JobAnalyzer
+from src.analysis_cache import extract_job_id
+from src.prefilter import JobPreFilter, DECISION_REJECT, DECISION_FAST_TRACK
+from src.search_crawler import WatermarkStore
+from src.seen_jobs import SeenJobIndex
+from src.query_planner import QueryPlanner
 
 # Helper to load yaml config
 def load_config(path):
@@ -12,7 +17,26 @@ def load_config(path):
 
 # --- USER CONFIGURATION ---
 # Set to an integer (e.g., 10, 50) or None for UNLIMITED (all found jobs)
+# Per role x location combination: a planned search that merges N of them gets N x JOB_LIMIT
 JOB_LIMIT = 5 
+# Crawl search results page by page (&start=) and stop at the newest job of the last full crawl.
+# The mark only advances when a crawl reaches it (or the end) within JOB_LIMIT; limited runs still
+# go deeper each time because jobs seen before are skipped without counting towards the limit
+PAGINATED_CRAWL = True
+# Number of jobs packed into a single LLM request (1 = analyze one by one)
+ANALYSIS_BATCH_SIZE = 5
+# Local match model (python -m src.match_model train): predictions outside this band skip the LLM (pre-filter fast-tracked jobs always reach it)
+LOCAL_MODEL_BAND = (15, 75)
+# Minimum holdout agreement with the LLM before the local model is trusted
+LOCAL_MODEL_MIN_AGREEMENT = 0.9
+# Max tabs loading job details at once (adapts down on errors/slow pages; 1 = click cards one by one)
+DETAIL_TABS = 3
+# Network blocking while scanning: "scan" (no images/fonts/media/trackers), "apply" (looser) or "off"
+ROUTE_PROFILE = "scan"
+# Multiplier for the human-likeness floor applied after each page is ready (0 = readiness signals only)
+PACING_SCALE = 1.0
+# Collapse synonym roles into one OR search and drop cities whose country is also searched (False = role x location)
+PLAN_QUERIES = True
 # --------------------------
 
 def main():
@@ -40,13 +64,18 @@ def main():
     except: pass
     
     # Initialize components
-    monitor.log("🌐 Abriendo navegador...")
-    browser = JobSearchBrowser(headless=False) # Headful for demo/debugging
+    # Brain first: its backend (cookies + Gemini handshake) connects in the background while Chrome starts
     brain = JobAnalyzer(api_key=api_key)
+    monitor.log("🌐 Abriendo navegador...")
+    # Job IDs already opened (this run or a previous one) are skipped before clicking
+    seen_index = SeenJobIndex()
+    browser = JobSearchBrowser(headless=False, route_profile=ROUTE_PROFILE, pacing_scale=PACING_SCALE,
+                               seen_index=seen_index) # Headful for demo/debugging
     
     monitor.log("🔑 Verificando credenciales...")
 
     report_data = []
+    watermarks = WatermarkStore()
 
     try:
         # LinkedIn Test Workflow
@@ -69,18 +98,99 @@ def main():
         target_roles = profile.get("target_roles", ["Technical Lead"])
         locations = profile.get("location_preferences", ["Bogotá"])
         
+        planner = QueryPlanner(target_roles, locations)
+        queries = planner.plan() if PLAN_QUERIES else planner.naive_plan()
+
         # MONITOR INIT
-        total_combos = len(target_roles) * len(locations)
-        monitor.update(total_combinations=total_combos, status="Running")
-        monitor.log(f"Configuración cargada: {total_combos} combinaciones.")
+        total_combos = len(queries)
+        monitor.update(total_combinations=total_combos, status="Running",
+                       query_plan={"planned": total_combos, "naive": planner.naive_count()})
+        monitor.log(f"Configuración cargada: {total_combos} búsquedas (sin planificador: {planner.naive_count()}).")
+        
+        print(f"Loaded {len(target_roles)} roles and {len(locations)} locations -> {total_combos} searches.")
         
-        print(f"Loaded {len(target_roles)} roles and {len(locations)} locations.")
+        # Local hard-rule filter (English level, location_rules, work mode) before any LLM call
+        prefilter = JobPreFilter(profile)
         
+        # Learned match score: only the uncertain band reaches the LLM
+        match_model = None
+        try:
+            from src.match_model import MatchScoreModel, priority_from_score
+            match_model = MatchScoreModel.load()
+        except ImportError as e:
+            print(f"   [MatchModel] Deshabilitado: {e}")
+        if match_model:
+            agreement = match_model.metrics.get("agreement") or 0
+            if agreement < LOCAL_MODEL_MIN_AGREEMENT:
+                monitor.log(f"⚠️ Modelo local ignorado (acuerdo con LLM {agreement:.0%} < {LOCAL_MODEL_MIN_AGREEMENT:.0%}).")
+                match_model = None
+            else:
+                monitor.log(f"🧮 Modelo local activo (acuerdo con LLM {agreement:.0%}).")
+        model_stats = {"skipped": 0, "accepted": 0, "sent_to_llm": 0}
+
+        # Jobs waiting to be analyzed together in one LLM request
+        pending_jobs = []
+
+        def handle_analysis(details, url, analysis, role):
+            """Applies the match threshold and registers the job in the report/monitor."""
+            monitor.update(llm_telemetry=brain.llm_stats())
+            date_posted = details.get("date", "Unknown")
+            if analysis:
+                match_score = analysis.get('match_percentage', 0)
+                print(f"Analysis Result: {match_score}% Match")
+                outcome = "local_model" if analysis.get("source") == "local_model" else (
+                    "analyzed" if match_score >= 30 else "below_threshold")
+                seen_index.record_outcome(extract_job_id(url), outcome, match_score)
+                
+                # Register match in monitor (even if low score, just for stats?) 
+                # Actually, let's only register 'good' matches in the list
+                
+                # Filter: Production Threshold >= 30%
+                if match_score >= 30:
+                    # Append the details we enriched in browser.py
+                    item = {
+                        "source": site,
+                        "url": url,
+                        "role": details.get("title", role), # Use exact title if found
+                        "search_role": role, # target_roles entry the job was found for
+                        "date": date_posted,
+                        "company": details.get("company", "Unknown"),
+                        "location": details.get("location", "Unknown"), 
+                        "work_mode": details.get("work_mode", "Unknown"),
+                        "raw_requirements": details.get("raw_requirements", ""),
+                        "analysis": analysis
+                    }
+                    report_data.append(item)
+                    # Monitor Match
+                    monitor.add_match(item, match_score)
+                    monitor.log(f"✅ Coincidencia encontrada: {match_score}% ({details.get('company')})")
+                else:
+                    print(f"   [Filter] Skipped job (Match {match_score}% < 30%)")
+            else:
+                monitor.log("❌ Error en análisis de oferta.")
+
+        def flush_pending_jobs():
+            """Analyzes all buffered jobs in a single batched LLM request."""
+            if not pending_jobs: return
+            batch = list(pending_jobs)
+            pending_jobs.clear()
+
+            if len(batch) == 1:
+                details, url, role, job_id, text = batch[0]
+                handle_analysis(details, url, brain.analyze(text, job_id=job_id), role)
+                return
+
+            monitor.log(f"📦 Analizando lote de {len(batch)} ofertas...")
+            results = brain.analyze_batch([{"job_id": job_id, "text": text} for _, _, _, job_id, text in batch])
+            for (details, url, role, _, _), analysis in zip(batch, results):
+                handle_analysis(details, url, analysis, role)
+
         # Callback for processing jobs
         def process_job_callback(details, url):
             # Check for STOP SIGNAL (Instant)
             if os.path.exists("dashboard/stop.signal"):
                 monitor.log("🛑 Deteniendo en oferta actual...")
+                flush_pending_jobs()
                 return False # Stop scanning
 
             # Update monitor: One more job processed (estimated)
@@ -92,43 +202,57 @@ def main():
 
             description = details.get("description", "")
             date_posted = details.get("date", "Unknown")
+            # OR searches cover several target roles: attribute the job to the closest one
+            current_role = current_query.role_for(details.get("title")) if current_query else "Unknown"
             
             print(f"   [Main] Analyze Job: {url}")
             if description:
+                verdict = prefilter.evaluate(details, url)
+                monitor.update(prefilter_stats=prefilter.stats)
+                if verdict["decision"] == DECISION_REJECT:
+                    print(f"   [PreFilter] Descartada sin LLM: {'; '.join(verdict['reasons'])}")
+                    seen_index.record_outcome(extract_job_id(url), "prefilter_reject")
+                    return True # Continue scanning
+                fast_track = verdict["decision"] == DECISION_FAST_TRACK
+                if fast_track:
+                    # Hard rules confirmed and profile skills mentioned: the local model's
+                    # estimate can neither discard nor auto-accept it, the LLM decides
+                    print(f"   [PreFilter] Ubicación/modalidad confirmadas. Directo a análisis. Skills: {verdict['skills']}")
+
+                if match_model and not fast_track:
+                    predicted = match_model.predict(description)
+                    low, high = LOCAL_MODEL_BAND
+                    if predicted < low:
+                        model_stats["skipped"] += 1
+                        monitor.update(local_model_stats=model_stats)
+                        print(f"   [MatchModel] Descartada sin LLM (estimado {predicted:.0f}%)")
+                        seen_index.record_outcome(extract_job_id(url), "model_skip", round(predicted))
+                        return True # Continue scanning
+                    if predicted >= high:
+                        model_stats["accepted"] += 1
+                        monitor.update(local_model_stats=model_stats)
+                        handle_analysis(details, url, {
+                            "match_percentage": round(predicted),
+                            "priority_score": priority_from_score(predicted),
+                            "analysis": f"Estimación del modelo local ({predicted:.0f}%), sin análisis del LLM.",
+                            "source": "local_model"
+                        }, current_role)
+                        return True
+                    model_stats["sent_to_llm"] += 1
+                    monitor.update(local_model_stats=model_stats)
+
                 # Add date context to brain
-                analysis = brain.analyze(f"PUBLICATION DATE: {date_posted}\n\n{description}")
-                
-                if analysis:
-                    match_score = analysis.get('match_percentage', 0)
-                    print(f"Analysis Result: {match_score}% Match")
-                    
-                    # Register match in monitor (even if low score, just for stats?) 
-                    # Actually, let's only register 'good' matches in the list
-                    
-                    # Filter: Production Threshold >= 30%
-                    if match_score >= 30:
-                        # Append the details we enriched in browser.py
-                        item = {
-                            "source": site,
-                            "url": url,
-                            "role": details.get("title", current_role), # Use exact title if found
-                            "date": date_posted,
-                            "company": details.get("company", "Unknown"),
-                            "location": details.get("location", "Unknown"), 
-                            "work_mode": details.get("work_mode", "Unknown"),
-                            "raw_requirements": details.get("raw_requirements", ""),
-                            "analysis": analysis
-                        }
-                        report_data.append(item)
-                        # Monitor Match
-                        monitor.add_match(item, match_score)
-                        monitor.log(f"✅ Coincidencia encontrada: {match_score}% ({details.get('company')})")
-                    else:
-                        print(f"   [Filter] Skipped job (Match {match_score}% < 30%)")
+                text = f"PUBLICATION DATE: {date_posted}\n\n{description}"
+                job_id = extract_job_id(url)
+                if ANALYSIS_BATCH_SIZE and ANALYSIS_BATCH_SIZE > 1:
+                    pending_jobs.append((details, url, current_role, job_id, text))
+                    if len(pending_jobs) >= ANALYSIS_BATCH_SIZE:
+                        flush_pending_jobs()
                 else:
-                    monitor.log("❌ Error en análisis de oferta.")
+                    handle_analysis(details, url, brain.analyze(text, job_id=job_id), current_role)
             else:
                  monitor.log("⚠️ No se pudo extraer descripción.")
+                 seen_index.record_outcome(extract_job_id(url), "no_description")
             
             return True # Continue scanning
 
@@ -140,59 +264,69 @@ def main():
         # --- DYNAMIC SEARCH LOOP ---
         combo_index = 0
         stop_requested = False
-        current_role = "Unknown" # Initialize for callback scope
+        current_query = None # Search in progress, for the callback scope
         
-        for role in target_roles:
-            current_role = role # Update for callback
+        for query in queries:
+            current_query = query # Update for callback
             if stop_requested: break
             
-            for loc in locations:
-                if stop_requested: break
+            # Check for STOP SIGNAL (File Check)
+            if os.path.exists("dashboard/stop.signal"):
+                stop_requested = True
+                monitor.log("🛑 Deteniendo búsqueda por usuario...")
+                # Delete signal
+                try: os.remove("dashboard/stop.signal")
+                except: pass
+                break
+
+            combo_index += 1
+            role, search_loc = query.keywords, query.location
+            # Same job budget as the role x location searches this query replaces
+            query_limit = JOB_LIMIT * query.naive_count() if JOB_LIMIT else JOB_LIMIT
+            
+            # Update Monitor Context
+            monitor.update(
+                current_combination_index=combo_index,
+                current_role=query.role,
+                current_location=search_loc,
+                current_job_index=0,
+                jobs_in_current_batch=query_limit
+            )
+            seen_index.set_context(query.role, search_loc)
+            monitor.log(f"🔎 Buscando: {role} en {search_loc}...")
+            print(f"\n--- Searching for: {role} in {search_loc} ---")
+            
+            try:
+                def run_search(time_filter):
+                    if PAGINATED_CRAWL:
+                        return browser.crawl_search(site, role, search_loc, process_job_callback, limit=query_limit,
+                                                    time_filter=time_filter, parallel_tabs=DETAIL_TABS, watermarks=watermarks)
+                    browser.search_jobs(site, role, search_loc, time_filter=time_filter)
+                    return browser.scan_search_results(site, limit=query_limit, callback_fn=process_job_callback, parallel_tabs=DETAIL_TABS)
+
+                # Try 24 Hours First
+                result = run_search("r86400") # Past 24 hours
                 
-                # Check for STOP SIGNAL (File Check)
-                if os.path.exists("dashboard/stop.signal"):
-                    stop_requested = True
-                    monitor.log("🛑 Deteniendo búsqueda por usuario...")
-                    # Delete signal
-                    try: os.remove("dashboard/stop.signal")
-                    except: pass
-                    break
-
-                combo_index += 1
-                search_loc = loc.split("(")[0].strip()
+                # Fallback to Past Week only if the 24h search listed nothing (not if everything was already seen)
+                if result.found == 0:
+                    monitor.log(f"⚠️ Sin resultados en 24h. Ampliando a Semana Pasada...")
+                    run_search("r604800") # Past Week
                 
-                # Update Monitor Context
-                monitor.update(
-                    current_combination_index=combo_index,
-                    current_role=role,
-                    current_location=search_loc,
-                    current_job_index=0,
-                    jobs_in_current_batch=JOB_LIMIT 
-                )
-                monitor.log(f"🔎 Buscando: {role} en {search_loc}...")
-                print(f"\n--- Searching for: {role} in {search_loc} ---")
+                # Analyze whatever is left in the buffer for this search
+                flush_pending_jobs()
+                monitor.update(network=browser.route_stats(), pacing=browser.pacing_stats(), job_api=browser.api_stats(),
+                               seen_jobs=seen_index.stats())
                 
-                try:
-                    # Try 24 Hours First
-                    browser.search_jobs(site, role, search_loc, time_filter="r86400") # Past 24 hours
-                    count = browser.scan_search_results(site, limit=JOB_LIMIT, callback_fn=process_job_callback)
+                # SAVE PROGRESS
+                if report_data:
+                    monitor.log(f"💾 Guardando progreso ({len(report_data)} ofertas)...")
+                    browser.create_google_sheet(report_data, output_filename=report_file)
                     
-                    # Fallback to Past Week if no results
-                    if count == 0:
-                        monitor.log(f"⚠️ Sin resultados en 24h. Ampliando a Semana Pasada...")
-                        browser.search_jobs(site, role, search_loc, time_filter="r604800") # Past Week
-                        browser.scan_search_results(site, limit=JOB_LIMIT, callback_fn=process_job_callback)
-                    
-                    # SAVE PROGRESS
-                    if report_data:
-                        monitor.log(f"💾 Guardando progreso ({len(report_data)} ofertas)...")
-                        browser.create_google_sheet(report_data, output_filename=report_file)
-                        
-                except Exception as loop_e:
-                    monitor.log(f"⚠️ Error en bucle: {loop_e}")
-                    print(f"Error in search loop: {loop_e}")
-                    continue
-        
+            except Exception as loop_e:
+                monitor.log(f"⚠️ Error en bucle: {loop_e}")
+                print(f"Error in search loop: {loop_e}")
+                continue
+    
         # Final Save
         # Final Save Logic - EXECUTED ALWAYS IF DATA EXISTS
         if report_data:
@@ -218,6 +352,20 @@ def main():
     finally:
         if 'browser' in locals():
             browser.close()
+        if 'brain' in locals():
+            brain.close()
+        if 'planner' in locals() and PLAN_QUERIES:
+            print(f"[Plan] {len(queries)} búsquedas planificadas vs {planner.naive_count()} (rol x ubicación)")
+            if report_data:
+                by_role = {}
+                for item in report_data:
+                    by_role[item.get("search_role", "Unknown")] = by_role.get(item.get("search_role", "Unknown"), 0) + 1
+                print(f"[Plan] Coincidencias por rol: {by_role}")
+        if 'seen_index' in locals():
+            seen = seen_index.stats()
+            print(f"[Seen] {seen['skipped']}/{seen['checks']} ofertas ya vistas omitidas "
+                  f"(hit rate {seen['hit_rate']:.0%}; {seen['known_from_previous_runs']} de ejecuciones anteriores)")
+            seen_index.close()
         print("Browser session closed.")
 
     
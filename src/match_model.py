@@ -0,0 +1,191 @@
+import os
+import re
+import json
+import zlib
+import argparse
+import unicodedata
+
+import numpy as np
+
+TRAINING_LOG = "user_data/match_training.jsonl"
+MODEL_PATH = "user_data/match_model.npz"
+MATCH_THRESHOLD = 30  # Same cut as main.py: >= 30% goes to the report
+# Below this many holdout examples the agreement is noise: main.py won't trust the model
+MIN_HOLDOUT = 50
+
+
+def tokenize(text):
+    text = unicodedata.normalize("NFKD", str(text or ""))
+    text = "".join(c for c in text if not unicodedata.combining(c)).lower()
+    return re.findall(r"[a-z0-9#+]+(?:\.[a-z0-9]+)*", text)
+
+
+def hashed_features(text, n_features):
+    """Unigramas + bigramas hasheados (crc32, estable entre procesos). Devuelve (índices, valores) L2-normalizados."""
+    tokens = tokenize(text)
+    grams = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    if not grams:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+    indices = np.unique(np.fromiter((zlib.crc32(g.encode("utf-8")) % n_features for g in grams), dtype=np.int64, count=len(grams)))
+    values = np.full(len(indices), 1.0 / np.sqrt(len(indices)), dtype=np.float32)
+    return indices, values
+
+
+def priority_from_score(score):
+    """Misma escala que el prompt (1=High, 4=Low)."""
+    if score >= 80: return 1
+    if score >= 60: return 2
+    if score >= 40: return 3
+    return 4
+
+
+def load_training_log(path=TRAINING_LOG):
+    """Ejemplos que JobAnalyzer guarda tras cada análisis del LLM: [(texto, match_percentage)]."""
+    examples = []
+    if not os.path.exists(path):
+        return examples
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                row = json.loads(line)
+                examples.append((row["text"], float(row["match_percentage"])))
+            except Exception:
+                continue
+    return examples
+
+
+class MatchScoreModel:
+    """
+    Regresión logística local sobre n-gramas hasheados que imita el match_percentage del LLM.
+    Se entrena solo con ofertas etiquetadas por el LLM (training log: la misma
+    descripción completa sobre la que main.py predice) y predice en << 1 ms, así
+    main.py solo envía al LLM las ofertas en la banda incierta.
+    """
+
+    def __init__(self, n_features=2 ** 18):
+        self.n_features = n_features
+        self.weights = np.zeros(n_features, dtype=np.float32)
+        self.bias = 0.0
+        self.metrics = {}
+
+    # --- Features -----------------------------------------------------------------
+    def _matrix(self, texts):
+        """CSR manual: índices concatenados + fila de cada índice (sin scipy)."""
+        feats = [hashed_features(t, self.n_features) for t in texts]
+        indices = np.concatenate([f[0] for f in feats]) if feats else np.zeros(0, dtype=np.int64)
+        values = np.concatenate([f[1] for f in feats]) if feats else np.zeros(0, dtype=np.float32)
+        rows = np.repeat(np.arange(len(feats)), [len(f[0]) for f in feats])
+        return indices, values, rows
+
+    def _logits(self, indices, values, rows, n_rows):
+        return np.bincount(rows, weights=self.weights[indices] * values, minlength=n_rows) + self.bias
+
+    # --- Entrenamiento ------------------------------------------------------------
+    def fit(self, texts, scores, epochs=300, learning_rate=2.0, l2=1e-4):
+        """Descenso de gradiente full-batch con etiquetas suaves (match/100) y entropía cruzada."""
+        indices, values, rows = self._matrix(texts)
+        targets = np.clip(np.asarray(scores, dtype=np.float64) / 100.0, 0.0, 1.0)
+        n = len(targets)
+        self.bias = float(np.log((targets.mean() + 1e-3) / (1.0 - targets.mean() + 1e-3)))
+        for _ in range(epochs):
+            probs = 1.0 / (1.0 + np.exp(-self._logits(indices, values, rows, n)))
+            error = probs - targets
+            grad = np.bincount(indices, weights=error[rows] * values, minlength=self.n_features) / n
+            self.weights -= (learning_rate * (grad + l2 * self.weights)).astype(np.float32)
+            self.bias -= learning_rate * float(error.mean())
+        return self
+
+    # --- Predicción ---------------------------------------------------------------
+    def predict(self, text):
+        """match_percentage estimado (0-100)."""
+        indices, values = hashed_features(text, self.n_features)
+        logit = float(np.dot(self.weights[indices], values)) + self.bias
+        return 100.0 / (1.0 + np.exp(-logit))
+
+    def predict_many(self, texts):
+        indices, values, rows = self._matrix(texts)
+        return 100.0 / (1.0 + np.exp(-self._logits(indices, values, rows, len(texts))))
+
+    def evaluate(self, texts, scores, threshold=MATCH_THRESHOLD):
+        """MAE frente al LLM y 'agreement': % de ofertas en las que ambos deciden igual (>= threshold)."""
+        if not len(texts):
+            return {"samples": 0, "mae": None, "agreement": None}
+        preds = self.predict_many(texts)
+        truth = np.asarray(scores, dtype=np.float64)
+        return {
+            "samples": len(truth),
+            "mae": round(float(np.abs(preds - truth).mean()), 2),
+            "agreement": round(float(((preds >= threshold) == (truth >= threshold)).mean()), 3),
+        }
+
+    # --- Persistencia -------------------------------------------------------------
+    def save(self, path=MODEL_PATH):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        np.savez_compressed(path, weights=self.weights, bias=self.bias, n_features=self.n_features,
+                            metrics=json.dumps(self.metrics))
+
+    @classmethod
+    def load(cls, path=MODEL_PATH):
+        """Carga el modelo entrenado, o None si no existe."""
+        if not os.path.exists(path):
+            return None
+        data = np.load(path)
+        model = cls(n_features=int(data["n_features"]))
+        model.weights = data["weights"]
+        model.bias = float(data["bias"])
+        model.metrics = json.loads(str(data["metrics"]))
+        return model
+
+
+def split_examples(examples, holdout=0.2, seed=42):
+    """Partición reproducible train/test."""
+    order = np.random.default_rng(seed).permutation(len(examples))
+    cut = int(len(examples) * (1 - holdout))
+    return [examples[i] for i in order[:cut]], [examples[i] for i in order[cut:]]
+
+
+def train_model(examples, epochs=300):
+    """Mide el acuerdo en un holdout y entrena el modelo final con todos los ejemplos."""
+    train, test = split_examples(examples)
+    holdout_model = MatchScoreModel().fit([t for t, _ in train], [s for _, s in train], epochs=epochs)
+    metrics = holdout_model.evaluate([t for t, _ in test], [s for _, s in test])
+    if metrics["samples"] < MIN_HOLDOUT:
+        print(f"⚠️ [MatchModel] Holdout de {metrics['samples']} ejemplos (< {MIN_HOLDOUT}): el acuerdo no es fiable.")
+        metrics["agreement"] = None
+    # The deployed model uses every example; the holdout metrics decide whether main.py trusts it
+    model = MatchScoreModel().fit([t for t, _ in examples], [s for _, s in examples], epochs=epochs)
+    model.metrics = metrics
+    return model
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Modelo local de match score (entrenado con análisis previos del LLM).")
+    parser.add_argument("command", choices=["train", "evaluate"])
+    parser.add_argument("--log", default=TRAINING_LOG, help="JSONL de análisis del LLM")
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--epochs", type=int, default=300)
+    args = parser.parse_args()
+
+    # Excel reports are not used: they hold a requirements extract (not the description the
+    # model predicts on) and rows the local model accepted itself
+    examples = load_training_log(args.log)
+    print(f"📚 [MatchModel] {len(examples)} ejemplos etiquetados por el LLM.")
+    if not examples:
+        return
+
+    if args.command == "train":
+        model = train_model(examples, epochs=args.epochs)
+        print(f"📈 [MatchModel] Holdout: {model.metrics}")
+        model.save(args.model)
+        print(f"💾 [MatchModel] Guardado en {args.model}")
+    else:
+        model = MatchScoreModel.load(args.model)
+        if not model:
+            print(f"❌ [MatchModel] No existe {args.model}. Ejecuta primero: python -m src.match_model train")
+            return
+        print(f"📈 [MatchModel] Acuerdo con el LLM: {model.evaluate([t for t, _ in examples], [s for _, s in examples])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+import math
+import time
+import random
+import asyncio
+
+# Suelo "humano" por tipo de acción: (mediana en segundos, sigma) de una lognormal.
+# El suelo cuenta desde el inicio de la acción, así que el tiempo esperando a que
+# la página esté lista ya forma parte de él (solo se duerme la diferencia).
+DEFAULT_FLOORS = {
+    "search": (1.2, 0.35),
+    "navigate": (1.0, 0.35),
+    "click": (0.6, 0.35),
+    "step": (0.5, 0.4),
+    "scroll": (0.4, 0.3),
+    "type": (0.4, 0.4),
+    "stagger": (0.3, 0.3),
+    "read": (0.2, 0.3),
+}
+
+# Resuelve cuando el subárbol de `sel` (o body) lleva `quiet` ms sin mutaciones
+DOM_STABLE_JS = """
+([sel, quiet]) => new Promise((resolve) => {
+    const root = (sel && document.querySelector(sel)) || document.body;
+    const done = () => { observer.disconnect(); resolve(true); };
+    const observer = new MutationObserver(() => { clearTimeout(timer); timer = setTimeout(done, quiet); });
+    let timer = setTimeout(done, quiet);
+    observer.observe(root, {childList: true, subtree: true, characterData: true, attributes: true});
+})
+"""
+
+
+class Pacer:
+    """
+    Ritmo dirigido por eventos en lugar de sleeps fijos.
+    settle() espera señales concretas (selector visible, función JS, DOM estable)
+    y después solo duerme lo que falte para el suelo humano muestreado para ese
+    tipo de acción. act() además arma la espera de una respuesta de red antes de
+    ejecutar la acción. Todo el tiempo queda contabilizado por tipo en stats().
+    scale multiplica los suelos (0 = sin suelo, solo señales).
+    """
+
+    def __init__(self, floors=None, scale=1.0, max_factor=4.0, rng=None):
+        self.floors = dict(DEFAULT_FLOORS)
+        self.floors.update(floors or {})
+        self.scale = scale
+        self.max_factor = max_factor
+        self.rng = rng or random.Random()
+        self._stats = {}
+
+    def sample_floor(self, kind):
+        """Suelo aleatorio (lognormal alrededor de la mediana, recortado a max_factor x mediana)."""
+        median, sigma = self.floors.get(kind, self.floors["step"])
+        median *= self.scale
+        if median <= 0:
+            return 0.0
+        return min(median * math.exp(self.rng.gauss(0, sigma)), median * self.max_factor)
+
+    def _record(self, kind, ready_seconds=0.0, floor_seconds=0.0, timed_out=False):
+        entry = self._stats.setdefault(kind, {"count": 0, "ready_seconds": 0.0, "floor_seconds": 0.0, "timeouts": 0})
+        entry["count"] += 1
+        entry["ready_seconds"] += ready_seconds
+        entry["floor_seconds"] += floor_seconds
+        entry["timeouts"] += int(timed_out)
+
+    async def _wait_signals(self, page, selector=None, predicate=None, arg=None, stable=None, timeout=10000, quiet_ms=300):
+        if selector:
+            await page.wait_for_selector(selector, timeout=timeout)
+        if predicate:
+            await page.wait_for_function(predicate, arg=arg, timeout=timeout)
+        if stable:
+            selector_root = None if stable is True else stable
+            await asyncio.wait_for(page.evaluate(DOM_STABLE_JS, [selector_root, quiet_ms]), timeout / 1000.0)
+
+    async def settle(self, page, kind, selector=None, predicate=None, arg=None, stable=None,
+                     timeout=10000, quiet_ms=300, started=None):
+        """
+        Espera a que la página esté lista y completa el suelo humano.
+        selector: CSS que debe aparecer. predicate/arg: función JS (page.wait_for_function).
+        stable: selector (o True = body) cuyo DOM debe quedar quieto quiet_ms.
+        Devuelve False si alguna señal agotó el timeout (el suelo se aplica igual).
+        """
+        started = started or time.monotonic()
+        ready = True
+        try:
+            await self._wait_signals(page, selector, predicate, arg, stable, timeout, quiet_ms)
+        except Exception:
+            ready = False
+        ready_seconds = time.monotonic() - started
+        extra = max(0.0, self.sample_floor(kind) - ready_seconds)
+        if extra:
+            await asyncio.sleep(extra)
+        self._record(kind, ready_seconds, extra, timed_out=not ready)
+        return ready
+
+    async def act(self, page, kind, action, response=None, timeout=10000, **signals):
+        """
+        Ejecuta `action` (función que devuelve un awaitable) y luego settle().
+        response: fragmento de URL de una respuesta de red que debe llegar tras la acción.
+        """
+        started = time.monotonic()
+        if response:
+            try:
+                async with page.expect_response(lambda r: response in r.url, timeout=timeout):
+                    await action()
+            except Exception as e:
+                if "Timeout" not in type(e).__name__:
+                    raise
+        else:
+            await action()
+        return await self.settle(page, kind, timeout=timeout, started=started, **signals)
+
+    async def pause(self, kind):
+        """Solo el suelo humano (acciones sin señal observable: teclear, escalonar pestañas...)."""
+        floor = self.sample_floor(kind)
+        if floor:
+            await asyncio.sleep(floor)
+        self._record(kind, floor_seconds=floor)
+        return floor
+
+    def stats(self):
+        by_kind = {k: dict(v, ready_seconds=round(v["ready_seconds"], 2), floor_seconds=round(v["floor_seconds"], 2))
+                   for k, v in self._stats.items()}
+        return {
+            "scale": self.scale,
+            "ready_seconds": round(sum(v["ready_seconds"] for v in self._stats.values()), 2),
+            "floor_seconds": round(sum(v["floor_seconds"] for v in self._stats.values()), 2),
+            "timeouts": sum(v["timeouts"] for v in self._stats.values()),
+            "by_kind": by_kind,
+        }
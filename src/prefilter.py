@@ -0,0 +1,172 @@
+import os
+import re
+import json
+import time
+import unicodedata
+
+try:
+    from .skill_extractor import SkillExtractor
+except ImportError:
+    from src.skill_extractor import SkillExtractor
+
+CEFR_ORDER = ["A1", "A2", "B1", "B2", "C1", "C2"]
+
+# "Inglés avanzado (C1)", "English level: C2", "C1 English"
+ENGLISH_CEFR_PATTERNS = [
+    r"(?:english|ingl[eé]s)[^.\n]{0,40}?\b([abc][12])\b",
+    r"\b([abc][12])\b[^.\n]{0,20}?(?:english|ingl[eé]s)",
+]
+# Native / bilingual requirements are treated as C2
+ENGLISH_NATIVE_PATTERNS = [
+    r"\bnative(?:[- ]level)?\s+english\b",
+    r"\benglish\s*\(?\s*native\b",
+    r"\bingl[eé]s\s+nativo\b",
+]
+# "C1 is a plus", "ideally C1", "se valorará C1": the level is not a requirement
+ENGLISH_OPTIONAL_PATTERN = (r"\b(?:plus|nice to have|bonus|preferred|preferably|ideal\w*|desirable|advantage"
+                            r"|deseable|valorable|se valora\w*|preferible\w*|ventaja)\b")
+# Clause boundaries: "B2 required, C1 is a plus" -> two clauses
+CLAUSE_BREAK = re.compile(r"[,;.\n]|\b(?:but|pero|and|y)\b")
+
+DECISION_REJECT = "reject"
+DECISION_FAST_TRACK = "fast_track"
+DECISION_PASS = "pass"
+
+
+def normalize(text):
+    """Minúsculas y sin tildes (Bogotá == bogota)."""
+    text = unicodedata.normalize("NFKD", str(text or ""))
+    return "".join(c for c in text if not unicodedata.combining(c)).lower()
+
+
+class JobPreFilter:
+    """
+    Filtro local y determinista que aplica las reglas duras de profile_config.json
+    (nivel de inglés, location_rules y modalidad) ANTES de llamar al LLM.
+    - reject: la oferta está claramente fuera de alcance (no se gasta LLM).
+    - fast_track: cumple todas las reglas duras con datos conocidos y menciona skills del
+      perfil; va directo al LLM sin pasar por el modelo local (src/match_model.py).
+    - pass: faltan datos para decidir; el LLM tiene la última palabra.
+    """
+
+    def __init__(self, profile, log_path="user_data/prefilter_rejections.jsonl"):
+        self.profile = profile or {}
+        self.log_path = log_path
+        self.english_level = str(self.profile.get("english_level", "")).upper()[:2]
+        rules = self.profile.get("location_rules", {})
+        self.allowlists = {
+            "Remote": [normalize(x) for x in rules.get("remote_allowlist", [])],
+            "Hybrid": [normalize(x) for x in rules.get("hybrid_allowlist", [])],
+            "On-site": [normalize(x) for x in rules.get("onsite_allowlist", [])],
+        }
+        self.stats = {DECISION_REJECT: 0, DECISION_FAST_TRACK: 0, DECISION_PASS: 0}
+        self.rejections = []
+        # Aho-Corasick sobre skills/alias del perfil: una sola pasada por descripción
+        self.skill_extractor = SkillExtractor(self.profile)
+
+    @staticmethod
+    def _is_optional(text, pos):
+        """¿La cláusula que contiene pos presenta el nivel como deseable y no como requisito?"""
+        start, end = 0, len(text)
+        for brk in CLAUSE_BREAK.finditer(text):
+            if brk.end() <= pos:
+                start = brk.end()
+            elif brk.start() > pos:
+                end = brk.start()
+                break
+        return re.search(ENGLISH_OPTIONAL_PATTERN, text[start:end]) is not None
+
+    def required_english_level(self, description):
+        """
+        Devuelve el nivel CEFR exigido por la oferta (p.ej. 'C1') o None.
+        Los niveles "deseables" se ignoran y, si quedan varios, se usa el más bajo:
+        solo se rechaza por un requisito inequívoco.
+        """
+        text = normalize(description)
+        for pat in ENGLISH_NATIVE_PATTERNS:
+            if any(not self._is_optional(text, m.start()) for m in re.finditer(pat, text)):
+                return "C2"
+        levels = []
+        for pat in ENGLISH_CEFR_PATTERNS:
+            levels.extend(m.group(1).upper() for m in re.finditer(pat, text)
+                          if not self._is_optional(text, m.start(1)))
+        if not levels:
+            return None
+        return min(levels, key=CEFR_ORDER.index)
+
+    def check_english(self, description):
+        """(ok, reason). ok=None si la oferta no menciona un nivel concreto."""
+        required = self.required_english_level(description)
+        if not required or self.english_level not in CEFR_ORDER:
+            return None, None
+        if CEFR_ORDER.index(required) > CEFR_ORDER.index(self.english_level):
+            return False, f"Inglés requerido {required} > perfil {self.english_level}"
+        return True, None
+
+    def check_location(self, work_mode, location):
+        """(ok, reason). ok=None si modalidad o ubicación son desconocidas."""
+        allowlist = self.allowlists.get(work_mode)
+        if allowlist is None:
+            return None, None
+        if work_mode == "Remote" and "anywhere" in allowlist:
+            return True, None
+        if not location or location == "Unknown":
+            return None, None
+        loc = normalize(location)
+        if any(allowed in loc for allowed in allowlist):
+            return True, None
+        return False, f"{work_mode} en '{location}' fuera de location_rules"
+
+    def evaluate(self, details, url=None):
+        """
+        Evalúa los datos extraídos por _extract_details_from_page.
+        Returns: {"decision": reject|fast_track|pass, "reasons": [...], "skills": {skill: menciones}}
+        """
+        details = details or {}
+        reasons = []
+        checks = []
+        description = details.get("description", "")
+        skills = self.skill_extractor.extract(description)
+
+        ok, reason = self.check_english(description)
+        checks.append(ok)
+        if reason: reasons.append(reason)
+
+        ok, reason = self.check_location(details.get("work_mode", "Unknown"), details.get("location", "Unknown"))
+        checks.append(ok)
+        if reason: reasons.append(reason)
+
+        if False in checks:
+            decision = DECISION_REJECT
+        elif all(c is True for c in checks[1:]) and (skills["skills"] or not description.strip()):
+            # Ubicación/modalidad confirmadas (el inglés no suele mencionarse explícitamente)
+            # y la descripción menciona al menos una skill del perfil
+            decision = DECISION_FAST_TRACK
+        else:
+            decision = DECISION_PASS
+
+        self.stats[decision] += 1
+        if decision == DECISION_REJECT:
+            self._record_rejection(details, url, reasons)
+        return {"decision": decision, "reasons": reasons, "skills": skills["counts"]}
+
+    def _record_rejection(self, details, url, reasons):
+        entry = {
+            "timestamp": time.time(),
+            "url": url,
+            "title": details.get("title", "Unknown"),
+            "company": details.get("company", "Unknown"),
+            "location": details.get("location", "Unknown"),
+            "work_mode": details.get("work_mode", "Unknown"),
+            "reasons": reasons,
+        }
+        self.rejections.append(entry)
+        if not self.log_path:
+            return
+        try:
+            if os.path.dirname(self.log_path):
+                os.makedirs(os.path.dirname(self.log_path), exist_ok=True)
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        except Exception as e:
+            print(f"   [PreFilter] No se pudo registrar rechazo: {e}")
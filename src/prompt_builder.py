@@ -0,0 +1,149 @@
+import re
+import json
+import unicodedata
+
+# Encabezados de secciones que no aportan al análisis (beneficios, EEO, "About us"...)
+BOILERPLATE_HEADERS = [
+    r"benefits?", r"beneficios", r"perks", r"what we offer", r"we offer", r"ofrecemos", r"que ofrecemos",
+    r"lo que ofrecemos", r"compensation(?: and benefits)?", r"why join us", r"por que unirte",
+    # Only company intros: "About the team/role/you/the job" carry requirements
+    r"about us", r"about (?:the|our) (?:company|organi[sz]ation|employer)", r"company (?:overview|description)",
+    r"who we are", r"sobre nosotros", r"sobre la empresa", r"acerca de (?:nosotros|la empresa)", r"quienes somos",
+    r"equal (?:employment )?opportunit(?:y|ies)", r"eeo(?: statement)?", r"diversity(?:,? equity)?(?: (?:and|&) inclusion)?",
+    r"our values", r"nuestros valores", r"life at [\w .&-]{1,40}",
+]
+# Encabezados que SÍ importan: cierran una sección de ruido
+RELEVANT_HEADERS = [
+    r"requirements?", r"requisitos", r"qualifications?", r"responsibilities", r"responsabilidades",
+    r"what you(?:'ll)? (?:need|do|bring)", r"who you are", r"about you", r"about the (?:role|job|position)", r"sobre el (?:rol|cargo|puesto)",
+    r"experience", r"experiencia", r"skills", r"habilidades", r"nice to have", r"deseable", r"tech stack", r"stack",
+    r"location", r"ubicacion", r"modalidad", r"perfil",
+]
+# Frases sueltas de cumplimiento legal que se eliminan aunque no tengan encabezado
+BOILERPLATE_SENTENCES = [
+    r"[^.\n]*\bequal opportunity employer\b[^.\n]*\.?",
+    r"[^.\n]*\bwithout regard to (?:race|color|religion)[^.\n]*\.?",
+    r"[^.\n]*\breasonable accommodations?\b[^.\n]*\.?",
+]
+
+_HEADER_TEMPLATE = r"^\s*(?:#+\s*)?(?:{})\s*[:?!.]?\s*$"
+_BOILERPLATE_RE = re.compile(_HEADER_TEMPLATE.format("|".join(BOILERPLATE_HEADERS)), re.IGNORECASE)
+_RELEVANT_RE = re.compile(_HEADER_TEMPLATE.format("|".join(RELEVANT_HEADERS)), re.IGNORECASE)
+
+
+def estimate_tokens(text):
+    """Estimación grosera (~4 caracteres por token)."""
+    return (len(text or "") + 3) // 4
+
+
+def _strip_accents_lower(text):
+    text = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in text if not unicodedata.combining(c)).lower()
+
+
+class PromptBuilder:
+    """
+    Construye prompts compactos para JobAnalyzer:
+    - Perfil en forma de digest minificado (sin resume_rules ni espacios del JSON),
+      o solo una referencia si la conversación ya tiene el perfil cargado.
+    - Con un SkillExtractor, el digest por oferta lleva nivel/años solo de las skills que la
+      oferta menciona; el resto va solo por nombre (las reglas de skills transferibles las necesitan).
+    - Descripción sin secciones de relleno (beneficios, EEO, "About us").
+    - Lleva la cuenta de bytes/tokens ahorrados por prompt.
+    """
+
+    def __init__(self, profile_text, skill_extractor=None):
+        self.profile_text = profile_text or ""
+        self.skill_extractor = skill_extractor
+        self.digest = self._build_digest(self.profile_text)
+        self.saved_bytes = 0
+        self.saved_tokens = 0
+        self.prompts = 0
+        self.prompts_by_label = {}
+
+    @staticmethod
+    def _build_digest(profile_text, detailed_skills=None):
+        """detailed_skills: si se indica, solo esas skills llevan nivel/años; las demás van por nombre."""
+        try:
+            profile = json.loads(profile_text)
+        except Exception:
+            return profile_text  # No es JSON: se envía tal cual
+
+        digest = {k: v for k, v in profile.items() if k not in ("resume_rules", "skills")}
+        # Skills: {"Backend": {"C#": {"level": 90, "years": 10}}} -> {"Backend": "C#:90/10y,..."}
+        skills = {}
+        for area, items in profile.get("skills", {}).items():
+            entries = [
+                name if detailed_skills is not None and name not in detailed_skills
+                else f"{name}:{data.get('level', '?')}/{data.get('years', '?')}y" if isinstance(data, dict) else f"{name}:{data}"
+                for name, data in items.items()
+            ]
+            if entries:
+                skills[area] = ",".join(entries)
+        if skills:
+            digest["skills(level/years)"] = skills
+        return json.dumps(digest, ensure_ascii=False, separators=(",", ":"))
+
+    @staticmethod
+    def compact_rules(system_prompt):
+        """Reglas del sistema sin markdown ni sangrías (para cebar una conversación nueva)."""
+        rules = (system_prompt or "").replace("**", "").replace("`", "")
+        rules = re.sub(r"[ \t]+", " ", rules)
+        return re.sub(r"\n\s*\n+", "\n", rules).strip()
+
+    def digest_for(self, description):
+        """Digest con nivel/años solo de las skills que la oferta menciona (directas o inferidas); completo si no aparece ninguna."""
+        if not self.skill_extractor or not description:
+            return self.digest
+        mentioned = self.skill_extractor.extract(description)["skills"]
+        if not mentioned:
+            return self.digest
+        return self._build_digest(self.profile_text, detailed_skills=mentioned)
+
+    def profile_block(self, session_has_profile=False, description=None):
+        """Texto del perfil a incrustar en el prompt."""
+        if session_has_profile:
+            return "(Perfil del candidato ya cargado en esta conversación; úsalo como única verdad.)"
+        return self.digest_for(description)
+
+    def slim_description(self, text):
+        """Elimina secciones de relleno y frases legales; colapsa espacios."""
+        if not text:
+            return text
+        kept = []
+        skipping = False
+        for line in text.splitlines():
+            normalized = _strip_accents_lower(line.strip())
+            # Relevant headers win
+            if _RELEVANT_RE.match(normalized):
+                skipping = False
+            elif _BOILERPLATE_RE.match(normalized):
+                skipping = True
+                continue
+            if not skipping:
+                kept.append(line.strip())
+
+        slim = "\n".join(kept)
+        for pat in BOILERPLATE_SENTENCES:
+            slim = re.sub(pat, "", slim, flags=re.IGNORECASE)
+        slim = re.sub(r"[ \t]+", " ", slim)
+        slim = re.sub(r"\n{2,}", "\n", slim).strip()
+        # Si el recorte fue excesivo (encabezados mal detectados), mejor enviar el original
+        if len(slim) < 0.2 * len(text.strip()):
+            return re.sub(r"\s+", " ", text).strip()
+        return slim
+
+    def record(self, legacy_prompt, final_prompt, label="prompt"):
+        """Registra el ahorro frente al prompt sin compactar (se reporta en stats() / llm_stats)."""
+        final_size = len(final_prompt.encode("utf-8"))
+        saved = max(0, len(legacy_prompt.encode("utf-8")) - final_size)
+        saved_tokens = max(0, estimate_tokens(legacy_prompt) - estimate_tokens(final_prompt))
+        self.prompts += 1
+        self.prompts_by_label[label] = self.prompts_by_label.get(label, 0) + 1
+        self.saved_bytes += saved
+        self.saved_tokens += saved_tokens
+        return {"bytes": final_size, "saved_bytes": saved, "saved_tokens": saved_tokens}
+
+    def stats(self):
+        return {"prompts": self.prompts, "by_label": dict(self.prompts_by_label),
+                "saved_bytes": self.saved_bytes, "saved_tokens": self.saved_tokens}
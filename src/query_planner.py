@@ -0,0 +1,129 @@
+import re
+import unicodedata
+
+# Traducción palabra a palabra (es -> en) y abreviaturas, para detectar sinónimos entre idiomas
+ROLE_WORDS = {
+    "lider": "lead", "tecnico": "technical", "tech": "technical",
+    "desarrollador": "developer", "desarrolladora": "developer", "programador": "developer",
+    "ingeniero": "engineer", "ingeniera": "engineer", "arquitecto": "architect", "arquitecta": "architect",
+    "ia": "ai", "fullstack": "full stack", "back": "backend", "front": "frontend", "sr": "senior",
+}
+STOP_WORDS = {"de", "del", "en", "y", "the", "of"}
+
+# Ciudad -> país: una búsqueda en el país ya devuelve las ofertas de sus ciudades.
+# Solo nombres sin ambigüedad (Valencia también es España, Cartagena también)
+GEO_PARENTS = {
+    "medellin": "colombia", "bogota": "colombia", "cali": "colombia", "barranquilla": "colombia",
+    "bucaramanga": "colombia", "pereira": "colombia",
+    "caracas": "venezuela", "maracaibo": "venezuela",
+}
+
+# LinkedIn corta keywords muy largas: como mucho estos términos por búsqueda OR
+MAX_TERMS = 4
+
+
+def _normalize(text):
+    text = unicodedata.normalize("NFKD", text.lower())
+    return "".join(c for c in text if not unicodedata.combining(c))
+
+
+def role_key(role):
+    """Clave canónica de un rol: mismas palabras (traducidas, sin orden) = sinónimos."""
+    words = []
+    for word in re.findall(r"[a-z0-9+#]+", _normalize(role)):
+        word = ROLE_WORDS.get(word, word)
+        words.extend(w for w in word.split() if w not in STOP_WORDS)
+    return frozenset(words)
+
+
+def search_location(location):
+    """Texto que se busca en LinkedIn ("Colombia (Remote Only)" -> "Colombia")."""
+    return location.split("(")[0].strip()
+
+
+class SearchQuery:
+    """Una búsqueda del plan: keywords OR de un grupo de roles en una ubicación."""
+
+    def __init__(self, roles, location, covers):
+        self.roles = roles
+        self.location = location
+        self.covers = covers  # Locations merged into this one (original strings)
+
+    @property
+    def role(self):
+        """Rol principal del grupo (el primero en target_roles)."""
+        return self.roles[0]
+
+    @property
+    def keywords(self):
+        if len(self.roles) == 1:
+            return self.roles[0]
+        return " OR ".join(f'"{role}"' for role in self.roles)
+
+    def naive_count(self):
+        """Búsquedas rol x ubicación que sustituye."""
+        return len(self.roles) * len(self.covers)
+
+    def role_for(self, title):
+        """Rol de origen de una oferta: el del grupo que más palabras comparte con el título."""
+        if len(self.roles) == 1 or not title:
+            return self.role
+        title_key, title_words = role_key(title), set(_normalize(title).split())
+        # Ties (synonyms share the key) go to the role written like the title (same language)
+        return max(self.roles, key=lambda role: (len(role_key(role) & title_key),
+                                                 len(set(_normalize(role).split()) & title_words)))
+
+    def __repr__(self):
+        return f"SearchQuery({self.keywords!r}, {self.location!r})"
+
+
+class QueryPlanner:
+    """
+    Reduce el producto target_roles x location_preferences al mínimo de búsquedas:
+    agrupa los roles sinónimos (mismo rol en otro idioma o abreviado) en una
+    búsqueda con OR y comillas, y quita las ciudades cuyo país ya está en la lista.
+    """
+
+    def __init__(self, roles, locations, max_terms=MAX_TERMS):
+        self.roles = list(roles)
+        self.locations = list(locations)
+        self.max_terms = max_terms
+
+    def role_groups(self):
+        groups = {}
+        for role in self.roles:
+            groups.setdefault(role_key(role), [])
+            if role not in groups[role_key(role)]:
+                groups[role_key(role)].append(role)
+        planned = []
+        for roles in groups.values():
+            planned.extend(roles[i:i + self.max_terms] for i in range(0, len(roles), self.max_terms))
+        return planned
+
+    def location_groups(self):
+        """{ubicación buscada: [ubicaciones originales que cubre]} en el orden de la configuración."""
+        searched = {}
+        for location in self.locations:
+            searched.setdefault(search_location(location), []).append(location)
+        normalized = {_normalize(loc): loc for loc in searched}
+
+        planned = {}
+        for loc, originals in searched.items():
+            parent = normalized.get(GEO_PARENTS.get(_normalize(loc)))
+            planned.setdefault(parent or loc, []).extend(originals)
+        # Keep the config order of the broader locations
+        return {loc: planned[loc] for loc in searched if loc in planned}
+
+    def plan(self):
+        locations = self.location_groups()
+        return [SearchQuery(roles, location, covers)
+                for roles in self.role_groups()
+                for location, covers in locations.items()]
+
+    def naive_plan(self):
+        """Una búsqueda por rol x ubicación (comportamiento sin planificador)."""
+        return [SearchQuery([role], search_location(location), [location])
+                for role in self.roles for location in self.locations]
+
+    def naive_count(self):
+        return len(self.roles) * len(self.locations)
@@ -0,0 +1,125 @@
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError: # Windows: sin lock entre procesos, solo entre hilos
+    fcntl = None
+
+
+class AdaptiveRateLimiter:
+    """
+    Token bucket adaptativo (AIMD) compartido entre procesos vía un archivo JSON.
+    - Éxito rápido: la tasa sube de forma aditiva (+additive_step req/s).
+    - 429: la tasa baja a la mitad (multiplicativo) y se vacía el bucket.
+    - Latencia alta: la tasa baja suavemente (x slow_factor).
+    El bot de búsqueda y el de postulación leen/escriben el mismo estado, así
+    que ninguno "quema" el cupo del otro y nunca se duerme sin necesidad.
+    """
+
+    def __init__(self, state_path="user_data/gemini_rate_limit.json", initial_rate=0.5, min_rate=0.05, max_rate=2.0,
+                 burst=2.0, additive_step=0.05, backoff_factor=0.5, slow_latency=15.0, slow_factor=0.9):
+        self.state_path = state_path
+        self.lock_path = state_path + ".lock"
+        self.initial_rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.additive_step = additive_step
+        self.backoff_factor = backoff_factor
+        self.slow_latency = slow_latency
+        self.slow_factor = slow_factor
+        self._thread_lock = threading.Lock()
+
+        if os.path.dirname(state_path):
+            os.makedirs(os.path.dirname(state_path), exist_ok=True)
+
+    # --- Estado compartido -------------------------------------------------
+    @contextmanager
+    def _locked(self):
+        """Lock entre hilos + flock entre procesos sobre el archivo .lock."""
+        with self._thread_lock:
+            if not fcntl:
+                yield
+                return
+            with open(self.lock_path, "a+") as fh:
+                fcntl.flock(fh, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(fh, fcntl.LOCK_UN)
+
+    def _load(self):
+        now = time.time()
+        state = {"rate": self.initial_rate, "tokens": self.burst, "updated_at": now, "blocked_until": 0.0}
+        try:
+            with open(self.state_path, "r") as f:
+                state.update(json.load(f))
+        except Exception:
+            pass
+        # Recarga del bucket según el tiempo transcurrido
+        elapsed = max(0.0, now - state["updated_at"])
+        state["rate"] = min(self.max_rate, max(self.min_rate, state["rate"]))
+        state["tokens"] = min(self.burst, state["tokens"] + elapsed * state["rate"])
+        state["updated_at"] = now
+        return state
+
+    def _save(self, state):
+        tmp_path = self.state_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.state_path)
+
+    # --- API ------------------------------------------------------------------
+    def try_acquire(self):
+        """Consume un token si hay. Devuelve 0.0 si se puede enviar ya, o los segundos a esperar."""
+        with self._locked():
+            state = self._load()
+            now = state["updated_at"]
+            if state["blocked_until"] > now:
+                wait = state["blocked_until"] - now
+            elif state["tokens"] >= 1.0:
+                state["tokens"] -= 1.0
+                wait = 0.0
+            else:
+                wait = (1.0 - state["tokens"]) / state["rate"]
+            self._save(state)
+            return wait
+
+    def acquire(self):
+        """Bloquea solo lo necesario hasta obtener un token. Devuelve el tiempo total esperado."""
+        waited = 0.0
+        while True:
+            wait = self.try_acquire()
+            if wait <= 0:
+                return waited
+            time.sleep(wait)
+            waited += wait
+
+    def on_success(self, latency=None):
+        """Incremento aditivo (o ligera reducción si la respuesta fue lenta)."""
+        with self._locked():
+            state = self._load()
+            if latency is not None and latency > self.slow_latency:
+                state["rate"] = max(self.min_rate, state["rate"] * self.slow_factor)
+            else:
+                state["rate"] = min(self.max_rate, state["rate"] + self.additive_step)
+            self._save(state)
+
+    def on_rate_limited(self, retry_after=None):
+        """Decremento multiplicativo tras un 429. Bloquea a todos los procesos durante retry_after."""
+        with self._locked():
+            state = self._load()
+            state["rate"] = max(self.min_rate, state["rate"] * self.backoff_factor)
+            state["tokens"] = 0.0
+            pause = retry_after if retry_after else 1.0 / state["rate"]
+            state["blocked_until"] = max(state["blocked_until"], state["updated_at"] + pause)
+            self._save(state)
+            print(f"   🚦 [RateLimiter] 429 -> tasa {state['rate']:.3f} req/s (pausa {pause:.1f}s)")
+
+    def current_rate(self):
+        with self._locked():
+            return self._load()["rate"]
@@ -0,0 +1,111 @@
+from collections import deque
+
+# Perfiles de bloqueo para context.route. "scan" solo necesita el DOM y el texto de las ofertas;
+# "apply" es más permisivo porque el modal de Easy Apply depende de más recursos visuales.
+ROUTE_PROFILES = {
+    "scan": {
+        "resource_types": {"image", "media", "font", "texttrack", "eventsource", "manifest"},
+        "url_parts": [
+            "google-analytics.com", "googletagmanager.com", "doubleclick.net", "googlesyndication.com",
+            "adservice.google.", "facebook.net", "bat.bing.com", "ads.linkedin.com",
+            "linkedin.com/li/track", "linkedin.com/tscp-serving", "/sensorCollect", "sentry.io",
+        ],
+    },
+    "apply": {
+        "resource_types": {"media"},
+        "url_parts": [
+            "google-analytics.com", "googletagmanager.com", "doubleclick.net", "googlesyndication.com",
+            "facebook.net", "bat.bing.com", "ads.linkedin.com",
+        ],
+    },
+    "off": None,
+}
+
+# Tamaño típico por tipo (bytes): los recursos abortados no llegan a descargarse,
+# así que el ahorro se estima con estos valores.
+TYPICAL_BYTES = {
+    "image": 40_000, "media": 500_000, "font": 35_000, "script": 60_000, "xhr": 5_000, "fetch": 5_000,
+    "stylesheet": 30_000, "texttrack": 5_000, "eventsource": 1_000, "manifest": 1_000, "other": 2_000,
+}
+
+
+class RoutePolicy:
+    """
+    Política de red para context.route: aborta tipos de recurso y trackers que la
+    extracción no necesita y cuenta lo bloqueado por página (cada navegación del
+    frame principal abre una entrada nueva).
+    El perfil se consulta en cada petición, así que set_profile() cambia la
+    política sin volver a registrar la ruta.
+    """
+
+    def __init__(self, profile="scan", history=50):
+        self.set_profile(profile)
+        self.pages = deque(maxlen=history)
+        self._current = {}  # page -> entrada en curso
+        self.totals = {"allowed": 0, "blocked": 0, "blocked_bytes_est": 0, "by_type": {}}
+
+    def set_profile(self, profile):
+        """profile: nombre de ROUTE_PROFILES o dict {"resource_types": set, "url_parts": list}."""
+        if isinstance(profile, str):
+            if profile not in ROUTE_PROFILES:
+                raise ValueError(f"Unknown route profile {profile!r} (expected one of {sorted(ROUTE_PROFILES)})")
+            self.profile_name, profile = profile, ROUTE_PROFILES[profile]
+        else:
+            self.profile_name = "custom"
+        self.profile = profile
+        print(f"   🛡️ [Route] Perfil de red: {self.profile_name}")
+
+    def should_block(self, resource_type, url):
+        if not self.profile:
+            return False
+        if resource_type in self.profile.get("resource_types", ()):
+            return True
+        return any(part in url for part in self.profile.get("url_parts", ()))
+
+    def _page_entry(self, page, url, navigation):
+        entry = self._current.get(page)
+        if entry is None or navigation:
+            entry = {"url": url, "allowed": 0, "blocked": 0, "blocked_bytes_est": 0}
+            self._current[page] = entry
+            self.pages.append(entry)
+        return entry
+
+    def record(self, page, resource_type, url, blocked, navigation=False):
+        """Cuenta una petición (navigation=True si es el documento del frame principal)."""
+        entry = self._page_entry(page, url, navigation)
+        if blocked:
+            size = TYPICAL_BYTES.get(resource_type, TYPICAL_BYTES["other"])
+            entry["blocked"] += 1
+            entry["blocked_bytes_est"] += size
+            self.totals["blocked"] += 1
+            self.totals["blocked_bytes_est"] += size
+            self.totals["by_type"][resource_type] = self.totals["by_type"].get(resource_type, 0) + 1
+        else:
+            entry["allowed"] += 1
+            self.totals["allowed"] += 1
+
+    async def handle(self, route):
+        """Handler para context.route("**/*", policy.handle)."""
+        request = route.request
+        blocked = self.should_block(request.resource_type, request.url)
+        try:
+            frame = request.frame
+            page = frame.page
+            navigation = request.is_navigation_request() and frame.parent_frame is None
+        except Exception:
+            page, navigation = None, False  # Service workers have no frame
+        self.record(page, request.resource_type, request.url, blocked, navigation=navigation)
+        if blocked:
+            await route.abort()
+        else:
+            await route.continue_()
+
+    def forget_page(self, page):
+        self._current.pop(page, None)
+
+    def stats(self):
+        return {
+            "profile": self.profile_name,
+            "totals": dict(self.totals, by_type=dict(self.totals["by_type"])),
+            "recent_pages": list(self.pages)[-5:],
+        }
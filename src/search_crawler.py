@@ -0,0 +1,124 @@
+import os
+import json
+import threading
+
+try:
+    from .analysis_cache import extract_job_id
+except ImportError:
+    from src.analysis_cache import extract_job_id
+
+# LinkedIn pagina la búsqueda de 25 en 25 (&start=25, 50...) y no pasa de ~1000 resultados
+PAGE_SIZE = 25
+MAX_PAGES = 40
+
+
+class ScanResult:
+    """Resultado de un escaneo: ofertas procesadas, ofertas listadas y las saltadas por ya vistas."""
+
+    def __init__(self, processed=0, found=0, skipped=0):
+        self.processed = processed
+        self.found = found
+        self.skipped = skipped
+
+    def __repr__(self):
+        return f"ScanResult(processed={self.processed}, found={self.found}, skipped={self.skipped})"
+
+
+class PageTracker:
+    """
+    Decide qué ofertas de cada página de resultados procesar y cuándo parar:
+    - "end": página vacía.
+    - "duplicate": ninguna oferta nueva (LinkedIn repite la última página al pasarse del final).
+    - "watermark": aparece la oferta más reciente del último rastreo completo (orden por fecha).
+    - "limit": se alcanzó el límite y quedaba alguna oferta nueva por encima de la marca.
+    skip(url) -> True descarta ofertas ya vistas en otras búsquedas (no cuentan para el límite
+    ni hacen que la página se considere repetida). Solo se consulta hasta llenar el límite,
+    así que cada URL que no se salta es una URL devuelta.
+    """
+
+    def __init__(self, limit=None, watermark=None, skip=None):
+        self.limit = limit
+        self.watermark = watermark
+        self.skip = skip
+        self.skipped = 0
+        self.listed = set()  # Every job ID shown, also past the limit or the watermark
+        self.seen = set()
+        self.accepted = 0
+        self.pages = 0
+        self.newest = None
+        self.stop_reason = None
+
+    def accept(self, urls):
+        """Devuelve las URLs nuevas de la página (recortadas al límite) y actualiza stop_reason."""
+        self.pages += 1
+        if not urls:
+            self.stop_reason = "end"
+            return []
+
+        self.listed.update(extract_job_id(url) or url for url in urls)
+        new = []
+        fresh = 0
+        for url in urls:
+            job_id = extract_job_id(url) or url
+            if self.newest is None:
+                self.newest = job_id
+            # Watermark and repeats first: a limit that lands on the old mark still completes the crawl
+            if self.watermark and job_id == self.watermark:
+                self.stop_reason = "watermark"
+                break
+            if job_id in self.seen:
+                continue
+            if self.limit is not None and self.accepted + len(new) >= self.limit:
+                self.stop_reason = "limit"
+                break
+            self.seen.add(job_id)
+            fresh += 1
+            if self.skip and self.skip(url):
+                self.skipped += 1
+                continue
+            new.append(url)
+
+        if not fresh and not self.stop_reason:
+            self.stop_reason = "duplicate"
+        # Filling the limit on the last job of a page is not a stop yet: the next page may
+        # start at the watermark (complete) or with a fresh job (limit)
+        self.accepted += len(new)
+        return new
+
+    @property
+    def complete(self):
+        """
+        ¿Se recorrió la búsqueda hasta el final (o hasta la marca anterior)? Solo entonces
+        newest puede ser la nueva marca sin saltarse ofertas en el siguiente rastreo.
+        """
+        return self.stop_reason in ("end", "duplicate", "watermark")
+
+
+class WatermarkStore:
+    """Oferta más reciente por búsqueda (user_data/search_watermarks.json), para cortar el siguiente rastreo."""
+
+    def __init__(self, path="user_data/search_watermarks.json"):
+        self.path = path
+        self._lock = threading.Lock()
+        self.marks = {}
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self.marks = json.load(f)
+            except Exception as e:
+                print(f"   [Crawl] No se pudo leer {path}: {e}")
+
+    @staticmethod
+    def key(query, location, time_filter):
+        return f"{query}|{location}|{time_filter}"
+
+    def get(self, key):
+        return self.marks.get(key)
+
+    def set(self, key, job_id):
+        with self._lock:
+            self.marks[key] = job_id
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, "w", encoding="utf-8") as f:
+                json.dump(self.marks, f, indent=2)
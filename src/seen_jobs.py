@@ -0,0 +1,155 @@
+import os
+import math
+import time
+import sqlite3
+import hashlib
+import threading
+
+# Resultados que cierran una oferta: no se vuelve a abrir en siguientes búsquedas/ejecuciones
+FINAL_OUTCOMES = {"analyzed", "below_threshold", "prefilter_reject", "model_skip", "local_model"}
+
+
+class BloomFilter:
+    """Filtro de Bloom (bytearray + doble hashing): "no está" es seguro, "está" hay que confirmarlo."""
+
+    def __init__(self, capacity=200_000, error_rate=0.001):
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(str(key).encode("utf-8"), digest_size=16).digest()
+        h1, h2 = int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, key):
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, key):
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+class SeenJobIndex:
+    """
+    Índice persistente (SQLite) de IDs de oferta ya vistos, con un filtro de Bloom en memoria
+    delante: la gran mayoría de IDs nuevos se resuelven sin tocar la base de datos.
+    claim(job_id) se consulta antes de abrir una oferta y devuelve False si ya se vio en
+    esta ejecución (otro rol/ubicación/filtro) o si quedó cerrada en una anterior
+    (FINAL_OUTCOMES). Guarda first_seen/last_seen, veces vista y el resultado del análisis.
+    """
+
+    def __init__(self, db_path="user_data/seen_jobs.sqlite", capacity=200_000, error_rate=0.001):
+        self.db_path = db_path
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS seen_jobs (
+                job_id TEXT PRIMARY KEY,
+                first_seen REAL NOT NULL,
+                last_seen REAL NOT NULL,
+                times_seen INTEGER NOT NULL DEFAULT 1,
+                role TEXT,
+                location TEXT,
+                outcome TEXT,
+                match_percentage REAL
+            )
+        """)
+        self._conn.commit()
+
+        self.bloom = BloomFilter(capacity, error_rate)
+        for (job_id,) in self._conn.execute("SELECT job_id FROM seen_jobs WHERE outcome IN (%s)" % ",".join("?" * len(FINAL_OUTCOMES)), tuple(FINAL_OUTCOMES)):
+            self.bloom.add(job_id)
+
+        self.run_seen = set()
+        self.role = None
+        self.location = None
+        self.checks = 0
+        self.duplicates_in_run = 0
+        self.known_from_previous_runs = 0
+        self.bloom_negatives = 0
+        self.bloom_false_positives = 0
+
+    def set_context(self, role=None, location=None):
+        """Rol/ubicación de la búsqueda en curso (se guardan con la primera aparición)."""
+        self.role, self.location = role, location
+
+    def claim(self, job_id):
+        """True si hay que procesar la oferta; False si es un duplicado (se registra la visita igualmente)."""
+        if not job_id:
+            return True
+        job_id = str(job_id)
+        now = time.time()
+        with self._lock:
+            self.checks += 1
+            if job_id in self.run_seen:
+                self.duplicates_in_run += 1
+                self._touch(job_id, now)
+                return False
+            self.run_seen.add(job_id)
+
+            if job_id not in self.bloom:
+                self.bloom_negatives += 1
+                finished = False
+            else:
+                row = self._conn.execute("SELECT outcome FROM seen_jobs WHERE job_id = ?", (job_id,)).fetchone()
+                finished = bool(row) and row[0] in FINAL_OUTCOMES
+                if not finished:
+                    self.bloom_false_positives += 1
+
+            if finished:
+                self.known_from_previous_runs += 1
+                self._touch(job_id, now)
+                return False
+            self._conn.execute("""
+                INSERT INTO seen_jobs (job_id, first_seen, last_seen, times_seen, role, location) VALUES (?, ?, ?, 1, ?, ?)
+                ON CONFLICT(job_id) DO UPDATE SET last_seen = excluded.last_seen, times_seen = times_seen + 1
+            """, (job_id, now, now, self.role, self.location))
+            self._conn.commit()
+            return True
+
+    def release(self, job_id):
+        """Devuelve una oferta reclamada que no llegó a procesarse (error de carga, parada) a esta ejecución."""
+        if job_id:
+            with self._lock:
+                self.run_seen.discard(str(job_id))
+
+    def _touch(self, job_id, now):
+        self._conn.execute("UPDATE seen_jobs SET last_seen = ?, times_seen = times_seen + 1 WHERE job_id = ?", (now, job_id))
+        self._conn.commit()
+
+    def record_outcome(self, job_id, outcome, match_percentage=None):
+        """Guarda el resultado (analyzed, below_threshold, prefilter_reject, model_skip, local_model, no_description...)."""
+        if not job_id:
+            return
+        job_id = str(job_id)
+        with self._lock:
+            self._conn.execute(
+                "UPDATE seen_jobs SET outcome = ?, match_percentage = ? WHERE job_id = ?",
+                (outcome, match_percentage, job_id)
+            )
+            self._conn.commit()
+            if outcome in FINAL_OUTCOMES:
+                self.bloom.add(job_id)
+
+    def stats(self):
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM seen_jobs").fetchone()[0]
+        skipped = self.duplicates_in_run + self.known_from_previous_runs
+        return {
+            "entries": entries,
+            "checks": self.checks,
+            "skipped": skipped,
+            "duplicates_in_run": self.duplicates_in_run,
+            "known_from_previous_runs": self.known_from_previous_runs,
+            "hit_rate": round(skipped / self.checks, 3) if self.checks else 0.0,
+            "bloom_negatives": self.bloom_negatives,
+            "bloom_false_positives": self.bloom_false_positives,
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,84 @@
+import os
+import json
+import time
+import hashlib
+import statistics
+
+
+class GeminiSessionCache:
+    """
+    Cache en disco del bootstrap de Gemini Web: cookies (__Secure-1PSID/1PSIDTS) + nonce SNlM0e.
+    Evita escanear las bases de cookies de Chrome y el GET /app en cada arranque
+    (bot de búsqueda y bot de postulación comparten el mismo archivo).
+
+    La ventana de validez se aprende: cada vez que una entrada falla por auth se
+    registra cuánto duró, y la siguiente se considera válida por la mediana observada
+    (acotada por max_age).
+    """
+
+    def __init__(self, path="user_data/gemini_handshake_cache.json", max_age=12 * 3600, min_age=10 * 60, source=""):
+        """source: valor configurado por el usuario (cookie de credentials.yaml); si cambia, la cache no vale."""
+        self.path = path
+        self.source_hash = hashlib.sha256((source or "").encode("utf-8")).hexdigest()
+        self.max_age = max_age
+        self.min_age = min_age
+
+    def _read(self):
+        try:
+            with open(self.path, "r") as f:
+                return json.load(f)
+        except Exception:
+            return {}
+
+    def _write(self, data):
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(data, f)
+        try:
+            os.chmod(tmp_path, 0o600) # Contiene cookies de sesión
+        except Exception:
+            pass
+        os.replace(tmp_path, self.path)
+
+    def validity_window(self, data=None):
+        """Segundos que se considera válida una entrada, según las vidas observadas."""
+        data = data if data is not None else self._read()
+        lifetimes = data.get("observed_lifetimes", [])
+        if not lifetimes:
+            return self.max_age
+        return max(self.min_age, min(self.max_age, statistics.median(lifetimes)))
+
+    def load(self):
+        """Devuelve {"cookies": {...}, "snlm0e": "..."} si la entrada sigue vigente, o None."""
+        data = self._read()
+        if not data.get("snlm0e") or not data.get("cookies"):
+            return None
+        if data.get("source_hash") != self.source_hash:
+            return None # El usuario cambió la cookie en credentials.yaml
+        age = time.time() - data.get("created_at", 0)
+        if age > self.validity_window(data):
+            return None
+        return {"cookies": data["cookies"], "snlm0e": data["snlm0e"], "age": age}
+
+    def save(self, cookies, snlm0e):
+        data = self._read()
+        data.update({
+            "cookies": {k: v for k, v in (cookies or {}).items() if v},
+            "snlm0e": snlm0e,
+            "source_hash": self.source_hash,
+            "created_at": time.time(),
+        })
+        self._write(data)
+
+    def invalidate(self):
+        """Marca la entrada actual como inválida (fallo de auth) y aprende su duración."""
+        data = self._read()
+        if not data.get("snlm0e"):
+            return
+        lifetime = time.time() - data.get("created_at", time.time())
+        data["observed_lifetimes"] = (data.get("observed_lifetimes", []) + [lifetime])[-10:]
+        data["snlm0e"] = None
+        self._write(data)
+        print(f"   🗝️ [SessionCache] Sesión invalidada tras {lifetime / 60:.0f} min.")
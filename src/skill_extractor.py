@@ -0,0 +1,180 @@
+import unicodedata
+from collections import deque
+
+# Variantes habituales en las ofertas -> nombre canónico del perfil
+DEFAULT_ALIASES = {
+    "C#": ["csharp", "c sharp"],
+    ".NET Core": [".net", "dotnet", "net core", ".net 6", ".net 8"],
+    "ASP.NET": ["asp.net core", "asp net"],
+    "SQL Server": ["mssql", "ms sql", "t-sql", "tsql"],
+    "JavaScript": ["js", "ecmascript", "es6"],
+    "TypeScript": ["ts"],
+    "React": ["react.js", "reactjs"],
+    "React Native": ["react-native"],
+    "Angular": ["angularjs", "angular.js"],
+    "JQuery": ["jquery"],
+    "Spring Boot": ["springboot", "spring-boot"],
+    "LLMs": ["llm", "large language model", "large language models", "genai", "generative ai", "ia generativa"],
+    "AI Integration": ["ai", "artificial intelligence", "inteligencia artificial", "openai", "langchain"],
+    "TensorFlow": ["tensor flow", "keras"],
+}
+
+# Frameworks -> lenguaje (misma inferencia que pide el prompt: Django->Python, Spring->Java)
+DEFAULT_FRAMEWORK_LANGUAGES = {
+    "Django": "Python", "Flask": "Python", "FastAPI": "Python", "PyTorch": "Python", "TensorFlow": "Python",
+    "Pandas": "Python",
+    "Spring": "Java", "Spring Boot": "Java",
+    ".NET Core": "C#", "ASP.NET": "C#",
+    "Angular": "TypeScript", "Ionic": "TypeScript",
+    "React": "JavaScript", "React Native": "JavaScript", "JQuery": "JavaScript",
+    "SugarCRM": "PHP",
+}
+
+
+def _fold(char):
+    """Minúscula sin tilde, 1 carácter -> 1 carácter (las posiciones siguen valiendo en el texto original)."""
+    base = unicodedata.normalize("NFKD", char)[:1] or char
+    return base.lower() if len(base.lower()) == 1 else char
+
+
+def fold_text(text):
+    return "".join(_fold(c) for c in str(text or ""))
+
+
+class AhoCorasick:
+    """
+    Autómata Aho-Corasick: encuentra todas las apariciones de todos los patrones
+    en una sola pasada lineal sobre el texto.
+    whole_words=True exige que los bordes alfanuméricos del patrón no estén pegados
+    a otra letra/dígito ("java" no aparece dentro de "javascript").
+    word_prefix=True solo exige el borde inicial ("lead" aparece en "leadership", no en "mislead").
+    """
+
+    def __init__(self, whole_words=True, word_prefix=False):
+        self.whole_words = whole_words
+        self.word_prefix = word_prefix
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]  # estado -> [(longitud, payload)]
+        self._built = False
+
+    def add(self, pattern, payload=None):
+        pattern = fold_text(pattern).strip()
+        if not pattern:
+            return
+        state = 0
+        for char in pattern:
+            if char not in self._goto[state]:
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+                self._goto[state][char] = len(self._goto) - 1
+            state = self._goto[state][char]
+        self._out[state].append((len(pattern), payload if payload is not None else pattern))
+        self._built = False
+
+    def build(self):
+        """Calcula los enlaces de fallo (BFS)."""
+        queue = deque(self._goto[0].values())
+        for state in queue:
+            self._fail[state] = 0
+        while queue:
+            state = queue.popleft()
+            for char, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[nxt] = self._goto[fallback].get(char, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+        self._built = True
+        return self
+
+    def iter_matches(self, text):
+        """Genera (inicio, fin, payload) para cada aparición, con posiciones sobre el texto original."""
+        if not self._built:
+            self.build()
+        folded = fold_text(text)
+        state = 0
+        for i, char in enumerate(folded):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for length, payload in self._out[state]:
+                start, end = i - length + 1, i + 1
+                if self.whole_words and not self._is_whole(folded, start, None if self.word_prefix else end):
+                    continue
+                yield start, end, payload
+
+    @staticmethod
+    def _is_whole(text, start, end):
+        if text[start].isalnum() and start > 0 and text[start - 1].isalnum():
+            return False
+        if end is not None and text[end - 1].isalnum() and end < len(text) and text[end].isalnum():
+            return False
+        return True
+
+    def find_all(self, text):
+        """Conjunto de payloads presentes en el texto."""
+        return {payload for _, _, payload in self.iter_matches(text)}
+
+
+class SkillExtractor:
+    """
+    Extrae las skills del perfil mencionadas en una oferta en una sola pasada.
+    El autómata se compila una vez con: stack_priority, skills (todas las áreas),
+    alias (DEFAULT_ALIASES + profile["skill_aliases"]) e inferencias framework -> lenguaje
+    (DEFAULT_FRAMEWORK_LANGUAGES + profile["framework_languages"]).
+    """
+
+    def __init__(self, profile):
+        profile = profile or {}
+        self.stack_priority = [list(group) for group in profile.get("stack_priority", [])]
+        self.framework_languages = dict(DEFAULT_FRAMEWORK_LANGUAGES)
+        self.framework_languages.update(profile.get("framework_languages", {}))
+
+        skills = {s for group in self.stack_priority for s in group}
+        for area in profile.get("skills", {}).values():
+            if isinstance(area, dict):
+                skills.update(area.keys())
+        self.skills = skills
+
+        aliases = {k: list(v) for k, v in DEFAULT_ALIASES.items()}
+        for skill, extra in profile.get("skill_aliases", {}).items():
+            aliases.setdefault(skill, []).extend(extra)
+
+        self.automaton = AhoCorasick(whole_words=True)
+        for skill in skills:
+            self.automaton.add(skill, skill)
+        for skill, variants in aliases.items():
+            if skill not in skills: continue # Solo skills del perfil
+            for variant in variants:
+                self.automaton.add(variant, skill)
+        self.automaton.build()
+
+    def extract(self, text):
+        """
+        Returns: {"mentions": [(skill, start, end)], "counts": {skill: n},
+                  "inferred": {lenguaje: [frameworks]}, "skills": set(directas + inferidas)}
+        """
+        mentions = [(skill, start, end) for start, end, skill in self.automaton.iter_matches(text)]
+        counts = {}
+        for skill, _, _ in mentions:
+            counts[skill] = counts.get(skill, 0) + 1
+
+        inferred = {}
+        for skill in counts:
+            language = self.framework_languages.get(skill)
+            if language and language not in counts:
+                inferred.setdefault(language, []).append(skill)
+
+        return {"mentions": mentions, "counts": counts, "inferred": inferred, "skills": set(counts) | set(inferred)}
+
+    def best_stack(self, extraction):
+        """Índice del grupo de stack_priority con más menciones (o None si ninguno aparece)."""
+        best, best_hits = None, 0
+        for i, group in enumerate(self.stack_priority):
+            hits = sum(extraction["counts"].get(s, 0) for s in group) + sum(1 for s in group if s in extraction["inferred"])
+            if hits > best_hits:
+                best, best_hits = i, hits
+        return best
@@ -0,0 +1,23 @@
+from src.adaptive_concurrency import AdaptiveConcurrency
+
+
+def test_grows_on_steady_successes_up_to_max():
+    controller = AdaptiveConcurrency(max_limit=3, initial=1, increase_after=2)
+    for _ in range(10):
+        controller.on_result(1.0)
+    assert controller.limit == 3
+
+
+def test_halves_on_error_and_slow_page():
+    controller = AdaptiveConcurrency(max_limit=8, initial=8)
+    assert controller.on_result(1.0, ok=False) == 4
+    for _ in range(3):
+        controller.on_result(1.0)
+    assert controller.on_result(5.0) == 2  # > 2x median latency
+    assert controller.stats()["decreases"] == 2
+
+
+def test_never_drops_below_min():
+    controller = AdaptiveConcurrency(max_limit=4, min_limit=1, initial=1)
+    controller.on_result(0, ok=False)
+    assert controller.limit == 1
@@ -0,0 +1,114 @@
+import threading
+import time
+
+import pytest
+
+from src.analysis_cache import AnalysisCache, extract_job_id
+
+
+def test_extract_job_id():
+    assert extract_job_id("https://www.linkedin.com/jobs/view/3812345678/?trk=abc") == "3812345678"
+    assert extract_job_id("https://www.linkedin.com/jobs/search/?currentJobId=42&keywords=x") == "42"
+    assert extract_job_id("Unknown") is None
+
+
+def test_cache_hit_and_key_changes(tmp_path):
+    cache = AnalysisCache(db_path=str(tmp_path / "cache.sqlite"))
+    key = cache.make_key("1", "desc", "ctx")
+    assert cache.get(key) is None
+    cache.put(key, {"match_percentage": 80}, job_id="1")
+    assert cache.get(key) == {"match_percentage": 80}
+    # Changing the profile/prompt hash must miss
+    assert cache.get(cache.make_key("1", "desc", "other-ctx")) is None
+
+
+def test_ttl_and_size_eviction(tmp_path):
+    cache = AnalysisCache(db_path=str(tmp_path / "cache.sqlite"), ttl_seconds=0.05, max_entries=2)
+    for i in range(3):
+        cache.put(cache.make_key(str(i), "d", ""), {"i": i})
+    assert cache.stats()["entries"] == 2
+    time.sleep(0.1)
+    assert cache.get(cache.make_key("2", "d", "")) is None
+
+
+def test_single_flight(tmp_path):
+    cache = AnalysisCache(db_path=str(tmp_path / "cache.sqlite"))
+    key = cache.make_key("7", "same job", "")
+    calls = []
+
+    def slow():
+        calls.append(1)
+        time.sleep(0.2)
+        return {"match_percentage": 55}
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute(key, slow))) for _ in range(4)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+
+    assert len(calls) == 1
+    assert results == [{"match_percentage": 55}] * 4
+
+
+def test_single_flight_followers_get_the_leader_error(tmp_path):
+    cache = AnalysisCache(db_path=str(tmp_path / "cache.sqlite"))
+    key = cache.make_key("8", "failing job", "")
+    calls = []
+
+    def failing():
+        calls.append(1)
+        time.sleep(0.2)
+        raise RuntimeError("LLM down")
+
+    errors = []
+
+    def worker():
+        try:
+            cache.get_or_compute(key, failing)
+        except RuntimeError as e:
+            errors.append(str(e))
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+
+    assert len(calls) == 1
+    assert errors == ["LLM down"] * 4
+
+
+def test_late_caller_reuses_the_stored_result_instead_of_leading_again(tmp_path, monkeypatch):
+    cache = AnalysisCache(db_path=str(tmp_path / "cache.sqlite"))
+    key = cache.make_key("9", "job", "")
+    # The first get() misses; the previous leader stores the result before the in-flight check
+    first_get = cache.get
+    monkeypatch.setattr(cache, "get", lambda k: cache.put(k, {"match_percentage": 60}) or first_get("missing"))
+    assert cache.get_or_compute(key, lambda: pytest.fail("computed twice")) == {"match_percentage": 60}
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 0
+
+
+def test_db_is_opened_lazily_and_hits_do_not_write(tmp_path):
+    path = tmp_path / "sub" / "cache.sqlite"
+    cache = AnalysisCache(db_path=str(path))
+    assert not path.parent.exists()
+
+    keys = [cache.make_key(str(i), "desc") for i in range(cache.TOUCH_BATCH)]
+    for key in keys:
+        cache.put(key, {"match_percentage": 80})
+    writes = cache._conn.total_changes
+    for key in keys[:-1]:
+        assert cache.get(key) == {"match_percentage": 80}
+    assert cache._conn.total_changes == writes
+    cache.get(keys[-1])  # The batch is full: the touches are written together
+    assert cache._conn.total_changes == writes + cache.TOUCH_BATCH
+
+
+def test_pending_touches_decide_the_lru_victim(tmp_path):
+    cache = AnalysisCache(db_path=str(tmp_path / "cache.sqlite"), max_entries=2)
+    old, new = cache.make_key("old", "d"), cache.make_key("new", "d")
+    cache.put(old, {"i": 0})
+    time.sleep(0.01)
+    cache.put(new, {"i": 1})
+    time.sleep(0.01)
+    cache.get(old)  # Touch only kept in memory...
+    cache.put(cache.make_key("third", "d"), {"i": 2})  # ...but flushed before evicting
+    assert cache.get(old) == {"i": 0} and cache.get(new) is None
@@ -0,0 +1,27 @@
+from src.answer_store import AnswerStore
+
+
+def test_near_identical_wording_hits(tmp_path):
+    store = AnswerStore(db_path=str(tmp_path / "answers.sqlite"), profile_hash="p1")
+    store.put("How many years of experience do you have with Python?", None, "5", "High")
+    hit = store.lookup("How many years of experience with Python *")
+    assert hit and hit["answer"] == "5"
+
+
+def test_different_skill_or_options_miss(tmp_path):
+    store = AnswerStore(db_path=str(tmp_path / "answers.sqlite"), profile_hash="p1")
+    store.put("How many years of experience do you have with Python?", None, "5", "High")
+    store.put("Are you comfortable commuting to Bogotá?", ["Yes", "No"], "Yes", "High")
+    assert store.lookup("How many years of experience do you have with Java?") is None
+    assert store.lookup("Are you comfortable commuting to Bogota?", ["No", "Yes"])["answer"] == "Yes"
+    assert store.lookup("Are you comfortable commuting to Bogota?", ["Yes", "No", "Maybe"]) is None
+
+
+def test_low_confidence_not_served_and_profile_change_invalidates(tmp_path):
+    db = str(tmp_path / "answers.sqlite")
+    store = AnswerStore(db_path=db, profile_hash="p1")
+    store.put("Notice period?", None, "2 weeks", "Low")
+    store.put("Background check?", None, "Yes", "High")
+    assert store.lookup("Notice period?") is None
+    assert AnswerStore(db_path=db, profile_hash="p1").lookup("Background check?")["answer"] == "Yes"
+    assert AnswerStore(db_path=db, profile_hash="p2").lookup("Background check?") is None
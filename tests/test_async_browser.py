@@ -0,0 +1,164 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("playwright")
+
+from src.async_browser import AsyncJobSearchBrowser
+from src.seen_jobs import SeenJobIndex
+
+
+class FakeTab:
+    """Tab whose load time depends on the job, so loads finish out of list order."""
+
+    def __init__(self, delays, broken):
+        self.delays = delays
+        self.broken = broken
+        self.url = "about:blank"
+        self.closed = False
+
+    async def goto(self, url, wait_until=None, timeout=None):
+        await asyncio.sleep(self.delays.get(url, 0))
+        if url in self.broken:
+            raise TimeoutError("page did not load")
+        self.url = url
+
+    async def wait_for_selector(self, selector, timeout=None):
+        return True
+
+    async def evaluate(self, script, arg=None):
+        return {"title": self.url}
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeContext:
+    def __init__(self, delays=None, broken=()):
+        self.delays = delays or {}
+        self.broken = set(broken)
+        self.tabs = []
+
+    async def new_page(self):
+        self.tabs.append(FakeTab(self.delays, self.broken))
+        return self.tabs[-1]
+
+
+def job(n):
+    return f"https://www.linkedin.com/jobs/view/{n}/"
+
+
+def make_browser(context, tmp_path):
+    browser = AsyncJobSearchBrowser(pacing_scale=0, seen_index=SeenJobIndex(db_path=str(tmp_path / "seen.sqlite")))
+    browser.context = context
+    return browser
+
+
+def test_parallel_scan_keeps_list_order_and_skips_failed_loads(tmp_path):
+    urls = [job(n) for n in range(1, 6)]
+    context = FakeContext(delays={url: 0.05 - 0.01 * i for i, url in enumerate(urls)}, broken=[job(3)])
+    browser = make_browser(context, tmp_path)
+    assert all(browser._claim(url) for url in urls)
+    seen = []
+
+    processed = asyncio.run(browser.scan_job_urls_parallel(urls, lambda details, url: seen.append(details["title"]), max_tabs=3))
+
+    assert processed == 4
+    assert seen == [job(1), job(2), job(4), job(5)]
+    assert len(context.tabs) <= 3 and all(tab.closed for tab in context.tabs)
+    # The failed job is released for a later search; the processed ones stay claimed
+    assert browser._claim(job(3)) and not browser._claim(job(1))
+
+
+def test_parallel_scan_stops_on_false_and_releases_unprocessed_jobs(tmp_path):
+    urls = [job(n) for n in range(1, 7)]
+    context = FakeContext()
+    browser = make_browser(context, tmp_path)
+    assert all(browser._claim(url) for url in urls)
+    seen = []
+
+    async def callback(details, url):
+        seen.append(url)
+        return len(seen) < 2
+
+    processed = asyncio.run(browser.scan_job_urls_parallel(urls, callback, max_tabs=3))
+
+    assert processed == 1
+    assert seen == [job(1), job(2)]
+    assert all(tab.closed for tab in context.tabs)
+    assert not browser._claim(job(1))
+    assert all(browser._claim(url) for url in urls[1:])
+
+
+def test_scroll_targets_the_detected_results_list():
+    assert AsyncJobSearchBrowser._list_selector("ul.scaffold-layout__list-container li") == "ul.scaffold-layout__list-container"
+    assert AsyncJobSearchBrowser._list_selector(".jobs-search__results-list li") == ".jobs-search__results-list"
+    assert AsyncJobSearchBrowser._list_selector(".job-card-container") is None
+
+
+class FakeLink:
+    def __init__(self, href):
+        self.href = href
+
+    async def get_attribute(self, name):
+        return self.href
+
+
+class FakeCard:
+    def __init__(self, n):
+        self.n = n
+
+    async def query_selector(self, selector):
+        return FakeLink(f"/jobs/view/{self.n}/?trk=search")
+
+    async def scroll_into_view_if_needed(self):
+        pass
+
+
+class FakeResultsPage:
+    """Results list that renders `per_scroll` more cards each time it is scrolled."""
+
+    def __init__(self, jobs, per_scroll=3):
+        self.jobs = jobs
+        self.per_scroll = per_scroll
+        self.visible = per_scroll
+        self.scrolled = []
+
+    async def query_selector_all(self, selector):
+        return [FakeCard(n) for n in self.jobs[:self.visible]]
+
+    async def evaluate(self, script, arg=None):
+        if "scrollBy" in script:
+            self.scrolled.append(arg)
+            self.visible += self.per_scroll
+
+    async def wait_for_selector(self, selector, timeout=None):
+        return True
+
+
+def test_parallel_scan_claims_while_collecting_so_seen_jobs_do_not_use_the_limit(tmp_path):
+    browser = make_browser(FakeContext(), tmp_path)
+    browser.page = FakeResultsPage(list(range(1, 10)))
+    assert all(browser._claim(job(n)) for n in (1, 2, 3, 4))  # Seen in an earlier search
+    processed = []
+
+    result = asyncio.run(browser.scan_search_results("linkedin", 3, lambda details, url: processed.append(url),
+                                                     parallel_tabs=2))
+
+    assert processed == [job(5), job(6), job(7)]
+    assert (result.processed, result.found, result.skipped) == (3, 7, 4)
+    assert browser.page.scrolled[0] == ".jobs-search-results-list"
+
+
+def test_failed_parallel_scan_releases_the_jobs_it_claimed(tmp_path, monkeypatch):
+    browser = make_browser(FakeContext(), tmp_path)
+    browser.page = FakeResultsPage(list(range(1, 4)))
+
+    async def broken_scan(urls, callback_fn, max_tabs=3, page_timeout=20000):
+        raise RuntimeError("browser crashed")
+    monkeypatch.setattr(browser, "scan_job_urls_parallel", broken_scan)
+
+    result = asyncio.run(browser.scan_search_results("linkedin", 3, lambda details, url: None, parallel_tabs=2))
+
+    assert result.processed == 0 and result.found == 3
+    assert all(browser._claim(job(n)) for n in (1, 2, 3))
@@ -0,0 +1,201 @@
+import os
+import json
+import threading
+
+import pytest
+
+pytest.importorskip("requests")
+pytest.importorskip("yaml")
+
+import src.brain as brain_module
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PATHS = dict(prompt_path=os.path.join(REPO, "prompts", "analyze_job.txt"),
+             profile_path=os.path.join(REPO, "config", "profile_config.json"))
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class ScriptedModel:
+    """Stands in for the API model: answers each call with the next scripted response."""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.prompts = []
+
+    def generate_content(self, prompt, generation_config=None):
+        self.prompts.append(prompt)
+        return FakeResponse(self.responses.pop(0))
+
+
+def make_analyzer(tmp_path, monkeypatch, model):
+    def connect(self, credentials_path):
+        self._model = model
+        self._build_router()
+
+    monkeypatch.setattr(brain_module.JobAnalyzer, "_connect_backend_inner", connect)
+    return brain_module.JobAnalyzer(background=False, data_dir=str(tmp_path), **PATHS)
+
+
+def analysis(job_id, match):
+    return {"job_id": job_id, "match_percentage": match, "priority_score": 2, "analysis": "ok"}
+
+
+def test_batch_retries_only_unparsed_jobs_then_falls_back_per_job(tmp_path, monkeypatch):
+    model = ScriptedModel([
+        # 1st batch: job 1 is fine, job 2 is truncated, job 3 is missing
+        json.dumps([analysis("1", 80)])[:-1] + ', {"job_id": "2", "match_percentage": 4',
+        # Retry with 2 and 3 only: job 2 comes back (plus an ID that was never asked), 3 is still missing
+        "```json\n" + json.dumps([analysis("2", 40), analysis("99", 1)]) + "\n```",
+        # Per-job fallback for job 3
+        json.dumps({"match_percentage": 10, "priority_score": 1, "analysis": "solo"}),
+    ])
+    analyzer = make_analyzer(tmp_path, monkeypatch, model)
+    jobs = [{"job_id": "3", "text": "Job three: COBOL"}, {"job_id": "1", "text": "Job one: C#"},
+            {"job_id": "2", "text": "Job two: Python"}, {"job_id": None, "text": ""}]
+
+    results = analyzer.analyze_batch(jobs)
+
+    assert [r and r["match_percentage"] for r in results] == [10, 80, 40, None]
+    assert all("job_id" not in r for r in results[:3])
+    retry_prompt = model.prompts[1]
+    assert "JOB_ID: 2" in retry_prompt and "JOB_ID: 3" in retry_prompt and "JOB_ID: 1" not in retry_prompt
+    assert "JOB_ID" not in model.prompts[2]
+    # Each job is one cache miss, even the one that went through the per-job fallback
+    assert (analyzer.analysis_cache.hits, analyzer.analysis_cache.misses) == (0, 3)
+
+    assert analyzer.analyze_batch(jobs[:3]) == results[:3]
+    assert len(model.prompts) == 3
+    assert (analyzer.analysis_cache.hits, analyzer.analysis_cache.misses) == (3, 3)
+
+
+def test_batch_with_no_parsable_answer_is_retried_then_analyzed_one_by_one(tmp_path, monkeypatch):
+    model = ScriptedModel(["Lo siento, no puedo.", "[]",
+                           json.dumps({"match_percentage": 70, "priority_score": 4, "analysis": "a"}),
+                           json.dumps({"match_percentage": 20, "priority_score": 1, "analysis": "b"})])
+    analyzer = make_analyzer(tmp_path, monkeypatch, model)
+
+    results = analyzer.analyze_batch([{"job_id": "1", "text": "Job one"}, {"job_id": "2", "text": "Job two"}])
+
+    assert [r["match_percentage"] for r in results] == [70, 20]
+    assert len(model.prompts) == 4
+    assert analyzer.analysis_cache.misses == 2
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000.0
+
+    def time(self):
+        return self.now
+
+
+class FakeWebClient:
+    """Gemini web conversation stub: each analysis turn takes the next scripted latency on the fake clock."""
+
+    def __init__(self, clock, latencies=()):
+        self.clock = clock
+        self.latencies = list(latencies)
+        self.prompts = []
+        self.resets = 0
+        self.conversation = 0
+
+    def chat(self, prompt, stream=False, required_keys=None):
+        self.prompts.append(prompt)
+        if prompt.startswith("IDENTIFICADOR DE SESION"):
+            self.conversation += 1
+            return "LISTO"
+        self.clock.now += self.latencies.pop(0) if self.latencies else 1.0
+        return json.dumps({"match_percentage": 50, "priority_score": 3, "analysis": "ok"})
+
+    def primes(self):
+        return sum(p.startswith("IDENTIFICADOR DE SESION") for p in self.prompts)
+
+    def get_context(self):
+        return {"conversation_id": f"c_{self.conversation}"}
+
+    def set_context(self, context):
+        pass
+
+    def reset_context(self):
+        self.resets += 1
+
+
+def make_web_analyzer(tmp_path, monkeypatch, latencies=()):
+    clock = Clock()
+    monkeypatch.setattr("src.llm_router.time", clock)
+    client = FakeWebClient(clock, latencies)
+
+    def connect(self, credentials_path):
+        self._client = client
+        self._build_router()
+
+    monkeypatch.setattr(brain_module.JobAnalyzer, "_connect_backend_inner", connect)
+    analyzer = brain_module.JobAnalyzer(background=False, data_dir=str(tmp_path), **PATHS)
+    analyzer.analysis_cache = None
+    return analyzer, client
+
+
+def test_conversation_rotates_after_the_turn_limit(tmp_path, monkeypatch):
+    monkeypatch.setattr(brain_module, "ROTATE_AFTER_TURNS", 3)
+    analyzer, client = make_web_analyzer(tmp_path, monkeypatch)
+
+    for i in range(3):
+        assert analyzer.analyze(f"Job {i}")["match_percentage"] == 50
+    assert (client.primes(), client.resets, analyzer.session_turns) == (1, 0, 3)
+
+    analyzer.analyze("Job 3")
+    assert (client.primes(), client.resets, analyzer.session_turns) == (2, 1, 1)
+
+
+def test_conversation_rotates_when_the_median_turn_latency_is_too_high(tmp_path, monkeypatch):
+    slow = brain_module.ROTATE_LATENCY_SECONDS + 5
+    # One slow turn is not enough (median of the window); a slow window is
+    analyzer, client = make_web_analyzer(tmp_path, monkeypatch, latencies=[1, slow, 1, slow, slow])
+
+    for i in range(4):
+        analyzer.analyze(f"Job {i}")
+    assert (client.primes(), client.resets) == (1, 0)
+    assert list(analyzer.turn_latencies) == [slow, 1, slow]
+
+    analyzer.analyze("Job 4")  # Window [slow, 1, slow]: median is slow, so this turn goes to a new conversation
+    assert (client.primes(), client.resets) == (2, 1)
+    assert list(analyzer.turn_latencies) == [slow] and analyzer.session_turns == 1
+
+
+def test_analysis_waits_for_a_slow_background_connect(tmp_path, monkeypatch):
+    release = threading.Event()
+
+    def connect(self, credentials_path):
+        release.wait(5)
+        self._model = ScriptedModel([json.dumps(analysis("1", 60))])
+        self._build_router()
+
+    monkeypatch.setattr(brain_module.JobAnalyzer, "_connect_backend_inner", connect)
+    analyzer = brain_module.JobAnalyzer(background=True, data_dir=str(tmp_path), **PATHS)
+    assert not analyzer._backend_ready.is_set()
+
+    threading.Timer(0.1, release.set).start()
+    assert analyzer.analyze("Job 1", job_id="1")["match_percentage"] == 60
+
+
+def test_background_connect_failure_reaches_the_caller(tmp_path, monkeypatch):
+    def connect(self, credentials_path):
+        raise ValueError("credentials.yaml corrupto")
+
+    monkeypatch.setattr(brain_module.JobAnalyzer, "_connect_backend_inner", connect)
+    analyzer = brain_module.JobAnalyzer(background=True, data_dir=str(tmp_path), **PATHS)
+
+    waiter = threading.Thread(target=analyzer._backend_ready.wait, args=(5,))
+    waiter.start()
+    waiter.join(5)
+    assert not waiter.is_alive()
+    with pytest.raises(RuntimeError, match="credentials.yaml corrupto") as error:
+        analyzer.analyze("Job 1", job_id="1")
+    assert isinstance(error.value.__cause__, ValueError)
+
+    with pytest.raises(RuntimeError, match="credentials.yaml corrupto"):
+        brain_module.JobAnalyzer(background=False, data_dir=str(tmp_path / "fg"), **PATHS)
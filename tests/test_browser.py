@@ -0,0 +1,113 @@
+import threading
+
+import pytest
+
+pytest.importorskip("playwright")
+
+from src.async_browser import AsyncJobSearchBrowser
+from src.browser import JobSearchBrowser, SyncProxy
+
+
+def loop_thread():
+    return threading.current_thread().name
+
+
+class FakeHandle:
+    """Stands in for a playwright.async_api object (the proxy only wraps those)."""
+
+    __module__ = "playwright.async_api._fake"
+
+    def __init__(self, name, calls):
+        self.name = name
+        self.calls = calls
+
+    @property
+    def first(self):
+        return FakeHandle(f"{self.name}.first", self.calls)
+
+    async def click(self, timeout=None):
+        self.calls.append(("click", self.name, timeout, loop_thread()))
+
+    async def text_content(self):
+        return f"text of {self.name}"
+
+
+class FakeChooserContext:
+    __module__ = "playwright._impl._fake"
+
+    def __init__(self, calls):
+        self.calls = calls
+
+    async def __aenter__(self):
+        self.calls.append(("enter", loop_thread()))
+        return FakeHandle("chooser", self.calls)
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.calls.append(("exit", exc_type))
+        return False
+
+
+class FakePage(FakeHandle):
+    url = "https://www.linkedin.com/jobs/"
+
+    def locator(self, selector):
+        return FakeHandle(selector, self.calls)
+
+    async def query_selector_all(self, selector):
+        return [FakeHandle(f"{selector}[{i}]", self.calls) for i in range(2)]
+
+    async def evaluate(self, script, arg=None):
+        self.calls.append(("evaluate", type(arg).__name__))
+
+    def expect_file_chooser(self):
+        return FakeChooserContext(self.calls)
+
+
+@pytest.fixture
+def browser(monkeypatch):
+    async def start(self):
+        self.page = FakePage("page", [])
+
+    async def close(self):
+        pass
+
+    monkeypatch.setattr(AsyncJobSearchBrowser, "start", start)
+    monkeypatch.setattr(AsyncJobSearchBrowser, "close", close)
+    browser = JobSearchBrowser(pacing_scale=0)
+    yield browser
+    browser.close()
+
+
+def test_sync_proxy_runs_attributes_and_calls_on_the_browser_loop(browser):
+    page = browser.page
+    calls = browser.async_browser.page.calls
+    assert isinstance(page, SyncProxy)
+    assert page.url == "https://www.linkedin.com/jobs/"
+
+    page.locator("#apply").first.click(timeout=5)
+    assert calls[-1] == ("click", "#apply.first", 5, "browser-loop")
+    assert page.locator("#apply").text_content() == "text of #apply"
+
+    cards = page.query_selector_all("li")
+    assert [type(card) for card in cards] == [SyncProxy, SyncProxy]
+    assert cards[1].text_content() == "text of li[1]"
+    # Proxies passed back as arguments are unwrapped to the async object
+    page.evaluate("el => el.click()", cards[0])
+    assert calls[-1] == ("evaluate", "FakeHandle")
+
+
+def test_sync_proxy_context_manager_maps_to_async_enter_exit(browser):
+    calls = browser.async_browser.page.calls
+    with browser.page.expect_file_chooser() as chooser:
+        assert isinstance(chooser, SyncProxy)
+        chooser.click()
+    assert calls == [("enter", "browser-loop"), ("click", "chooser", None, "browser-loop"), ("exit", None)]
+
+
+def test_human_delay_runs_on_the_browser_loop(browser, monkeypatch):
+    recorded = []
+    pacer = browser.async_browser.pacer
+    original = pacer._record
+    monkeypatch.setattr(pacer, "_record", lambda kind, **kw: recorded.append((kind, loop_thread())) or original(kind, **kw))
+    browser.human_delay(0, 0)
+    assert recorded == [("fixed", "browser-loop")]
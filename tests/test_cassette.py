@@ -0,0 +1,104 @@
+import os
+import json
+import time
+
+import pytest
+
+from src.cassette import Cassette, CassetteModel, CassetteMiss, ReplayResponse, MODE_RECORD, MODE_REPLAY
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeModel:
+    def __init__(self):
+        self.calls = 0
+
+    def generate_content(self, prompt, generation_config=None):
+        self.calls += 1
+        time.sleep(0.02)
+        return FakeResponse(f'{{"echo": "{prompt}", "n": {self.calls}}}')
+
+
+def test_record_then_replay_api_offline(tmp_path):
+    path = str(tmp_path / "run.json")
+    recorder = CassetteModel(FakeModel(), Cassette(path, mode=MODE_RECORD))
+    first = recorder.generate_content("job A").text
+    second = recorder.generate_content("job A").text
+    recorder.generate_content("job B")
+
+    replay = CassetteModel(None, Cassette(path, mode=MODE_REPLAY, latency="none"))
+    # Same prompt recorded twice: served in order, then the last one repeats
+    assert replay.generate_content("job A").text == first
+    assert replay.generate_content("job A").text == second
+    assert replay.generate_content("job A").text == second
+    assert replay.cassette.stats() == {"mode": "replay", "recorded": 3, "hits": 3, "misses": 0}
+    assert replay.cassette.has("api") and not replay.cassette.has("web")
+
+    with pytest.raises(CassetteMiss):
+        replay.generate_content("job C")
+
+
+def test_replay_latency_modes(tmp_path):
+    path = str(tmp_path / "run.json")
+    Cassette(path, mode=MODE_RECORD).record("web", "fast", "p", "body", latency=0.3)
+
+    started = time.time()
+    Cassette(path, latency="none").replay("web", "fast", "p")
+    assert time.time() - started < 0.1
+
+    started = time.time()
+    Cassette(path, latency=0.05).replay("web", "fast", "p")
+    assert 0.05 <= time.time() - started < 0.25
+
+
+def test_replay_response_streams_lines():
+    resp = ReplayResponse(")]}'\n\n123\n[[\"wrb.fr\"]]")
+    assert list(resp.iter_lines()) == [")]}'", "", "123", '[["wrb.fr"]]']
+
+
+def test_replay_requires_existing_cassette(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        Cassette(str(tmp_path / "missing.json"), mode=MODE_REPLAY)
+
+
+class FakeAnalysisModel:
+    """Stands in for the paid API while recording: a valid analysis for single and batch prompts."""
+
+    def generate_content(self, prompt, generation_config=None):
+        if "=== JOB_ID:" in prompt:
+            ids = [line.split("JOB_ID: ")[1].rstrip(" =") for line in prompt.splitlines() if line.startswith("=== JOB_ID:")]
+            return FakeResponse(json.dumps([{"job_id": i, "match_percentage": 70, "priority_score": 2, "analysis": "ok"} for i in ids]))
+        return FakeResponse('{"match_percentage": 55, "priority_score": 3, "analysis": "ok"}')
+
+
+def test_job_analyzer_replays_recorded_calls_offline(tmp_path, monkeypatch):
+    pytest.importorskip("requests")
+    pytest.importorskip("yaml")
+    import src.brain as brain_module
+
+    repo = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    paths = dict(prompt_path=os.path.join(repo, "prompts", "analyze_job.txt"),
+                 profile_path=os.path.join(repo, "config", "profile_config.json"), data_dir=str(tmp_path))
+    path = str(tmp_path / "run.json")
+
+    def connect_fake_api(self, credentials_path):
+        self._model = CassetteModel(FakeAnalysisModel(), self.cassette)
+        self._build_router()
+
+    with monkeypatch.context() as patched:
+        patched.setattr(brain_module.JobAnalyzer, "_connect_backend_inner", connect_fake_api)
+        recorder = brain_module.JobAnalyzer(cassette=Cassette(path, mode=MODE_RECORD), background=False, **paths)
+        recorder.analysis_cache = None
+        single = recorder.analyze("PUBLICATION DATE: 2 hours ago\n\nSenior Python engineer, remote.", job_id="1")
+        batch = recorder.analyze_batch([{"job_id": "2", "text": "PUBLICATION DATE: 1 day ago\n\nJava lead"},
+                                        {"job_id": "3", "text": "PUBLICATION DATE: 3 days ago\n\nC# architect"}])
+
+    cassette = Cassette(path, mode=MODE_REPLAY, latency="none")
+    assert [call["method"] for call in cassette.calls] == ["analyze", "analyze_batch"]
+    replayer = brain_module.JobAnalyzer(cassette=cassette, background=False, **paths)
+    results = [result for call in cassette.calls for result in replayer.replay_call(call)]
+    assert results == [single] + batch
+    assert cassette.stats()["misses"] == 0
@@ -1,6 +1,7 @@
 from src.browser import JobSearchBrowser
 from src.brain import JobAnalyzer
 import os
+import tempfile
 
 def test_browser():
     print("Testing Browser...")
@@ -18,7 +19,9 @@ def test_brain_init():
     print("Testing Brain Init...")
     # Mock key to test init structure, not actual call
     try:
-        brain = JobAnalyzer(api_key="fake_key")
+        # Caches and logs go to a temp dir, not ./user_data
+        with tempfile.TemporaryDirectory() as data_dir:
+            brain = JobAnalyzer(api_key="fake_key", background=False, data_dir=data_dir)
         print("Brain Init PASSED (Structure only)")
     except Exception as e:
         print(f"Brain Init FAILED: {e}")
@@ -0,0 +1,93 @@
+import json
+
+import pytest
+
+pytest.importorskip("requests")
+
+from src.gemini_web_client import AntigravityGemini
+
+
+def frame(text):
+    """One StreamGenerate 'wrb.fr' line carrying the accumulated answer text."""
+    inner = [None, ["c_1", "r_1"], None, None, [["rc_1", [text]]]]
+    return json.dumps([["wrb.fr", None, json.dumps(inner)]])
+
+
+class BytesResponse:
+    """requests.Response without a charset: iter_lines yields bytes even with decode_unicode=True."""
+
+    def __init__(self, lines):
+        self.lines = lines
+        self.closed = False
+
+    def iter_lines(self, decode_unicode=False):
+        for line in self.lines:
+            yield line.encode("utf-8")
+
+    def close(self):
+        self.closed = True
+
+
+def test_chat_stream_decodes_byte_frames_and_skips_broken_ones():
+    client = AntigravityGemini.__new__(AntigravityGemini)
+    client.cid = client.rid = client.rcid = ""
+    resp = BytesResponse([")]}'", "", '[["wrb.fr", null, "{broken'] + [frame('{"match_'), frame('{"match_percentage": 80}')])
+    client._post = lambda prompt, model="fast", stream=False: resp
+
+    assert list(client.chat_stream("hola")) == ['{"match_', '{"match_percentage": 80}']
+    assert resp.closed
+    assert (client.cid, client.rid, client.rcid) == ("c_1", "r_1", "rc_1")
+
+
+class StatusSession:
+    """requests.Session stub: StreamGenerate answers with the queued status codes."""
+
+    def __init__(self, statuses):
+        self.statuses = list(statuses)
+
+    def post(self, url, params=None, data=None, timeout=None, stream=False):
+        import requests
+
+        resp = requests.Response()
+        resp.status_code = self.statuses.pop(0)
+        resp.url, resp.reason, resp._content = url, "status", b""
+        return resp
+
+
+class NoWaitLimiter:
+    def acquire(self):
+        return 0.0
+
+    def on_success(self, latency=None):
+        pass
+
+    def on_rate_limited(self, retry_after=None):
+        pass
+
+
+def make_posting_client(statuses):
+    client = AntigravityGemini.__new__(AntigravityGemini)
+    client.cid = client.rid = client.rcid = ""
+    client.snlm0e, client.req_id, client.cassette = "nonce", 1000, None
+    client.dummy_image = client.DUMMY_IMAGE
+    client._post_stats = AntigravityGemini._empty_stats()
+    client.rate_limiter = NoWaitLimiter()
+    client.session = StatusSession(statuses)
+    client.refreshes = 0
+
+    def refresh():
+        client.refreshes += 1
+        return True
+    client._refresh_auth = refresh
+    return client
+
+
+def test_only_401_and_403_refresh_the_session():
+    client = make_posting_client([400])
+    assert client._post("hola").startswith("Error: 400")
+    assert client.refreshes == 0
+
+    for status in (401, 403):
+        client = make_posting_client([status, 200])
+        assert client._post("hola").status_code == 200
+        assert client.refreshes == 1
@@ -0,0 +1,64 @@
+import time
+
+from src.job_api import JobApiCapture, time_ago
+
+DESCRIPTION = "We are hiring a Python developer. Requirements: 5+ years with Django and AWS, strong English, CI/CD and testing."
+
+CARDS_PAYLOAD = {
+    "data": {"elements": [{"jobCardUnion": {"*jobPostingCard": "urn:li:fsd_jobPostingCard:(111,JOBS_SEARCH)"}}]},
+    "included": [
+        {
+            "$type": "com.linkedin.voyager.dash.jobs.JobPostingCard",
+            "entityUrn": "urn:li:fsd_jobPostingCard:(111,JOBS_SEARCH)",
+            "jobPostingTitle": "Senior Python Developer",
+            "primaryDescription": {"text": "Acme"},
+            "secondaryDescription": {"text": "Bogotá, Colombia (Remote)"},
+            "footerItems": [{"type": "LISTED_DATE", "timeAt": (time.time() - 2 * 86400) * 1000}],
+        },
+    ],
+}
+
+POSTING_PAYLOAD = {
+    "data": {"entityUrn": "urn:li:fs_normalized_jobPosting:111"},
+    "included": [
+        {
+            "$type": "com.linkedin.voyager.jobs.JobPosting",
+            "entityUrn": "urn:li:fs_normalized_jobPosting:111",
+            "title": "Senior Python Developer",
+            "description": {"text": DESCRIPTION},
+            "workplaceTypes": ["urn:li:fs_workplaceType:3"],
+            "companyDetails": {"com.linkedin.voyager.jobs.JobPostingCompany": {"companyResolutionResult": {"name": "Acme Inc"}}},
+        },
+    ],
+}
+
+
+def test_card_alone_is_not_enough_without_description():
+    capture = JobApiCapture()
+    assert capture.feed(CARDS_PAYLOAD) == {"111"}
+    assert capture.details_for("111") is None
+    partial = capture.details_for("111", require_description=False)
+    assert partial["company"] == "Acme"
+    assert partial["location"] == "Bogotá, Colombia"
+    assert partial["work_mode"] == "Remote"
+    assert partial["date"] == "2 days ago"
+
+
+def test_posting_completes_the_job():
+    capture = JobApiCapture()
+    capture.feed(CARDS_PAYLOAD)
+    capture.feed(POSTING_PAYLOAD)
+    details = capture.details_for("111")
+    assert details["description"] == DESCRIPTION
+    assert details["title"] == "Senior Python Developer"
+    assert details["company"] == "Acme Inc"
+    assert details["work_mode"] == "Hybrid"  # workplaceTypes wins over the card text
+    assert details["raw_requirements"].startswith("5+ years")
+    assert capture.stats()["with_description"] == 1
+
+
+def test_time_ago_format():
+    now = 1_000_000
+    assert time_ago((now - 3 * 3600) * 1000, now=now) == "3 hours ago"
+    assert time_ago((now - 8 * 86400) * 1000, now=now) == "1 week ago"
+    assert time_ago(now * 1000, now=now) == "just now"
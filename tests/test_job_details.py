@@ -0,0 +1,45 @@
+from src.job_details import parse_job_details
+
+DESCRIPTION = (
+    "About the job\nWe build fintech products.\n"
+    "Requirements: 5+ years with Python and Django, AWS, strong English, experience leading teams.\n"
+    "Benefits: remote work."
+)
+
+
+def raw(**overrides):
+    data = {
+        "title": "Senior Python Developer",
+        "top_card": "Bogotá, Colombia · 2 days ago · 40 applicants",
+        "spans": ["Bogotá, Colombia", "2 days ago"],
+        "insights": [[], ["Remote", "Full-time"]],
+        "date_fallback": [None, None],
+        "company": "Acme",
+        "description": DESCRIPTION,
+    }
+    data.update(overrides)
+    return data
+
+
+def test_parses_top_card_and_requirements():
+    details = parse_job_details(raw())
+    assert details["title"] == "Senior Python Developer"
+    assert details["company"] == "Acme"
+    assert details["date"] == "2 days ago"
+    assert details["location"] == "Bogotá, Colombia"
+    assert details["work_mode"] == "Remote"  # From the insight pills
+    assert details["raw_requirements"].startswith("5+ years with Python")
+
+
+def test_fallbacks_when_top_card_missing():
+    details = parse_job_details(raw(top_card=None, spans=[], date_fallback=[None, "1 week ago"], description=""))
+    assert details["date"] == "1 week ago"
+    assert details["location"] == "Unknown"
+    assert details["work_mode"] == "Unknown"
+    assert details["description"] == "" and "raw_requirements" not in details
+
+
+def test_work_mode_from_top_card_text_wins():
+    details = parse_job_details(raw(top_card="Madrid · Hybrid · 3 hours ago"))
+    assert details["work_mode"] == "Hybrid"
+    assert details["location"] == "Madrid"
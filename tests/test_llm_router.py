@@ -0,0 +1,79 @@
+import json
+import time
+
+from src.llm_router import LLMRouter, BackendError
+
+
+class FakeBackend:
+    stateful = False
+
+    def __init__(self, name, reply='{"answer": "Yes", "confidence": "High"}', delay=0.0, error=None, weight=1.0):
+        self.name = name
+        self.reply = reply
+        self.delay = delay
+        self.error = error
+        self.weight = weight
+        self.calls = 0
+
+    def call(self, prompt, required_keys=None):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return self.reply
+
+
+def test_fails_over_and_cools_down_rate_limited_backend():
+    web = FakeBackend("web", error=BackendError("Error: Rate Limit Exceeded (429)", rate_limited=True))
+    api = FakeBackend("api")
+    router = LLMRouter([web, api], hedge=False)
+
+    assert router.call(lambda b: "q") == api.reply
+    assert [b.name for b in router.ranked()] == ["api", "web"]
+    assert router.stats()["backends"]["web"]["rate_limited"] == 1
+
+
+def is_json(text):
+    try:
+        return bool(json.loads(text))
+    except ValueError:
+        return False
+
+
+def test_invalid_response_counts_as_failure():
+    router = LLMRouter([FakeBackend("web", reply="no json here"), FakeBackend("api")], hedge=False)
+    assert "answer" in router.call(lambda b: "q", validate=is_json)
+    assert router.stats()["backends"]["web"]["errors"] == 1
+
+
+def test_routes_to_lower_latency_backend():
+    slow, fast = FakeBackend("web"), FakeBackend("api")
+    router = LLMRouter([slow, fast], hedge=False, min_samples=2)
+    router.stats_by_name["web"].latencies.extend([8.0, 9.0, 10.0])
+    router.stats_by_name["api"].latencies.extend([1.0, 1.5, 2.0])
+    router.call(lambda b: "q")
+    assert fast.calls == 1 and slow.calls == 0
+
+
+def test_hedges_slow_request_to_second_backend():
+    slow, fast = FakeBackend("web", reply="slow", delay=1.0), FakeBackend("api", reply="fast")
+    router = LLMRouter([slow, fast], hedge=True, default_hedge_delay=0.05)
+    started = time.time()
+    assert router.call(lambda b: "q") == "fast"
+    assert time.time() - started < 0.9
+    assert router.hedges_launched == 1 and router.hedges_won == 1
+
+
+def test_no_backends_returns_none():
+    router = LLMRouter([None])
+    assert not router
+    assert router.call(lambda b: "q") is None
+
+
+def test_hedging_is_opt_in_and_close_releases_threads():
+    slow, fast = FakeBackend("web", reply="slow", delay=0.3), FakeBackend("api", reply="fast")
+    router = LLMRouter([slow, fast], default_hedge_delay=0.05)
+    assert router.call(lambda b: "q") == "slow"
+    assert router.hedges_launched == 0 and fast.calls == 0
+    router.close()
+    assert router._executor._shutdown
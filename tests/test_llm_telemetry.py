@@ -0,0 +1,44 @@
+from src.llm_telemetry import LLMTelemetry, percentile
+from src.llm_router import LLMRouter
+
+
+class FakeBackend:
+    stateful = False
+    name = "web"
+    weight = 1.0
+
+    def call(self, prompt, required_keys=None):
+        return "not json"
+
+    def last_stats(self):
+        return {"attempts": 3, "rate_limited": 2, "wait_seconds": 4.0, "network_seconds": 1.5}
+
+
+def test_summary_percentiles_and_breakdowns(tmp_path):
+    telemetry = LLMTelemetry(log_path=str(tmp_path / "calls.jsonl"))
+    for latency in range(1, 101):
+        telemetry.record("analyze", "web", request_bytes=100, response_bytes=10, latency=float(latency), parse_ok=True)
+    telemetry.record("answer", "api", attempts=2, rate_limited=1, wait_seconds=1.0, network_seconds=2.0, parse_ok=False)
+
+    summary = telemetry.summary()
+    assert summary["total_calls"] == 101
+    assert summary["by_purpose"]["analyze"]["p50"] == 51.0
+    assert summary["by_purpose"]["analyze"]["p99"] == 99.0
+    assert summary["by_backend"]["api"]["rate_limited"] == 1
+    assert summary["by_purpose"]["answer"]["parse_success"] == 0.0
+    assert summary["calls_last_minute"] == 101
+    assert len((tmp_path / "calls.jsonl").read_text().splitlines()) == 101
+
+
+def test_router_records_backend_stats_and_parse_failures(tmp_path):
+    telemetry = LLMTelemetry(log_path=None)
+    router = LLMRouter([FakeBackend()], telemetry=telemetry)
+    assert router.call(lambda b: "prompt", validate=lambda text: text.startswith("{"), purpose="analyze") is None
+
+    call = telemetry.calls[0]
+    assert call["purpose"] == "analyze" and call["request_bytes"] == 6 and call["response_bytes"] == 8
+    assert (call["attempts"], call["rate_limited"], call["wait_seconds"], call["parse_ok"]) == (3, 2, 4.0, False)
+
+
+def test_percentile_empty():
+    assert percentile([], 95) is None
@@ -0,0 +1,65 @@
+import time
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from src.match_model import MatchScoreModel, split_examples, priority_from_score
+
+
+GOOD = "Senior Python engineer, Django, AWS, remote Colombia. Tech lead for a backend team."
+BAD = "Junior sales representative, cold calling, on-site in Madrid, native German required."
+
+
+def make_examples():
+    examples = []
+    for i in range(40):
+        examples.append((f"{GOOD} Req {i}.", 85.0))
+        examples.append((f"{BAD} Req {i}.", 5.0))
+    return examples
+
+
+def test_learns_llm_scores_and_agrees():
+    train, test = split_examples(make_examples())
+    model = MatchScoreModel(n_features=2 ** 14).fit([t for t, _ in train], [s for _, s in train], epochs=200)
+
+    assert model.predict(GOOD) > 60
+    assert model.predict(BAD) < 20
+    metrics = model.evaluate([t for t, _ in test], [s for _, s in test])
+    assert metrics["agreement"] == 1.0
+
+
+def test_prediction_is_sub_millisecond():
+    model = MatchScoreModel().fit([GOOD, BAD], [85, 5], epochs=5)
+    model.predict(GOOD)
+    started = time.perf_counter()
+    for _ in range(100):
+        model.predict(GOOD)
+    assert (time.perf_counter() - started) / 100 < 0.001
+
+
+def test_save_and_load_roundtrip(tmp_path):
+    model = MatchScoreModel(n_features=2 ** 12).fit([GOOD, BAD], [85, 5], epochs=50)
+    model.metrics = {"agreement": 0.95}
+    path = str(tmp_path / "model.npz")
+    model.save(path)
+
+    loaded = MatchScoreModel.load(path)
+    assert loaded.metrics == {"agreement": 0.95}
+    assert abs(loaded.predict(GOOD) - model.predict(GOOD)) < 1e-4
+    assert MatchScoreModel.load(str(tmp_path / "missing.npz")) is None
+
+
+def test_priority_scale_matches_prompt():
+    assert [priority_from_score(s) for s in (95, 65, 45, 10)] == [1, 2, 3, 4]
+
+
+def test_small_holdout_leaves_agreement_unset():
+    from src.match_model import train_model, MIN_HOLDOUT
+
+    small = make_examples()[:20]
+    assert train_model(small, epochs=5).metrics["agreement"] is None
+
+    large = make_examples() * 4
+    assert len(split_examples(large)[1]) >= MIN_HOLDOUT
+    assert train_model(large, epochs=50).metrics["agreement"] is not None
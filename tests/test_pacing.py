@@ -0,0 +1,38 @@
+import asyncio
+import random
+
+from src.pacing import Pacer
+
+
+class FakePage:
+    def __init__(self, ready_after=0.0, fail=False):
+        self.ready_after = ready_after
+        self.fail = fail
+
+    async def wait_for_selector(self, selector, timeout=None):
+        await asyncio.sleep(self.ready_after)
+        if self.fail:
+            raise TimeoutError(selector)
+
+
+def test_floor_only_sleeps_the_remainder():
+    pacer = Pacer(floors={"click": (0.05, 0.0)}, rng=random.Random(0))
+    assert asyncio.run(pacer.settle(FakePage(ready_after=0.01), "click", selector="#x"))
+    stats = pacer.stats()["by_kind"]["click"]
+    assert stats["count"] == 1 and stats["timeouts"] == 0
+    assert 0.02 <= stats["floor_seconds"] <= 0.05  # ~0.04s remainder after 0.01s ready
+
+
+def test_slow_page_adds_no_extra_sleep_and_timeouts_are_counted():
+    pacer = Pacer(floors={"step": (0.01, 0.0)})
+    assert asyncio.run(pacer.settle(FakePage(ready_after=0.03), "step", selector="#x"))
+    assert not asyncio.run(pacer.settle(FakePage(fail=True), "step", selector="#x"))
+    stats = pacer.stats()
+    assert stats["by_kind"]["step"]["floor_seconds"] < 0.02
+    assert stats["timeouts"] == 1
+
+
+def test_scale_zero_disables_floors():
+    pacer = Pacer(scale=0)
+    assert pacer.sample_floor("search") == 0.0
+    assert asyncio.run(pacer.pause("type")) == 0.0
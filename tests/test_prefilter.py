@@ -0,0 +1,52 @@
+from src.prefilter import JobPreFilter, DECISION_REJECT, DECISION_FAST_TRACK, DECISION_PASS
+
+PROFILE = {
+    "english_level": "B2",
+    "location_rules": {
+        "remote_allowlist": ["Anywhere", "Colombia", "Latam", "Venezuela"],
+        "hybrid_allowlist": ["Bogotá", "Medellín", "Venezuela"],
+        "onsite_allowlist": ["Bogotá", "Medellín", "Venezuela"],
+    },
+}
+
+
+def make_filter():
+    return JobPreFilter(PROFILE, log_path=None)
+
+
+def test_english_level_above_profile_is_rejected():
+    pf = make_filter()
+    result = pf.evaluate({"description": "Requisitos: Inglés avanzado (C1).", "work_mode": "Remote"})
+    assert result["decision"] == DECISION_REJECT
+    assert "C1" in result["reasons"][0]
+    assert pf.rejections[0]["reasons"] == result["reasons"]
+
+
+def test_english_level_within_profile_passes():
+    pf = make_filter()
+    assert pf.required_english_level("English level B2 or higher") == "B2"
+    assert pf.evaluate({"description": "English level B2", "work_mode": "Unknown"})["decision"] == DECISION_PASS
+
+
+def test_onsite_outside_allowlist_is_rejected():
+    pf = make_filter()
+    result = pf.evaluate({"description": "", "work_mode": "On-site", "location": "Madrid, Spain"})
+    assert result["decision"] == DECISION_REJECT
+
+
+def test_hybrid_in_allowlisted_city_is_fast_tracked_accent_insensitive():
+    pf = make_filter()
+    result = pf.evaluate({"description": "", "work_mode": "Hybrid", "location": "Bogota, D.C., Colombia"})
+    assert result["decision"] == DECISION_FAST_TRACK
+    assert pf.stats[DECISION_FAST_TRACK] == 1
+
+
+def test_optional_higher_english_level_does_not_reject():
+    pf = make_filter()
+    assert pf.required_english_level("English B2 required. C1 English is a plus.") == "B2"
+    assert pf.required_english_level("Inglés B2 obligatorio, inglés C1 deseable") == "B2"
+    assert pf.required_english_level("English: ideally C1") is None
+    assert pf.required_english_level("Native English is a plus") is None
+    assert pf.required_english_level("English B2/C1") == "B2"
+    result = pf.evaluate({"description": "English B2 required, C1 English is a plus.", "work_mode": "Unknown"})
+    assert result["decision"] == DECISION_PASS
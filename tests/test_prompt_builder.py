@@ -0,0 +1,69 @@
+import json
+
+from src.prompt_builder import PromptBuilder
+from src.skill_extractor import SkillExtractor
+
+DESCRIPTION = """About the job
+We are hiring a Senior .NET Developer.
+Requirements:
+- 8+ years with C# and SQL Server
+Benefits
+- Free snacks
+- Gym membership
+About us
+Acme is a leading provider of everything since 1920.
+Nice to have
+- Angular
+Acme is an equal opportunity employer and values diversity."""
+
+
+def test_slim_description_drops_boilerplate_keeps_requirements():
+    slim = PromptBuilder("{}").slim_description(DESCRIPTION)
+    assert "8+ years with C#" in slim
+    assert "Angular" in slim
+    assert "snacks" not in slim
+    assert "since 1920" not in slim
+    assert "equal opportunity" not in slim
+
+
+def test_about_the_team_or_role_is_not_boilerplate():
+    text = "About this role\nLead a squad of 5.\nAbout the team\nWe ship Python daily.\nAbout you\n5+ years of Go."
+    slim = PromptBuilder("{}").slim_description(text)
+    assert "squad of 5" in slim and "Python daily" in slim and "years of Go" in slim
+
+
+def test_profile_digest_is_smaller_and_drops_resume_rules():
+    with open("config/profile_config.json", encoding="utf-8") as f:
+        profile_text = f.read()
+    builder = PromptBuilder(profile_text)
+    assert len(builder.digest) < len(profile_text) / 2
+    digest = json.loads(builder.digest)
+    assert "resume_rules" not in digest
+    assert "C#:90/10y" in digest["skills(level/years)"]["Backend"]
+    assert len(builder.profile_block(session_has_profile=True)) < 100
+
+
+def test_record_tracks_savings():
+    builder = PromptBuilder("{}")
+    info = builder.record("x" * 400, "x" * 100)
+    assert info["saved_bytes"] == 300
+    assert builder.stats()["saved_tokens"] == 75
+    assert builder.stats()["by_label"] == {"prompt": 1}
+
+
+def test_compact_rules_drops_markdown_and_blank_lines():
+    rules = "REGLAS:\n\n1. **Verdad Absoluta**:   Solo valen las `skills`.\n\n\n   - Remoto: OK."
+    assert PromptBuilder.compact_rules(rules) == "REGLAS:\n1. Verdad Absoluta: Solo valen las skills.\n - Remoto: OK."
+
+
+def test_job_digest_keeps_every_skill_for_transferable_scoring():
+    with open("config/profile_config.json", encoding="utf-8") as f:
+        profile_text = f.read()
+    builder = PromptBuilder(profile_text, skill_extractor=SkillExtractor(json.loads(profile_text)))
+    digest = builder.digest_for("Senior engineer with Angular and C#")
+    skills = json.loads(digest)["skills(level/years)"]
+    assert "C#:90/10y" in skills["Backend"]
+    # Not mentioned by the job: still listed (React counts for an Angular role), just without level/years
+    assert "React" in ",".join(skills.values()) and "React:" not in ",".join(skills.values())
+    assert json.loads(digest)["stack_priority"] == json.loads(builder.digest)["stack_priority"]
+    assert len(digest) < len(builder.digest)
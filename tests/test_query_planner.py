@@ -0,0 +1,41 @@
+from src.query_planner import QueryPlanner, role_key
+
+ROLES = ["Technical Lead", "Líder Técnico", "Tech Lead", "Staff Engineer",
+         "AI Engineer", "Ingeniero de IA", "Backend Developer", "Desarrollador Backend"]
+LOCATIONS = ["Medellín", "Bogotá", "Venezuela", "Remote", "Colombia (Remote Only)"]
+
+
+def test_role_synonyms_share_a_key():
+    assert role_key("Líder Técnico") == role_key("Tech Lead") == role_key("Technical Lead")
+    assert role_key("Ingeniero de IA") == role_key("AI Engineer")
+    assert role_key("Staff Engineer") != role_key("AI Engineer")
+
+
+def test_plan_collapses_roles_and_locations():
+    planner = QueryPlanner(ROLES, LOCATIONS)
+    queries = planner.plan()
+    assert planner.naive_count() == 40
+    assert len(queries) == 4 * 3
+    assert [q.location for q in queries[:3]] == ["Venezuela", "Remote", "Colombia"]
+    assert queries[2].covers == ["Medellín", "Bogotá", "Colombia (Remote Only)"]
+    assert queries[0].keywords == '"Technical Lead" OR "Líder Técnico" OR "Tech Lead"'
+    assert queries[3].keywords == "Staff Engineer"
+    assert sum(q.naive_count() for q in queries) == planner.naive_count()
+    assert len(planner.naive_plan()) == planner.naive_count()
+
+
+def test_results_map_back_to_originating_role():
+    query = QueryPlanner(ROLES, ["Remote"]).plan()[0]
+    assert query.role_for("Líder técnico Java") == "Líder Técnico"
+    assert query.role_for("Senior Tech Lead") == "Tech Lead"
+    assert query.role_for(None) == "Technical Lead"
+
+
+def test_max_terms_splits_large_groups():
+    planner = QueryPlanner(["Tech Lead", "Technical Lead", "Líder Técnico"], ["Remote"], max_terms=2)
+    assert [q.roles for q in planner.plan()] == [["Tech Lead", "Technical Lead"], ["Líder Técnico"]]
+
+
+def test_ambiguous_city_names_are_not_merged_into_a_country():
+    planner = QueryPlanner(["Tech Lead"], ["Venezuela", "Valencia", "Caracas"])
+    assert planner.location_groups() == {"Venezuela": ["Venezuela", "Caracas"], "Valencia": ["Valencia"]}
@@ -0,0 +1,29 @@
+from src.rate_limiter import AdaptiveRateLimiter
+
+
+def make_limiter(tmp_path, **kwargs):
+    return AdaptiveRateLimiter(state_path=str(tmp_path / "rate.json"), **kwargs)
+
+
+def test_burst_is_immediate_then_waits(tmp_path):
+    limiter = make_limiter(tmp_path, initial_rate=0.5, burst=2.0)
+    assert limiter.try_acquire() == 0.0
+    assert limiter.try_acquire() == 0.0
+    assert limiter.try_acquire() > 0.0
+
+
+def test_aimd_increase_and_halve_on_429(tmp_path):
+    limiter = make_limiter(tmp_path, initial_rate=1.0, additive_step=0.1)
+    limiter.on_success(latency=1.0)
+    assert abs(limiter.current_rate() - 1.1) < 1e-6
+    limiter.on_rate_limited()
+    assert abs(limiter.current_rate() - 0.55) < 1e-6
+    limiter.on_success(latency=60.0)  # slow response backs off gently
+    assert limiter.current_rate() < 0.55
+
+
+def test_state_is_shared_between_instances(tmp_path):
+    search_bot = make_limiter(tmp_path, initial_rate=1.0)
+    apply_bot = make_limiter(tmp_path, initial_rate=1.0)
+    search_bot.on_rate_limited(retry_after=30)
+    assert apply_bot.try_acquire() > 25
@@ -0,0 +1,36 @@
+import pytest
+
+from src.route_policy import RoutePolicy
+
+
+def test_scan_profile_blocks_heavy_resources_and_trackers():
+    policy = RoutePolicy("scan")
+    assert policy.should_block("image", "https://media.licdn.com/a.jpg")
+    assert policy.should_block("script", "https://www.googletagmanager.com/gtm.js")
+    assert not policy.should_block("document", "https://www.linkedin.com/jobs/view/1/")
+    assert not policy.should_block("script", "https://static.licdn.com/app.js")
+
+
+def test_apply_profile_is_looser_and_profiles_switch():
+    policy = RoutePolicy("apply")
+    assert not policy.should_block("image", "https://media.licdn.com/a.jpg")
+    assert policy.should_block("media", "https://x/video.mp4")
+    policy.set_profile("off")
+    assert not policy.should_block("media", "https://x/video.mp4")
+    with pytest.raises(ValueError):
+        policy.set_profile("nope")
+
+
+def test_counts_blocked_requests_per_page():
+    policy = RoutePolicy("scan")
+    page = object()
+    policy.record(page, "document", "https://www.linkedin.com/jobs/view/1/", False, navigation=True)
+    policy.record(page, "image", "https://media.licdn.com/a.jpg", True)
+    policy.record(page, "font", "https://static.licdn.com/f.woff2", True)
+    policy.record(page, "document", "https://www.linkedin.com/jobs/view/2/", False, navigation=True)
+
+    stats = policy.stats()
+    first, second = stats["recent_pages"]
+    assert first["url"].endswith("/1/") and first["blocked"] == 2 and first["blocked_bytes_est"] > 0
+    assert second["blocked"] == 0 and second["allowed"] == 1
+    assert stats["totals"]["by_type"] == {"image": 1, "font": 1}
@@ -0,0 +1,73 @@
+from src.search_crawler import PageTracker, WatermarkStore
+
+
+def urls(*ids):
+    return [f"https://www.linkedin.com/jobs/view/{i}/" for i in ids]
+
+
+def test_stops_on_repeated_page_and_empty_page():
+    tracker = PageTracker()
+    assert tracker.accept(urls(1, 2, 3)) == urls(1, 2, 3)
+    assert tracker.accept(urls(3, 4)) == urls(4)
+    assert tracker.stop_reason is None
+    assert tracker.accept(urls(3, 4)) == []
+    assert tracker.stop_reason == "duplicate" and tracker.complete
+
+    assert PageTracker().accept([]) == []
+
+
+def test_limit_truncates_and_is_not_a_complete_crawl():
+    tracker = PageTracker(limit=4)
+    tracker.accept(urls(1, 2, 3))
+    assert tracker.accept(urls(4, 5, 6)) == urls(4)
+    assert tracker.stop_reason == "limit" and not tracker.complete
+
+
+def test_watermark_stops_before_already_seen_jobs(tmp_path):
+    store = WatermarkStore(str(tmp_path / "marks.json"))
+    key = store.key("Python", "Colombia", "r86400")
+    store.set(key, "3")
+
+    tracker = PageTracker(watermark=WatermarkStore(store.path).get(key))
+    assert tracker.accept(urls(9, 8, 3, 2)) == urls(9, 8)
+    assert tracker.stop_reason == "watermark"
+    assert tracker.newest == "9"
+
+
+def test_skipped_jobs_do_not_count_or_end_the_crawl():
+    tracker = PageTracker(limit=2, skip=lambda url: "/1/" in url or "/2/" in url)
+    assert tracker.accept(urls(1, 2)) == []
+    assert tracker.stop_reason is None and tracker.skipped == 2
+    assert tracker.accept(urls(3, 4, 5)) == urls(3, 4)
+    assert tracker.stop_reason == "limit"
+
+
+def test_skip_is_only_consulted_for_returned_urls():
+    claimed = []
+    tracker = PageTracker(limit=2, skip=lambda url: claimed.append(url) or False)
+    assert tracker.accept(urls(*range(1, 11))) == urls(1, 2)
+    assert claimed == urls(1, 2)
+
+
+def test_limit_reached_at_the_watermark_completes_the_crawl():
+    tracker = PageTracker(limit=2, watermark="3")
+    assert tracker.accept(urls(5, 4, 3, 2)) == urls(5, 4)
+    assert tracker.stop_reason == "watermark" and tracker.complete and tracker.newest == "5"
+
+    # Limit filled on the last job of a page: the next page decides
+    tracker = PageTracker(limit=2, watermark="3")
+    assert tracker.accept(urls(5, 4)) == urls(5, 4) and tracker.stop_reason is None
+    assert tracker.accept(urls(3, 2)) == [] and tracker.complete
+
+    tracker = PageTracker(limit=2, watermark="1")
+    assert tracker.accept(urls(5, 4, 3)) == urls(5, 4)
+    assert tracker.stop_reason == "limit" and not tracker.complete
+
+
+def test_listed_counts_every_result_even_when_skipped_or_past_the_mark():
+    tracker = PageTracker(limit=1, watermark="3", skip=lambda url: "/5/" in url)
+    assert tracker.accept(urls(5, 4, 3, 2)) == urls(4)
+    assert len(tracker.listed) == 4 and tracker.skipped == 1
+
+    tracker = PageTracker(watermark="9")
+    assert tracker.accept(urls(9, 8)) == [] and len(tracker.listed) == 2
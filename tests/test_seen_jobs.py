@@ -0,0 +1,43 @@
+from src.seen_jobs import BloomFilter, SeenJobIndex
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    for i in range(1000):
+        bloom.add(str(i))
+    assert all(str(i) in bloom for i in range(1000))
+    false_positives = sum(str(i) in bloom for i in range(1000, 11000))
+    assert false_positives < 300
+
+
+def test_claim_dedupes_within_run_and_across_runs(tmp_path):
+    db = str(tmp_path / "seen.sqlite")
+    index = SeenJobIndex(db_path=db)
+    index.set_context("Data Engineer", "Madrid")
+    assert index.claim("1") and index.claim("2") and index.claim("3")
+    assert not index.claim("1")  # Same run, another search
+    index.record_outcome("1", "analyzed", 80)
+    index.record_outcome("2", "prefilter_reject")
+    index.record_outcome("3", "no_description")  # Not final: retried next run
+    index.close()
+
+    index = SeenJobIndex(db_path=db)
+    assert not index.claim("1") and not index.claim("2")
+    assert index.claim("3") and index.claim("4")
+    stats = index.stats()
+    assert stats["entries"] == 4
+    assert stats["known_from_previous_runs"] == 2
+    assert stats["hit_rate"] == 0.5
+
+    row = index._conn.execute("SELECT times_seen, role, outcome, match_percentage FROM seen_jobs WHERE job_id = '1'").fetchone()
+    assert row == (3, "Data Engineer", "analyzed", 80)
+    index.close()
+
+
+def test_release_lets_a_failed_job_be_claimed_again(tmp_path):
+    index = SeenJobIndex(db_path=str(tmp_path / "seen.sqlite"))
+    assert index.claim("7")
+    index.release("7")  # Tab failed to load
+    assert index.claim("7")
+    assert not index.claim("7")
+    index.close()
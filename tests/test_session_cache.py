@@ -0,0 +1,77 @@
+from src.session_cache import GeminiSessionCache
+
+
+def test_roundtrip_and_source_change(tmp_path):
+    path = str(tmp_path / "handshake.json")
+    cache = GeminiSessionCache(path=path, source="cookie-a")
+    assert cache.load() is None
+    cache.save({"__Secure-1PSID": "abc", "__Secure-1PSIDTS": "ts"}, "nonce123")
+    loaded = cache.load()
+    assert loaded["snlm0e"] == "nonce123"
+    assert loaded["cookies"]["__Secure-1PSID"] == "abc"
+    assert GeminiSessionCache(path=path, source="cookie-b").load() is None
+
+
+def test_invalidate_learns_validity_window(tmp_path):
+    path = str(tmp_path / "handshake.json")
+    cache = GeminiSessionCache(path=path, max_age=3600, min_age=0)
+    cache.save({"__Secure-1PSID": "abc"}, "nonce")
+    cache.invalidate()
+    assert cache.load() is None
+    # The entry "lived" ~0 s, so the learned window is now far below max_age
+    assert cache.validity_window() < 3600
+
+
+class Clock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+
+def live_for(cache, clock, seconds):
+    """Saves an entry, lets `seconds` pass and reports it as rejected by Google."""
+    cache.save({"__Secure-1PSID": "abc"}, "nonce")
+    clock.now += seconds
+    cache.invalidate()
+
+
+def test_learned_window_is_the_median_lifetime_within_bounds(tmp_path, monkeypatch):
+    import src.session_cache as session_cache
+
+    clock = Clock()
+    monkeypatch.setattr(session_cache, "time", clock)
+    cache = GeminiSessionCache(path=str(tmp_path / "handshake.json"), max_age=12 * 3600, min_age=600)
+    assert cache.validity_window() == 12 * 3600
+
+    for hours in (2, 4, 3):
+        live_for(cache, clock, hours * 3600)
+    assert cache.validity_window() == 3 * 3600
+
+    # A fresh entry is served inside the learned window and dropped past it
+    cache.save({"__Secure-1PSID": "abc"}, "nonce")
+    clock.now += 3 * 3600 - 60
+    assert cache.load()["snlm0e"] == "nonce"
+    clock.now += 120
+    assert cache.load() is None
+
+    # Very short lives are clamped to min_age; only the last 10 lifetimes count
+    for _ in range(10):
+        live_for(cache, clock, 5)
+    assert cache.validity_window() == 600
+    assert len(cache._read()["observed_lifetimes"]) == 10
+
+
+def test_invalidate_without_a_live_entry_learns_nothing(tmp_path, monkeypatch):
+    import src.session_cache as session_cache
+
+    clock = Clock()
+    monkeypatch.setattr(session_cache, "time", clock)
+    cache = GeminiSessionCache(path=str(tmp_path / "handshake.json"), max_age=3600, min_age=0)
+    cache.invalidate()
+    live_for(cache, clock, 1800)
+    clock.now += 10_000
+    cache.invalidate()  # Already invalidated: a second auth failure must not add a bogus lifetime
+    assert cache._read()["observed_lifetimes"] == [1800]
+    assert cache.validity_window() == 1800
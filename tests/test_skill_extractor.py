@@ -0,0 +1,53 @@
+import json
+
+from src.skill_extractor import AhoCorasick, SkillExtractor
+from src.prompt_builder import PromptBuilder
+
+PROFILE = {
+    "stack_priority": [["C#", ".NET Core", "Angular"], ["Python", "Django"], ["Java", "Spring Boot"]],
+    "skills": {"Backend": {"C#": {"level": 90, "years": 10}, "Java": {"level": 50, "years": 5}, "PHP": {"level": 70, "years": 9}}},
+    "skill_aliases": {"Python": ["py3"]},
+}
+
+
+def test_automaton_finds_overlapping_patterns_in_one_pass():
+    automaton = AhoCorasick(whole_words=False)
+    for pattern in ["he", "she", "his", "hers"]:
+        automaton.add(pattern)
+    assert sorted(automaton.iter_matches("ushers")) == [(1, 4, "she"), (2, 4, "he"), (2, 6, "hers")]
+
+
+def test_whole_words_and_positions_on_original_text():
+    extractor = SkillExtractor(PROFILE)
+    text = "Líder técnico: JavaScript no, Java sí. Spring Boot + C#/.NET"
+    result = extractor.extract(text)
+    assert "Java" in result["counts"] and result["counts"]["Java"] == 1  # not inside "JavaScript"
+    skill, start, end = next(m for m in result["mentions"] if m[0] == "Java")
+    assert text[start:end] == "Java"
+    assert {"Spring Boot", "C#", ".NET Core"} <= set(result["counts"])
+
+
+def test_framework_inference_aliases_and_best_stack():
+    extractor = SkillExtractor(PROFILE)
+    result = extractor.extract("Backend with Django and some py3 scripts. Django REST.")
+    assert result["counts"] == {"Django": 2, "Python": 1}
+    assert extractor.best_stack(result) == 1
+
+    inferred = extractor.extract("Microservicios con Spring Boot")
+    assert inferred["inferred"] == {"Java": ["Spring Boot"]}
+    assert "Java" in inferred["skills"]
+
+
+def test_prompt_digest_details_only_mentioned_skills():
+    builder = PromptBuilder(json.dumps(PROFILE), skill_extractor=SkillExtractor(PROFILE))
+    digest = builder.digest_for("Spring Boot developer")
+    assert "Java:50/5y" in digest and '"C#,Java:50/5y,PHP"' in digest
+    assert builder.digest_for("Office manager") == builder.digest
+
+
+def test_word_prefix_matches_inflections_but_not_inside_words():
+    automaton = AhoCorasick(whole_words=True, word_prefix=True)
+    for pattern in ["lead", "architect"]:
+        automaton.add(pattern)
+    assert automaton.find_all("Leadership and software architecture") == {"lead", "architect"}
+    assert automaton.find_all("Do not mislead the team") == set()